@@ -0,0 +1,191 @@
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+# Reverse proxies in front of the API. Clients are told apart by address, which is
+# read from X-Forwarded-For only when this many trusted proxies append to it;
+# otherwise anyone could dodge their rate limit by sending a different header.
+TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', 0))
+
+# Route classes, highest priority first
+PRIORITIES = {
+    "purchase": 0,
+    "auth": 1,
+    "admin": 2,
+    "browse": 3,
+    "search": 4,
+}
+
+# Default token bucket per client and route class: (requests per second, burst)
+DEFAULT_RATES = {
+    "purchase": (5, 10),
+    "auth": (2, 10),
+    "admin": (20, 40),
+    "browse": (20, 40),
+    "search": (15, 30),
+}
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class of an API request, or None for requests that bypass admission control"""
+    if path in ('/api/health', '/api/ready') or method == 'OPTIONS':
+        return None
+    if path.startswith('/api/transactions/purchase'):
+        return "purchase"
+    if path.startswith('/api/auth/'):
+        return "auth"
+    if path.startswith('/api/admin/') or path.startswith('/api/transactions/all') or method in ('POST', 'PUT', 'DELETE'):
+        return "admin"
+    if path.startswith('/api/search') or path.startswith('/api/items/search'):
+        return "search"
+    return "browse"
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Take a token; returns 0 if allowed, else seconds until one is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Rejected(Exception):
+    """Request shed by admission control"""
+    def __init__(self, status: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Per-client rate limits plus a global concurrency cap that admits purchases first"""
+    def __init__(self, max_concurrent: int = None, max_queue_wait: float = None, rates: Dict[str, Tuple[float, float]] = None):
+        self.enabled = os.getenv('ADMISSION_CONTROL', 'true').lower() in ('1', 'true', 'yes', 'on')
+        self.max_concurrent = max_concurrent or int(os.getenv('ADMISSION_MAX_CONCURRENT', 32))
+        self.max_queue_wait = max_queue_wait if max_queue_wait is not None else float(os.getenv('ADMISSION_MAX_QUEUE_WAIT', 0.5))
+        self.rates = dict(DEFAULT_RATES)
+        for route_class in PRIORITIES:
+            override = os.getenv(f'ADMISSION_RATE_{route_class.upper()}')  # e.g. "10/20" = 10 req/s, burst 20
+            if override:
+                rate, _, burst = override.partition('/')
+                self.rates[route_class] = (float(rate), float(burst or rate))
+        self.rates.update(rates or {})
+
+        self.max_clients = int(os.getenv('ADMISSION_MAX_CLIENTS', 100000))
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._bucket_lock = threading.Lock()
+
+        self.active = 0
+        self._waiters = []  # heap of (priority, sequence, event)
+        self._sequence = itertools.count()
+        self._slot_lock = threading.Lock()
+
+        self._counter_lock = threading.Lock()
+        self.admitted = {c: 0 for c in PRIORITIES}
+        self.rate_limited = {c: 0 for c in PRIORITIES}
+        self.shed = {c: 0 for c in PRIORITIES}
+        self.queued = {c: 0 for c in PRIORITIES}
+
+    def _check_rate(self, client: str, route_class: str):
+        now = time.monotonic()
+        with self._bucket_lock:
+            bucket = self._buckets.get((client, route_class))
+            if bucket is None:
+                if len(self._buckets) >= self.max_clients:
+                    # Forget idle clients whose buckets have refilled completely
+                    self._buckets = {k: b for k, b in self._buckets.items()
+                                     if b.tokens + (now - b.updated) * b.rate < b.burst}
+                bucket = self._buckets[(client, route_class)] = TokenBucket(*self.rates[route_class])
+            wait = bucket.take(now)
+        if wait:
+            self._count(self.rate_limited, route_class)
+            raise Rejected(429, "Too many requests", wait)
+
+    def _acquire_slot(self, route_class: str):
+        priority = PRIORITIES[route_class]
+        with self._slot_lock:
+            # Slots are handed straight to waiters on release, so a free slot means nobody is queued
+            if self.active < self.max_concurrent:
+                self.active += 1
+                return
+            event = threading.Event()
+            entry = (priority, next(self._sequence), event)
+            heapq.heappush(self._waiters, entry)
+        self._count(self.queued, route_class)
+
+        # Purchases get longer to wait for a slot than browsing and search
+        timeout = self.max_queue_wait * (4 if route_class == "purchase" else 1)
+        if event.wait(timeout):
+            return
+        with self._slot_lock:
+            if event.is_set():  # handed a slot just as we timed out
+                return
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+        self._count(self.shed, route_class)
+        raise Rejected(503, "Server busy, please retry", max(1.0, self.max_queue_wait))
+
+    def release(self):
+        """Give the slot to the most important waiter, or free it"""
+        with self._slot_lock:
+            if self._waiters:
+                _, _, event = heapq.heappop(self._waiters)
+                event.set()  # slot passes straight to the waiter, active count unchanged
+            else:
+                self.active -= 1
+
+    def admit(self, client: str, method: str, path: str) -> Optional[str]:
+        """Admit a request or raise Rejected; returns the route class holding a slot"""
+        if not self.enabled:
+            return None
+        route_class = classify(method, path)
+        if route_class is None:
+            return None
+        self._check_rate(client, route_class)
+        self._acquire_slot(route_class)
+        self._count(self.admitted, route_class)
+        return route_class
+
+    def _count(self, counter: Dict[str, int], route_class: str):
+        with self._counter_lock:
+            counter[route_class] += 1
+
+    @staticmethod
+    def retry_after_header(seconds: float) -> str:
+        return str(max(1, math.ceil(seconds)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "rates": {c: {"per_second": r, "burst": b} for c, (r, b) in self.rates.items()},
+            **self._counters()
+        }
+
+    def _counters(self) -> Dict[str, Dict[str, int]]:
+        with self._counter_lock:
+            return {
+                "admitted": dict(self.admitted),
+                "queued": dict(self.queued),
+                "rate_limited": dict(self.rate_limited),
+                "shed": dict(self.shed)
+            }
+
+
+admission = AdmissionController()
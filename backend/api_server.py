@@ -1,16 +1,113 @@
 from database import db
-from flask import Flask, request, jsonify
+import multiprocessing
+from flask import Flask, request, jsonify, g, Response, send_file
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 from auth import AuthService
+from availability import availability
 from items import ItemService
 from transactions import TransactionService
-from background.search_system import search_system
+from group_commit import purchase_writer
+from stock import StockService
+from live_feed import admin_events
+from background.search_system import (search_system, SEARCH_INDEX_REFRESH_INTERVAL,
+                                      SEARCH_WARMUP_INTERVAL, SEARCH_STATS_FLUSH_SECONDS)
+from background.item_purge import item_purger
+from background.scheduler import scheduler
 from flask_cors import CORS 
 from promos import PromoService
 from news import NewsService 
+from startup import StartupManager
+from item_import import ItemImportService, read_csv, read_ndjson
+from images import image_pipeline, VARIANTS
+from home import home_bundle
+from admission import admission, Rejected, TRUSTED_PROXIES
+from changefeed import ChangeFeed, CHANGE_LOG_PRUNE_INTERVAL
+from price_options import migrate_json_price_options, parse_price_args
+from profiling import profiler, FORMAT_HEADER
+from uploads import UploadRequest, UploadTooLarge, image_store, UPLOAD_MAX_REQUEST_BYTES
 
 app = Flask(__name__)
+app.request_class = UploadRequest  # multipart file parts stream to disk, hashed on the way
+if TRUSTED_PROXIES:  # take the client address from X-Forwarded-For, as set by our own proxies
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
 CORS(app)  # Enable CORS for all routes
 
+# Startup phases - independent phases run in parallel, in the background
+startup = StartupManager()
+startup.add_phase('schema', db.init_schema)
+startup.add_phase('admin_accounts', db.create_default_admin_accounts, depends_on=['schema'])
+startup.add_phase('price_options', migrate_json_price_options, depends_on=['schema'])
+startup.add_phase('purchase_summaries', TransactionService.backfill_summaries, depends_on=['schema'])
+startup.add_phase('search_index', search_system.warm_up, depends_on=['schema'], required=False)
+startup.add_phase('search_cache', search_system.warm_cache, depends_on=['search_index'], required=False)
+startup.add_phase('availability', availability.load, depends_on=['schema'], required=False)
+startup.add_phase('item_purge', item_purger.start, depends_on=['schema'], required=False)
+startup.add_phase('scheduler', scheduler.start, depends_on=['schema'], required=False)
+
+# Periodic maintenance, run by the scheduler instead of inside requests
+scheduler.add_job('search_index_refresh', search_system.refresh_if_stale, interval=SEARCH_INDEX_REFRESH_INTERVAL)
+scheduler.add_job('search_cache_warmup', search_system.warm_cache, interval=SEARCH_WARMUP_INTERVAL)
+scheduler.add_job('search_stats_flush', search_system.flush_query_counts, interval=SEARCH_STATS_FLUSH_SECONDS)
+scheduler.add_job('change_log_prune', ChangeFeed.prune, interval=CHANGE_LOG_PRUNE_INTERVAL)
+if home_bundle.ttl > 0:
+    scheduler.add_job('home_bundle_warmup', home_bundle.get, interval=home_bundle.ttl / 2, delay=0)
+
+@app.before_request
+def admission_control():
+    # Shed load early: per-client rate limits, then a priority-ordered concurrency cap
+    client = request.remote_addr or ''
+    try:
+        g.admission_class = admission.admit(client, request.method, request.path)
+    except Rejected as e:
+        response = jsonify({"success": False, "error": e.reason})
+        response.status_code = e.status
+        response.headers['Retry-After'] = admission.retry_after_header(e.retry_after)
+        return response
+
+@app.teardown_request
+def release_admission(exc):
+    if g.pop('admission_class', None):
+        admission.release()
+
+@app.before_request
+def reset_database_routing():
+    # Each request starts reading from replicas again until it writes
+    db.begin_request()
+
+@app.before_request
+def start_profiling():
+    # Opt-in: a sampled fraction of requests, or one carrying the admin profiling token
+    reason = profiler.wanted(request.headers)
+    if reason:
+        g.profile = profiler.start(reason, request.headers.get(FORMAT_HEADER))
+
+@app.after_request
+def log_request_queries(response):
+    # Flags requests that ran one query shape many times (N+1 loops)
+    route = request.url_rule.rule if request.url_rule else request.path
+    summary = db.end_request(f"{request.method} {route}")
+    if summary:
+        response.headers['X-DB-Queries'] = str(summary["queries"])
+    return response
+
+@app.after_request
+def finish_profiling(response):
+    session = g.pop('profile', None)
+    if session:
+        route = request.url_rule.rule if request.url_rule else request.path
+        record = profiler.finish(session, request.method, route, request.path, response.status_code)
+        response.headers['X-Profile-File'] = record["file"]
+    return response
+
+@app.teardown_request
+def abandon_profiling(exc):
+    # after_request is skipped when a request fails outright; still stop the profiler
+    session = g.pop('profile', None)
+    if session:
+        route = request.url_rule.rule if request.url_rule else request.path
+        profiler.finish(session, request.method, route, request.path, 500)
+
 # Authentication Endpoints
 @app.route('/api/auth/signup', methods=['POST'])
 def api_signup():
@@ -29,6 +126,21 @@ def api_signup():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/api/auth/available', methods=['GET'])
+def api_auth_available():
+    """Whether ?username= and/or ?email= are still free, for checking while the user types"""
+    try:
+        fields = {field: request.args.get(field, '').strip() for field in ('username', 'email')}
+        fields = {field: value for field, value in fields.items() if value}
+        if not fields:
+            return jsonify({"success": False, "error": "username or email required"})
+        result = {"success": True}
+        for field, value in fields.items():
+            result[field] = {"value": value, "available": not availability.is_taken(field, value)}
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
 @app.route('/api/auth/login', methods=['POST'])
 def api_login():
     try:
@@ -52,12 +164,34 @@ def api_get_profile(user_id):
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+# Storefront homepage bundle: promos, news, popular items and the catalog in one response
+@app.route('/api/home', methods=['GET'])
+def api_home():
+    try:
+        body, gzipped, etag = home_bundle.get()
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=304, headers={"ETag": etag})
+
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=10", "Vary": "Accept-Encoding"}
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            headers["Content-Encoding"] = "gzip"
+            body = gzipped
+        return Response(body, mimetype='application/json', headers=headers)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
 # Game Items Endpoints
 @app.route('/api/items', methods=['GET'])
 def api_get_items():
     try:
-        result = ItemService.get_all_items()
-        return jsonify(result)
+        variant = request.args.get('variant')
+        if variant and variant not in VARIANTS:
+            return jsonify({"success": False, "error": f"Unknown image variant '{variant}'"})
+        min_price, max_price, sort = parse_price_args(request.args)
+        since = ChangeFeed.parse_since(request.args.get('since'))
+        if since is not None:
+            return jsonify(ChangeFeed.delta('game_items', since, lambda ids: ItemService.get_all_items(variant, ids), 'items'))
+        return jsonify(ChangeFeed.listing(lambda: ItemService.get_all_items(variant, None, min_price, max_price, sort)))
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
@@ -69,11 +203,19 @@ def api_get_item(item_id):
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/api/items/<int:item_id>/stock', methods=['GET'])
+def api_item_stock(item_id):
+    try:
+        return jsonify(StockService.get_stock(item_id))
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
 @app.route('/api/items/search', methods=['GET'])
 def api_search_items():
     try:
         keyword = request.args.get('q', '')
-        result = ItemService.search_items(keyword)
+        min_price, max_price, sort = parse_price_args(request.args)
+        result = ItemService.search_items(keyword, min_price, max_price, sort)
         return jsonify(result)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
@@ -90,6 +232,12 @@ def api_items_by_platform(platform):
 @app.route('/api/transactions/purchase', methods=['POST'])
 def api_purchase():
     try:
+        if not startup.is_done('purchase_summaries'):
+            # Orders recorded before the summaries are built would be left out of them
+            response = jsonify({"success": False, "error": "Server is starting, please retry"})
+            response.status_code = 503
+            response.headers['Retry-After'] = '5'
+            return response
         data = request.get_json()
         if not data:
             return jsonify({"success": False, "error": "No data provided"})
@@ -106,12 +254,24 @@ def api_purchase():
 
 @app.route('/api/transactions/user/<int:user_id>', methods=['GET'])
 def api_user_transactions(user_id):
+    """Newest purchases first, a page at a time (?limit=, ?before=<transaction id>), with the user's summary"""
     try:
-        result = TransactionService.get_user_transactions(user_id)
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+        before = int(request.args['before']) if request.args.get('before') else None
+        if (limit is not None and limit < 1) or (before is not None and before < 1):
+            return jsonify({"success": False, "error": "limit and before must be positive"})
+        result = TransactionService.get_user_transactions(user_id, limit, before)
         return jsonify(result)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/api/transactions/user/<int:user_id>/summary', methods=['GET'])
+def api_user_purchase_summary(user_id):
+    try:
+        return jsonify({"success": True, "summary": TransactionService.get_user_summary(user_id)})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
 # Admin Endpoints
 @app.route('/api/admin/items', methods=['POST'])
 def api_add_item():
@@ -154,11 +314,96 @@ def api_add_item():
             image_data,     # ✅ ADD IMAGE DATA
             currency_icon   # ✅ ADD CURRENCY ICON
         )
+        if result.get("success"):
+            search_system.invalidate()
+            image_pipeline.submit('item', result.get('item_id'), image_data)
         return jsonify(result)
     except Exception as e:
         print(f"❌ Backend error: {e}")
         return jsonify({"success": False, "error": str(e)})
     
+def upload_too_large(message: str):
+    response = jsonify({"success": False, "error": message})
+    response.status_code = 413
+    return response
+
+def read_upload_form():
+    """None when the request is an acceptable multipart upload, else the error response"""
+    if request.mimetype != 'multipart/form-data':
+        return jsonify({"success": False, "error": "Send multipart/form-data"})
+    # Enforced while the body streams in, so chunked uploads without a Content-Length are capped too
+    request.max_content_length = UPLOAD_MAX_REQUEST_BYTES
+    try:
+        request.files  # parse now: file parts stream to disk, oversized ones raise UploadTooLarge
+    except UploadTooLarge:
+        raise
+    except RequestEntityTooLarge:
+        return upload_too_large(f"Upload is larger than {UPLOAD_MAX_REQUEST_BYTES // (1024 * 1024)} MB")
+    return None
+
+@app.route('/api/admin/items/upload', methods=['POST'])
+def api_add_item_upload():
+    """POST /api/admin/items as multipart/form-data, with image and currency_icon as file parts"""
+    try:
+        error = read_upload_form()
+        if error:
+            return error
+        form = request.form
+        if not form.get('price'):
+            return jsonify({"success": False, "error": "price is required"})
+
+        # Both images are optional, as with the JSON endpoint; empty file inputs are skipped
+        parts = {field: request.files.get(field) for field in ('image', 'currency_icon')}
+        image, icon = (image_store.save(part) if part and part.filename else None for part in parts.values())
+        for stored in (image, icon):
+            if stored and not stored["success"]:
+                return jsonify(stored)
+
+        result = ItemService.add_game_item(
+            form.get('name'),
+            form.get('description'),
+            float(form['price']),
+            form.get('currency', 'PHP'),
+            form.get('game_platform'),
+            form.get('price_options'),
+            image_store.url_for(image["name"], request.host_url) if image else None,
+            image_store.url_for(icon["name"], request.host_url) if icon else None
+        )
+        if result.get("success"):
+            search_system.invalidate()
+            if image:
+                image_pipeline.submit_file('item', result.get('item_id'), image["path"])
+        return jsonify(result)
+    except UploadTooLarge as e:
+        return upload_too_large(e.description)
+    except Exception as e:
+        print(f"❌ Item upload error: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/admin/items/bulk', methods=['POST'])
+def api_bulk_import_items():
+    """Import many items from a CSV or NDJSON body, streamed row by row"""
+    try:
+        import_format = ItemImportService.detect_format(request.content_type, request.args.get('format'))
+        if import_format is None:
+            return jsonify({"success": False, "error": "Send text/csv or application/x-ndjson (or ?format=csv|ndjson)"})
+
+        chunk_size = max(1, min(int(request.args.get('chunk_size', 500)), 5000))
+        records = read_csv(request.stream) if import_format == 'csv' else read_ndjson(request.stream)
+        result = ItemImportService.import_items(records, chunk_size)
+
+        if result["imported"]:
+            try:
+                search_system.refresh()
+            except Exception as e:
+                # The items are committed either way; report them and rebuild in the background
+                print(f"⚠️ Search index refresh after bulk import failed: {e}")
+                search_system.invalidate()
+        return jsonify(result)
+    except Exception as e:
+        print(f"❌ Bulk import error: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
 # Search Endpoints
 @app.route('/api/search/autocomplete', methods=['GET'])
 def api_autocomplete():
@@ -183,11 +428,12 @@ def api_search():
     try:
         keyword = request.args.get('q', '')
         limit = int(request.args.get('limit', 10))
+        min_price, max_price, sort = parse_price_args(request.args)
         
         if not keyword:
             return jsonify({"success": False, "error": "Search keyword required"})
         
-        results = search_system.hybrid_search(keyword, limit)
+        results = search_system.cached_search(keyword, limit, min_price, max_price, sort)
         return jsonify({
             "success": True,
             "keyword": keyword,
@@ -197,6 +443,31 @@ def api_search():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/api/search/facets', methods=['GET'])
+def api_faceted_search():
+    """Search with platform/currency/price filters; values of one facet may be comma-separated"""
+    try:
+        keyword = request.args.get('q', '')
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+        offset = max(0, int(request.args.get('offset', 0)))
+        filters = {
+            facet: [value.strip() for value in request.args.get(facet, '').split(',') if value.strip()]
+            for facet in ('platform', 'currency', 'price')
+        }
+
+        result = search_system.faceted_search(keyword, filters, limit, offset)
+        return jsonify({
+            "success": True,
+            "keyword": keyword,
+            "filters": {facet: values for facet, values in filters.items() if values},
+            "results": result["results"],
+            "count": len(result["results"]),
+            "total": result["total"],
+            "facets": result["facets"]
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
 @app.route('/api/search/platform', methods=['GET'])
 def api_platform_search():
     try:
@@ -206,7 +477,8 @@ def api_platform_search():
         if not platform:
             return jsonify({"success": False, "error": "Platform parameter required"})
         
-        results = search_system.search_by_platform(platform, keyword)
+        min_price, max_price, sort = parse_price_args(request.args)
+        results = search_system.cached_platform_search(platform, keyword, min_price, max_price, sort)
         return jsonify({
             "success": True,
             "platform": platform,
@@ -220,29 +492,42 @@ def api_platform_search():
 @app.route('/api/admin/items/<int:item_id>', methods=['DELETE'])
 def api_delete_item(item_id):
     try:
-        # First, check if there are any transactions for this item
-        transaction_count = db.fetch_one("SELECT COUNT(*) FROM transactions WHERE item_id = %s", (item_id,))
-        
-        if transaction_count and transaction_count[0] > 0:
-            db.execute("DELETE FROM transactions WHERE item_id = %s", (item_id,))
-
-        # Now delete the item
-        success = db.execute("DELETE FROM game_items WHERE id = %s", (item_id,))
-        
-        if success:
-            return jsonify({"success": True, "message": "Item deleted successfully"})
-        else:
-            return jsonify({"success": False, "error": "Failed to delete item"})
+        result = ItemService.delete_item(item_id)
+        if result.get("success"):
+            search_system.invalidate()
+            item_purger.wake()  # archives the item's transactions in the background
+        return jsonify(result)
             
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/admin/items/<int:item_id>/stock', methods=['PUT', 'DELETE'])
+def api_set_item_stock(item_id):
+    """Limit an item to {"quantity": n, "shards": optional} more sales, or DELETE to make it unlimited"""
+    try:
+        if request.method == 'DELETE':
+            return jsonify(StockService.remove_limit(item_id))
+        data = request.get_json()
+        if not data or data.get('quantity') is None:
+            return jsonify({"success": False, "error": "quantity is required"})
+        shards = data.get('shards')
+        result = StockService.set_stock(item_id, int(data['quantity']), int(shards) if shards else None)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
     
 @app.route('/api/promos', methods=['GET'])
 def api_get_promos():
     try:
         print("🔍 GET /api/promos endpoint called")
-        result = PromoService.get_all_promos()
-        print(f"✅ GET /api/promos result: {result}")
+        variant = request.args.get('variant')
+        if variant and variant not in VARIANTS:
+            return jsonify({"success": False, "error": f"Unknown image variant '{variant}'"})
+        since = ChangeFeed.parse_since(request.args.get('since'))
+        if since is not None:
+            return jsonify(ChangeFeed.delta('promos', since, lambda ids: PromoService.get_all_promos(variant, ids), 'promos'))
+        result = ChangeFeed.listing(lambda: PromoService.get_all_promos(variant))
+        print(f"✅ GET /api/promos result: {result.get('count', 0)} promos")
         return jsonify(result)
     except Exception as e:
         print(f"❌ GET /api/promos error: {e}")
@@ -263,27 +548,80 @@ def api_add_promo():
             data.get('title'),
             data.get('description')
         )
+        if result.get("success"):
+            image_pipeline.submit('promo', result.get('promo_id'), data.get('image'))
         return jsonify(result)
     except Exception as e:
         print(f"❌ POST /api/promos error: {e}")
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/api/promos/upload', methods=['POST'])
+def api_add_promo_upload():
+    """POST /api/promos as multipart/form-data, with the image as a file part"""
+    try:
+        error = read_upload_form()
+        if error:
+            return error
+        image = image_store.save(request.files.get('image'))
+        if not image["success"]:
+            return jsonify(image)
+
+        result = PromoService.add_promo(
+            image_store.url_for(image["name"], request.host_url),
+            request.form.get('title'),
+            request.form.get('description')
+        )
+        if result.get("success"):
+            image_pipeline.submit_file('promo', result.get('promo_id'), image["path"])
+        return jsonify(result)
+    except UploadTooLarge as e:
+        return upload_too_large(e.description)
+    except Exception as e:
+        print(f"❌ Promo upload error: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
 @app.route('/api/promos/<int:promo_id>', methods=['DELETE'])
 def api_delete_promo(promo_id):
     try:
         print(f"🔍 DELETE /api/promos/{promo_id} endpoint called")
         result = PromoService.delete_promo(promo_id)
+        if result.get("success"):
+            image_pipeline.delete_variants('promo', promo_id)
         return jsonify(result)
     except Exception as e:
         print(f"❌ DELETE /api/promos error: {e}")
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/api/images/<owner_type>/<int:owner_id>/<variant>', methods=['GET'])
+def api_get_image_variant(owner_type, owner_id, variant):
+    """Serve a resized derivative as a plain image so browsers can cache it"""
+    found = image_pipeline.get_variant(owner_type, owner_id, variant)
+    if not found:
+        return jsonify({"success": False, "error": "Image not found"}), 404
+    mime, payload = found
+    return Response(payload, mimetype=mime, headers={"Cache-Control": "public, max-age=86400"})
+
+@app.route('/api/uploads/<name>', methods=['GET'])
+def api_get_uploaded_image(name):
+    """Serve an uploaded image; names are content hashes, so it can be cached for good"""
+    path = image_store.path_for(name)
+    if not path:
+        return jsonify({"success": False, "error": "Image not found"}), 404
+    return send_file(path, max_age=31536000, etag=name.split('.')[0])
+
+@app.route('/api/admin/uploads', methods=['GET'])
+def api_upload_stats():
+    return jsonify({"success": True, "uploads": image_store.stats()})
+
 # News Endpoints
 @app.route('/api/news', methods=['GET'])
 def api_get_news():
     try:
         print("🔍 GET /api/news endpoint called")
-        result = NewsService.get_all_news()
+        since = ChangeFeed.parse_since(request.args.get('since'))
+        if since is not None:
+            return jsonify(ChangeFeed.delta('news', since, NewsService.get_all_news, 'news'))
+        result = ChangeFeed.listing(NewsService.get_all_news)
         print(f"✅ GET /api/news result: {result.get('count', 0)} items")
         return jsonify(result)
     except Exception as e:
@@ -350,10 +688,113 @@ def api_all_transactions():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/api/admin/transactions/stream', methods=['GET'])
+def api_transaction_stream():
+    """Server-Sent Events: one "transaction" event per completed purchase, resumable with Last-Event-ID"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    subscriber = admin_events.subscribe(last_event_id)
+    if subscriber is None:
+        response = jsonify({"success": False, "error": "Too many live monitors connected"})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+    response = Response(admin_events.stream(subscriber), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let a proxy hold events back
+    return response
+
+@app.route('/api/admin/live-feed', methods=['GET'])
+def api_live_feed_stats():
+    return jsonify({"success": True, "live_feed": admin_events.stats()})
+
+@app.route('/api/admin/database', methods=['GET'])
+def api_database_status():
+    try:
+        return jsonify({"success": True, "database": db.status()})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/admin/admission', methods=['GET'])
+def api_admission_stats():
+    return jsonify({"success": True, "admission": admission.stats()})
+
+@app.route('/api/admin/search', methods=['GET'])
+def api_search_stats():
+    return jsonify({"success": True, "search": search_system.stats()})
+
+@app.route('/api/admin/scheduler', methods=['GET'])
+def api_scheduler_stats():
+    """Background jobs with their run times, failures and skipped overlaps"""
+    return jsonify({"success": True, "scheduler": scheduler.stats()})
+
+@app.route('/api/admin/group-commit', methods=['GET'])
+def api_group_commit_stats():
+    """Purchase group commit: batch sizes, commit and wait latencies"""
+    return jsonify({"success": True, "group_commit": purchase_writer.stats()})
+
+@app.route('/api/admin/queries', methods=['GET'])
+def api_query_stats():
+    """Most expensive query shapes (?limit=, ?order=total_ms|avg_ms|max_ms|calls), slow queries with plans, N+1 suspects"""
+    try:
+        limit = int(request.args.get('limit', 20))
+        order = request.args.get('order', 'total_ms')
+        if order not in ('total_ms', 'avg_ms', 'max_ms', 'calls'):
+            return jsonify({"success": False, "error": "order must be one of: total_ms, avg_ms, max_ms, calls"})
+        return jsonify({"success": True, "queries": db.query_log.stats(limit, order)})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def api_profiles():
+    """Slowest recent request profiles per route (?route= to filter, ?limit= per route)"""
+    try:
+        limit = int(request.args.get('limit', 5))
+        return jsonify({
+            "success": True,
+            "profiling": profiler.stats(),
+            "routes": profiler.slowest(request.args.get('route'), limit)
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/admin/profiles/<name>', methods=['GET'])
+def api_profile_file(name):
+    """Download one profile file listed by /api/admin/profiles"""
+    path = profiler.path_for(name)
+    if path is None:
+        return jsonify({"success": False, "error": "Profile not found"}), 404
+    return send_file(path, as_attachment=True, download_name=name)
+
+@app.route('/api/admin/availability', methods=['GET'])
+def api_availability_stats():
+    return jsonify({"success": True, "availability": availability.stats()})
+
+@app.route('/api/admin/purge', methods=['GET'])
+def api_purge_stats():
+    """Progress of the background purge of deleted items"""
+    try:
+        return jsonify({"success": True, "purge": item_purger.stats()})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy", "message": "E-Currency API is running"})
 
+# Readiness endpoint - only OK once startup phases have completed
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    status = startup.status()
+    if status["ready"]:
+        status["status"] = "ready"
+    else:
+        status["status"] = "failed" if status["finished"] else "starting"
+    return jsonify(status), (200 if status["ready"] else 503)
+
+# Image pipeline worker processes re-import this module; only the server itself starts up
+if multiprocessing.parent_process() is None:
+    startup.start()
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -1,4 +1,5 @@
 from database import db
+from availability import availability
 import hashlib
 import secrets
 
@@ -20,13 +21,11 @@ class AuthService:
         if role != "user":
             return {"success": False, "error": "Invalid role"}
 
-        # Check if user already exists
-        existing_user = db.fetch_one(
-            "SELECT id FROM users WHERE username = %s OR email = %s", 
-            (username, email)
-        )
-        if existing_user:
-            return {"success": False, "error": "Username or email already exists"}
+        # Check if user already exists - one lookup per unique index instead of an OR
+        # (a lagging replica could miss a brand new account, so ask the primary)
+        for field, value in (("username", username), ("email", email)):
+            if db.fetch_one(f"SELECT id FROM users WHERE {field} = %s", (value,), use_primary=True):
+                return {"success": False, "error": f"{field.capitalize()} already exists"}
 
         # Use the SAME password hashing as in database.py
         salt = secrets.token_hex(16)
@@ -40,6 +39,7 @@ class AuthService:
         
         if success:
             user_id = db.get_last_insert_id()
+            availability.record(user_id, username, email)
             return {
                 "success": True,
                 "message": "Registration successful!",
@@ -0,0 +1,157 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+from database import db
+
+FIELDS = ('username', 'email')
+
+
+class BloomFilter:
+    """Fixed-size set membership test: "definitely not present" or "maybe present"."""
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class AvailabilityIndex:
+    """Answers "is this username/email free?" mostly without touching the users table.
+
+    A Bloom filter per field, built from the users table at startup, rules
+    out most taken-name checks in memory. Signups handled here go into the
+    filter and an exact set of recent names, and every refresh_interval the
+    rows other server processes inserted since the last load are folded in.
+    Only names the filter cannot rule out are looked up in the database.
+    """
+    def __init__(self, error_rate: float = None, refresh_interval: float = None, min_capacity: int = None):
+        self.error_rate = error_rate or float(os.getenv('AVAILABILITY_ERROR_RATE', 0.01))
+        self.refresh_interval = refresh_interval if refresh_interval is not None else float(os.getenv('AVAILABILITY_REFRESH_INTERVAL', 10))
+        self.min_capacity = min_capacity or int(os.getenv('AVAILABILITY_MIN_CAPACITY', 100000))
+        self._filters: Optional[Dict[str, BloomFilter]] = None
+        self._recent: Dict[str, set] = {field: set() for field in FIELDS}
+        self._last_user_id = 0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+        self.checks = 0
+        self.filtered = 0
+        self.recent_hits = 0
+        self.db_lookups = 0
+        self.false_positives = 0
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        # Case-insensitive, like the MySQL collation: never a false "available"
+        return value.strip().lower()
+
+    def load(self) -> int:
+        """(Re)build the filters from every user; returns how many users were loaded"""
+        rows = db.fetch_all("SELECT id, username, email FROM users ORDER BY id", use_primary=True)
+        if rows is None:
+            raise RuntimeError("Could not read users")
+        capacity = max(self.min_capacity, len(rows) * 2)
+        filters = {field: BloomFilter(capacity, self.error_rate) for field in FIELDS}
+        last_user_id = self._add_rows(filters, rows)
+        with self._lock:
+            self._filters = filters
+            self._recent = {field: set() for field in FIELDS}
+            self._last_user_id = last_user_id
+            self._refreshed_at = time.monotonic()
+        print(f"👤 Availability filter loaded with {len(rows)} users")
+        return len(rows)
+
+    def _add_rows(self, filters: Dict[str, BloomFilter], rows: Iterable) -> int:
+        last_user_id = self._last_user_id
+        for user_id, username, email in rows:
+            filters['username'].add(self.normalize(username))
+            filters['email'].add(self.normalize(email))
+            last_user_id = max(last_user_id, user_id)
+        return last_user_id
+
+    def _refresh(self):
+        """Fold in users created by other processes since the last load"""
+        with self._lock:
+            if time.monotonic() - self._refreshed_at < self.refresh_interval:
+                return
+            self._refreshed_at = time.monotonic()  # one refresh at a time
+            filters, since = self._filters, self._last_user_id
+        if any(f.count >= f.capacity for f in filters.values()):
+            self.load()  # full enough that false positives climb: rebuild bigger
+            return
+        rows = db.fetch_all(
+            "SELECT id, username, email FROM users WHERE id > %s ORDER BY id", (since,), use_primary=True
+        ) or []
+        with self._lock:
+            self._last_user_id = self._add_rows(filters, rows)
+
+    def record(self, user_id: int, username: str, email: str):
+        """Remember a signup made by this process"""
+        if self._filters is None:
+            return
+        values = {'username': self.normalize(username), 'email': self.normalize(email)}
+        with self._lock:
+            for field, value in values.items():
+                self._filters[field].add(value)
+                self._recent[field].add(value)
+
+    def is_taken(self, field: str, value: str) -> bool:
+        if field not in FIELDS:
+            raise ValueError(f"Can only check {' or '.join(FIELDS)}")
+        self.checks += 1
+        key = self.normalize(value)
+        if self._filters is not None:
+            self._refresh()
+            if key not in self._filters[field]:
+                self.filtered += 1
+                return False
+            if key in self._recent[field]:
+                self.recent_hits += 1
+                return True
+
+        # Possible collision (or no filter yet): exact, indexed lookup on one column
+        self.db_lookups += 1
+        taken = db.fetch_one(f"SELECT id FROM users WHERE {field} = %s", (value.strip(),), use_primary=True) is not None
+        if not taken and self._filters is not None:
+            self.false_positives += 1
+        return taken
+
+    def stats(self) -> Dict[str, Any]:
+        filters = self._filters
+        return {
+            "loaded": filters is not None,
+            "error_rate": self.error_rate,
+            "filters": {
+                field: {"entries": f.count, "capacity": f.capacity, "bits": f.size, "hashes": f.hash_count}
+                for field, f in (filters or {}).items()
+            },
+            "recent_signups": len(self._recent['username']),
+            "checks": self.checks,
+            "answered_in_memory": self.filtered + self.recent_hits,
+            "db_lookups": self.db_lookups,
+            "false_positives": self.false_positives
+        }
+
+
+availability = AvailabilityIndex()
@@ -1,4 +1,7 @@
 from .search_system import search_system, SearchSystem
 from .product_service import ProductService, GameItem
+from .item_purge import item_purger, ItemPurger
+from .scheduler import scheduler, Scheduler
 
-__all__ = ['search_system', 'SearchSystem', 'ProductService', 'GameItem']
\ No newline at end of file
+__all__ = ['search_system', 'SearchSystem', 'ProductService', 'GameItem', 'item_purger', 'ItemPurger',
+           'scheduler', 'Scheduler']
\ No newline at end of file
@@ -0,0 +1,140 @@
+from typing import Dict, Any, List, Optional
+import sys
+import os
+import threading
+import time
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import db
+from changefeed import placeholders
+
+ARCHIVE_TRANSACTIONS = (
+    "INSERT INTO transactions_archive (id, user_id, item_id, status, final_price, quantity, created_at) "
+    "SELECT id, user_id, item_id, status, final_price, quantity, created_at FROM transactions WHERE id IN ({ids})"
+)
+
+
+class ItemPurger:
+    """Finishes item deletions in the background.
+
+    Deleting an item only marks it deleted. This worker then copies the
+    item's transactions to transactions_archive and removes them a small
+    chunk at a time, each chunk in its own short transaction with a pause
+    in between, so the busy transactions table is never locked for long.
+    The item row goes last. Soft-deleted rows stay in game_items until then,
+    so a purge interrupted by a restart simply resumes.
+    """
+    def __init__(self, chunk_size: int = None, pause: float = None, interval: float = None):
+        self.enabled = os.getenv('ITEM_PURGE', 'true').lower() in ('1', 'true', 'yes', 'on')
+        self.chunk_size = chunk_size or int(os.getenv('ITEM_PURGE_CHUNK_SIZE', 500))
+        self.pause = pause if pause is not None else float(os.getenv('ITEM_PURGE_PAUSE', 0.05))
+        self.interval = interval if interval is not None else float(os.getenv('ITEM_PURGE_INTERVAL', 60))
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.current: Optional[Dict[str, Any]] = None
+        self.items_purged = 0
+        self.transactions_archived = 0
+        self.chunks = 0
+        self.failures = 0
+        self.last_error = None
+
+    def start(self):
+        """Start the worker thread (once); it first finishes purges left from a previous run"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='item-purge', daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        """Start purging now instead of at the next interval"""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.purge_pending()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                self.current = None
+                print(f"❌ Item purge failed, retrying later: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    @staticmethod
+    def pending_items() -> List[int]:
+        rows = db.fetch_all(
+            "SELECT id FROM game_items WHERE deleted_at IS NOT NULL ORDER BY deleted_at, id",
+            use_primary=True
+        )
+        return [row[0] for row in rows or []]
+
+    def purge_pending(self) -> int:
+        purged = 0
+        for item_id in self.pending_items():
+            self.purge_item(item_id)
+            purged += 1
+        return purged
+
+    def purge_item(self, item_id: int):
+        started = time.monotonic()
+        self.current = {"item_id": item_id, "archived": 0, "started_at": datetime.now().isoformat(timespec="seconds")}
+
+        while True:
+            moved = self._archive_chunk(item_id)
+            if not moved:
+                break
+            self.current["archived"] += moved
+            self.transactions_archived += moved
+            self.chunks += 1
+            time.sleep(self.pause)
+
+        # A purchase that slipped in while the item was being hidden makes this fail
+        # on the foreign key; the next pass archives it and tries again
+        with db.transaction() as tx:
+            tx.execute("DELETE FROM image_variants WHERE owner_type = 'item' AND owner_id = %s", (item_id,))
+            tx.execute("DELETE FROM game_items WHERE id = %s AND deleted_at IS NOT NULL", (item_id,))
+
+        self.items_purged += 1
+        print(f"🧹 Purged item #{item_id}: {self.current['archived']} transactions archived in {time.monotonic() - started:.1f}s")
+        self.current = None
+
+    def _archive_chunk(self, item_id: int) -> int:
+        """Move up to chunk_size of the item's transactions to the archive; returns how many moved"""
+        with db.transaction() as tx:
+            tx.execute(
+                "SELECT id FROM transactions WHERE item_id = %s ORDER BY id LIMIT %s",
+                (item_id, self.chunk_size)
+            )
+            ids = tuple(row[0] for row in tx.fetchall())
+            if not ids:
+                return 0
+            tx.execute(ARCHIVE_TRANSACTIONS.format(ids=placeholders(ids)), ids)
+            tx.execute(f"DELETE FROM transactions WHERE id IN ({placeholders(ids)})", ids)
+        return len(ids)
+
+    def stats(self) -> Dict[str, Any]:
+        current = dict(self.current) if self.current else None
+        if current:
+            row = db.fetch_one("SELECT COUNT(*) FROM transactions WHERE item_id = %s", (current["item_id"],), use_primary=True)
+            current["remaining"] = row[0] if row else None
+        return {
+            "enabled": self.enabled,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "chunk_size": self.chunk_size,
+            "pause_seconds": self.pause,
+            "pending_items": len(self.pending_items()),
+            "current": current,
+            "items_purged": self.items_purged,
+            "transactions_archived": self.transactions_archived,
+            "chunks": self.chunks,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
+
+
+item_purger = ItemPurger()
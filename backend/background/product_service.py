@@ -33,7 +33,7 @@ class GameItem:
     def fetch_all() -> List['GameItem']:
         """Fetch all game items from database"""
         rows = db.fetch_all(
-            "SELECT id, name, price, description, currency, game_platform, created_at FROM game_items"
+            "SELECT id, name, price, description, currency, game_platform, created_at FROM game_items WHERE deleted_at IS NULL"
         )
         if rows:
             return [
@@ -48,7 +48,7 @@ class GameItem:
     def fetch_by_id(item_id: int) -> 'GameItem':
         """Fetch specific game item by ID"""
         row = db.fetch_one(
-            "SELECT id, name, price, description, currency, game_platform, created_at FROM game_items WHERE id = %s",
+            "SELECT id, name, price, description, currency, game_platform, created_at FROM game_items WHERE id = %s AND deleted_at IS NULL",
             (item_id,)
         )
         if row:
@@ -58,6 +58,24 @@ class GameItem:
             )
         return None
 
+    @staticmethod
+    def fetch_by_ids(item_ids: List[int]) -> List['GameItem']:
+        """Fetch several items in one query, in the order of item_ids (missing ones left out)"""
+        if not item_ids:
+            return []
+        rows = db.fetch_all(
+            "SELECT id, name, price, description, currency, game_platform, created_at FROM game_items "
+            f"WHERE deleted_at IS NULL AND id IN ({', '.join(['%s'] * len(item_ids))})",
+            tuple(item_ids)
+        ) or []
+        by_id = {
+            row[0]: GameItem(
+                row[0], row[1], row[2], row[3] or "", row[4], row[5],
+                row[6].isoformat() if row[6] else None
+            ) for row in rows
+        }
+        return [by_id[item_id] for item_id in item_ids if item_id in by_id]
+
     @staticmethod
     def get_popular_items(limit: int = 10) -> List['GameItem']:
         """Get popular items based on transaction count"""
@@ -66,6 +84,7 @@ class GameItem:
                    COUNT(t.id) as transaction_count
             FROM game_items g
             LEFT JOIN transactions t ON g.id = t.item_id
+            WHERE g.deleted_at IS NULL
             GROUP BY g.id
             ORDER BY transaction_count DESC, g.created_at DESC
             LIMIT %s
@@ -99,7 +118,7 @@ class ProductService:
     def get_items_by_platform(platform: str) -> List[Dict[str, Any]]:
         """Get items filtered by game platform"""
         rows = db.fetch_all(
-            "SELECT id, name, price, description, currency, game_platform, created_at FROM game_items WHERE game_platform LIKE %s",
+            "SELECT id, name, price, description, currency, game_platform, created_at FROM game_items WHERE game_platform LIKE %s AND deleted_at IS NULL",
             (f"%{platform}%",)
         )
         if rows:
@@ -0,0 +1,185 @@
+from typing import Any, Callable, Dict, List, Optional
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class Job:
+    """A periodic (interval set) or one-shot task and its run metrics"""
+    def __init__(self, name: str, func: Callable, interval: Optional[float], jitter: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.running = False
+        self.cancelled = False
+        self.next_run: Optional[float] = None
+
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = None
+        self.last_started_at = None
+        self.last_error = None
+
+    def next_delay(self) -> float:
+        """The interval, spread by up to ±jitter of itself so jobs don't line up"""
+        spread = self.interval * self.jitter
+        return max(0.0, self.interval + random.uniform(-spread, spread))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "running": self.running,
+            "next_run_in": round(max(0.0, self.next_run - time.monotonic()), 1) if self.next_run is not None else None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped_overlaps": self.skipped,
+            "avg_ms": round(self.total_ms / self.runs, 1) if self.runs else None,
+            "max_ms": round(self.max_ms, 1),
+            "last_ms": round(self.last_ms, 1) if self.last_ms is not None else None,
+            "last_started_at": self.last_started_at,
+            "last_error": self.last_error
+        }
+
+
+class Scheduler:
+    """In-process scheduler for maintenance work that should stay off the request path.
+
+    One dispatcher thread sleeps until the next job is due and hands it to a
+    small thread pool. A job still running when it comes due again is skipped
+    rather than started twice, and periodic jobs are rescheduled with jitter
+    so that several server processes don't all rebuild at the same moment.
+    """
+    def __init__(self, max_workers: int = None, jitter: float = None):
+        self.enabled = os.getenv('SCHEDULER', 'true').lower() in ('1', 'true', 'yes', 'on')
+        self.max_workers = max_workers or int(os.getenv('SCHEDULER_WORKERS', 2))
+        self.jitter = jitter if jitter is not None else float(os.getenv('SCHEDULER_JITTER', 0.1))
+        self.jobs: Dict[str, Job] = {}
+        self._queue: List = []  # (due time, sequence, job)
+        self._sequence = itertools.count()
+        self._wakeup = threading.Condition()
+        self._pool = None
+        self._thread = None
+        self._stopping = False
+
+    def add_job(self, name: str, func: Callable, interval: float = None, delay: float = None,
+                jitter: float = None) -> Job:
+        """Run func every `interval` seconds, or once when interval is None.
+
+        The first run is after `delay` seconds (default: one interval, or
+        immediately for one-shot jobs). Adding a one-shot job while one of the
+        same name is still pending or running returns that one instead.
+        """
+        existing = self.jobs.get(name)
+        if existing is not None and not existing.cancelled:
+            if existing.interval is not None or interval is not None:
+                raise ValueError(f"Job '{name}' already scheduled")
+            return existing
+        if interval is not None and interval <= 0:
+            raise ValueError("interval must be positive")
+        job = Job(name, func, interval, self.jitter if jitter is None else jitter)
+        if delay is None:
+            delay = job.next_delay() if interval is not None else 0.0
+        with self._wakeup:
+            self.jobs[name] = job
+            self._push(job, delay)
+        return job
+
+    def run_once(self, name: str, func: Callable, delay: float = 0.0) -> Job:
+        return self.add_job(name, func, None, delay)
+
+    def trigger(self, name: str):
+        """Run a registered job as soon as a worker is free, keeping its schedule"""
+        job = self.jobs[name]
+        with self._wakeup:
+            self._push(job, 0.0)
+
+    def cancel(self, name: str):
+        job = self.jobs.get(name)
+        if job:
+            job.cancelled = True
+
+    def _push(self, job: Job, delay: float):
+        due = time.monotonic() + delay
+        if job.next_run is None or due < job.next_run:
+            job.next_run = due
+        heapq.heappush(self._queue, (due, next(self._sequence), job))
+        self._wakeup.notify()
+
+    def start(self):
+        """Start dispatching (once); jobs added before or after start are both fine"""
+        if not self.enabled:
+            return
+        with self._wakeup:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scheduler-job')
+            self._thread = threading.Thread(target=self._dispatch, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self, wait: bool = True):
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+    def _dispatch(self):
+        while True:
+            with self._wakeup:
+                while not self._stopping and (not self._queue or self._queue[0][0] > time.monotonic()):
+                    timeout = self._queue[0][0] - time.monotonic() if self._queue else None
+                    self._wakeup.wait(timeout)
+                if self._stopping:
+                    return
+                due, _, job = heapq.heappop(self._queue)
+                if job.cancelled or due != job.next_run:
+                    continue  # superseded by an earlier trigger
+                job.next_run = None
+                if job.running:
+                    job.skipped += 1
+                else:
+                    job.running = True
+                    self._pool.submit(self._run, job)
+                if job.interval is not None:
+                    self._push(job, job.next_delay())
+
+    def _run(self, job: Job):
+        job.last_started_at = datetime.now().isoformat(timespec="seconds")
+        start = time.perf_counter()
+        try:
+            job.func()
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            print(f"❌ Scheduled job '{job.name}' failed: {e}")
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            job.runs += 1
+            job.total_ms += elapsed
+            job.max_ms = max(job.max_ms, elapsed)
+            job.last_ms = elapsed
+            job.running = False
+            if job.interval is None and self.jobs.get(job.name) is job:
+                job.cancelled = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "workers": self.max_workers,
+            "jobs": [job.to_dict() for job in self.jobs.values()]
+        }
+
+
+scheduler = Scheduler()
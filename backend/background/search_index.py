@@ -0,0 +1,380 @@
+from typing import List, Dict, Tuple, Optional
+import sys
+import os
+import mmap
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import db
+from background.product_service import GameItem
+
+try:
+    import fcntl
+except ImportError:  # Windows: two processes may build at once, which only wastes work
+    fcntl = None
+
+# File layout, integers in the builder's byte order; item ids and sales counts
+# are unsigned 64-bit (game_items.id is BIGINT UNSIGNED), offsets unsigned 32-bit:
+#   header
+#   key_offsets[n_keys + 1]      where each name starts in the string blob
+#   posting_offsets[n_keys + 1]  where each name's item ids start in postings
+#   postings[n_postings]         item ids (64-bit), grouped by name in name order
+#   item_ids[n_items]            sorted (64-bit), with
+#   popularity[n_items]          the sales count of each item (64-bit)
+#   strings                      lowercased item names, UTF-8, sorted
+#   facet_kinds[n_facets]        FACETS index of each facet value
+#   facet_name_offsets[n_facets + 1], facet_id_offsets[n_facets + 1]
+#   facet_ids[n_facet_ids]       sorted item ids having each facet value (64-bit)
+#   facet_strings                facet values, UTF-8
+HEADER = struct.Struct('<4sHHQdIIIIIII')
+MAGIC = b'GGSI'
+FORMAT_VERSION = 3
+OFFSET, ID = 'I', 'Q'  # array typecodes of the two integer widths
+
+FACETS = ('platform', 'currency', 'price')
+# Price ranges offered as a facet: (label, lowest price, price it stays under)
+PRICE_BUCKETS = (
+    ("0-100", 0, 100),
+    ("100-500", 100, 500),
+    ("500-1000", 500, 1000),
+    ("1000-5000", 1000, 5000),
+    ("5000+", 5000, None),
+)
+
+
+def price_bucket(price: float) -> str:
+    for label, low, high in PRICE_BUCKETS:
+        if price >= low and (high is None or price < high):
+            return label
+    return PRICE_BUCKETS[0][0]
+
+
+def item_facets(item: GameItem) -> Tuple[str, str, str]:
+    """(platform, currency, price range) an item is counted under"""
+    return (item.game_platform or "General", item.currency or "PHP", price_bucket(float(item.price)))
+BYTE_ORDER = 1 if sys.byteorder == 'little' else 2
+POINTER_FILE = 'CURRENT'
+
+
+def intersect_sorted(a, b) -> List[int]:
+    """Ids present in both sorted sequences; probes the larger one by binary search"""
+    if len(a) > len(b):
+        a, b = b, a
+    found, start = [], 0
+    for value in a:
+        start = bisect_left(b, value, start)
+        if start == len(b):
+            break
+        if b[start] == value:
+            found.append(value)
+    return found
+
+
+def union_sorted(sequences) -> List[int]:
+    return sorted(set().union(*sequences))
+
+
+def _write_array(f, values: List[int], typecode: str = OFFSET):
+    f.write(array(typecode, values).tobytes())
+
+
+def build_index(directory: str, catalog_version: int) -> str:
+    """Write a new index file for the current catalog and publish it; returns its name.
+
+    The data file is written under a fresh name and only then is the CURRENT
+    pointer replaced, so readers always see either the old index or the
+    complete new one. Mapped files are never overwritten, which Windows
+    would refuse.
+    """
+    names: Dict[bytes, List[int]] = {}
+    facets: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+    for item in GameItem.fetch_all():
+        names.setdefault(item.name.lower().encode('utf-8'), []).append(item.id)
+        for kind, value in enumerate(item_facets(item)):
+            facets[(kind, value)].append(item.id)
+    rows = db.fetch_all("SELECT item_id, COUNT(*) FROM transactions GROUP BY item_id") or []
+    sales = {row[0]: row[1] for row in rows}
+
+    keys = sorted(names)
+    key_offsets, posting_offsets, postings = [0], [0], []
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+        postings.extend(names[key])
+        posting_offsets.append(len(postings))
+    item_ids = sorted(set(postings))
+    strings = b''.join(keys)
+
+    facet_keys = sorted(facets)
+    facet_names = [value.encode('utf-8') for _, value in facet_keys]
+    facet_name_offsets, facet_id_offsets, facet_ids = [0], [0], []
+    for key, encoded in zip(facet_keys, facet_names):
+        facet_name_offsets.append(facet_name_offsets[-1] + len(encoded))
+        facet_ids.extend(sorted(facets[key]))
+        facet_id_offsets.append(len(facet_ids))
+    facet_strings = b''.join(facet_names)
+
+    os.makedirs(directory, exist_ok=True)
+    name = f"index-{catalog_version}-{time.time_ns()}.bin"
+    path = os.path.join(directory, name)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER, catalog_version, time.time(),
+                            len(keys), len(postings), len(item_ids), len(strings),
+                            len(facet_keys), len(facet_ids), len(facet_strings)))
+        _write_array(f, key_offsets)
+        _write_array(f, posting_offsets)
+        _write_array(f, postings, ID)
+        _write_array(f, item_ids, ID)
+        _write_array(f, [sales.get(item_id, 0) for item_id in item_ids], ID)
+        f.write(strings)
+        _write_array(f, [kind for kind, _ in facet_keys])
+        _write_array(f, facet_name_offsets)
+        _write_array(f, facet_id_offsets)
+        _write_array(f, facet_ids, ID)
+        f.write(facet_strings)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+
+    pointer = os.path.join(directory, POINTER_FILE)
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(name)
+    for attempt in range(3):
+        try:
+            os.replace(pointer + '.tmp', pointer)
+            break
+        except PermissionError:  # Windows: a reader has the pointer open this instant
+            if attempt == 2:
+                raise
+            time.sleep(0.05)
+
+    _remove_old_files(directory, keep=name)
+    return name
+
+
+def _remove_old_files(directory: str, keep: str):
+    """Delete superseded index files; ones still mapped elsewhere are retried next build"""
+    for entry in os.listdir(directory):
+        if entry.startswith('index-') and entry != keep:
+            try:
+                os.remove(os.path.join(directory, entry))
+            except OSError:
+                pass
+
+
+def current_index_name(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, POINTER_FILE)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+class BuildLock:
+    """Cross-process lock so workers starting together build the index once"""
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, '.lock')
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a')
+        if fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+class SearchIndex:
+    """Read-only view of an index file through mmap.
+
+    Names are a sorted string table, so the trie is implicit: the names
+    sharing a prefix form one contiguous range, found by binary search, and
+    their item ids are one contiguous slice of postings. Every process maps
+    the same file, so the OS page cache holds a single copy.
+    """
+    def __init__(self, directory: str, name: str):
+        self.name = name
+        path = os.path.join(directory, name)
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size_bytes = len(self._mm)
+
+        (magic, format_version, byte_order, self.catalog_version, self.built_at,
+         self.n_keys, n_postings, n_items, n_strings,
+         n_facets, n_facet_ids, n_facet_strings) = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or format_version != FORMAT_VERSION or byte_order != BYTE_ORDER:
+            raise ValueError(f"{name} is not a search index this server can read")
+
+        # Every view into the map, so close() can release them before unmapping
+        self._views: List[memoryview] = [memoryview(self._mm)]
+        offset = HEADER.size
+
+        def view(start: int, end: int, typecode: str = None) -> memoryview:
+            part = self._views[0][start:end]
+            self._views.append(part)
+            if typecode:
+                part = part.cast(typecode)
+                self._views.append(part)
+            return part
+
+        def section(count: int, typecode: str = OFFSET):
+            nonlocal offset
+            size = count * array(typecode).itemsize
+            part = view(offset, offset + size, typecode)
+            offset += size
+            return part
+
+        self._key_offsets = section(self.n_keys + 1)
+        self._posting_offsets = section(self.n_keys + 1)
+        self._postings = section(n_postings, ID)
+        self._item_ids = section(n_items, ID)
+        self._popularity = section(n_items, ID)
+        self._strings = view(offset, offset + n_strings)
+        offset += n_strings
+
+        facet_kinds = section(n_facets)
+        facet_name_offsets = section(n_facets + 1)
+        facet_id_offsets = section(n_facets + 1)
+        facet_ids = section(n_facet_ids, ID)
+        facet_strings = view(offset, offset + n_facet_strings)
+        # facet -> value -> sorted item ids (views into the mapped file)
+        self.facets: Dict[str, Dict[str, memoryview]] = {facet: {} for facet in FACETS}
+        for i in range(n_facets):
+            value = bytes(facet_strings[facet_name_offsets[i]:facet_name_offsets[i + 1]]).decode('utf-8')
+            ids = facet_ids[facet_id_offsets[i]:facet_id_offsets[i + 1]]
+            self._views.append(ids)
+            self.facets[FACETS[facet_kinds[i]]][value] = ids
+
+    @property
+    def item_ids(self) -> memoryview:
+        """Every indexed item id, sorted"""
+        return self._item_ids
+
+    def _key_bytes(self, i: int) -> bytes:
+        return bytes(self._strings[self._key_offsets[i]:self._key_offsets[i + 1]])
+
+    def _key(self, i: int) -> str:
+        return self._key_bytes(i).decode('utf-8')
+
+    def _lower_bound(self, target: bytes) -> int:
+        lo, hi = 0, self.n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_bytes(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_range(self, prefix: str, start: int = 0) -> Tuple[int, int]:
+        """[lo, hi) of the names starting with prefix (0xff never occurs in UTF-8)"""
+        encoded = prefix.encode('utf-8')
+        lo = self._lower_bound(encoded) if start == 0 else start
+        return lo, self._lower_bound(encoded + b'\xff')
+
+    def _item_ids_in(self, lo: int, hi: int):
+        return self._postings[self._posting_offsets[lo]:self._posting_offsets[hi]]
+
+    def popularity(self, item_id: int) -> int:
+        i = bisect_left(self._item_ids, item_id)
+        if i < len(self._item_ids) and self._item_ids[i] == item_id:
+            return self._popularity[i]
+        return 0
+
+    def search_prefix(self, prefix: str) -> List[int]:
+        """Find all item IDs for names starting with prefix"""
+        lo, hi = self._prefix_range(prefix.lower())
+        return list(dict.fromkeys(self._item_ids_in(lo, hi)))
+
+    def fuzzy_search(self, query: str, max_distance: int, node_budget: int) -> List[Tuple[int, int]]:
+        """(item id, edit distance) of names starting within max_distance edits of query.
+
+        Names are visited in sorted order keeping one Levenshtein row per
+        character of the current name, so a prefix shared with the previous
+        name is never recomputed. Once every entry of a row exceeds
+        max_distance, the whole range of names below that prefix is skipped
+        with one binary search. At most node_budget rows are computed.
+        Results are ordered by distance, then by popularity.
+        """
+        query = query.lower()
+        best: Dict[int, int] = {}
+
+        def assign(lo: int, hi: int, distance: int):
+            for item_id in self._item_ids_in(lo, hi):
+                if distance < best.get(item_id, max_distance + 1):
+                    best[item_id] = distance
+
+        if max_distance == 0:
+            assign(*self._prefix_range(query), 0)
+        else:
+            root = list(range(len(query) + 1))
+            path = []  # (row, best distance along the path) per character of `prefix`
+            prefix = ""
+            visited = 0
+            i = 0
+            while i < self.n_keys and visited < node_budget:
+                key = self._key(i)
+                common = 0
+                while common < len(path) and common < len(key) and prefix[common] == key[common]:
+                    common += 1
+                del path[common:]
+
+                pruned = False
+                for char in key[common:]:
+                    if visited >= node_budget:
+                        break
+                    visited += 1
+                    previous, previous_best = path[-1] if path else (root, max_distance + 1)
+                    row = [previous[0] + 1]
+                    for j, query_char in enumerate(query, start=1):
+                        row.append(min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (query_char != char)))
+                    path.append((row, min(previous_best, row[-1])))
+                    if min(row) > max_distance:
+                        pruned = True
+                        break
+                else:
+                    if len(path) == len(key) and path and path[-1][1] <= max_distance:
+                        assign(i, i + 1, path[-1][1])
+
+                prefix = key[:len(path)]
+                if pruned:
+                    # Rows only grow from here, so every name below this prefix scores the same
+                    _, hi = self._prefix_range(prefix, start=i)
+                    if path[-1][1] <= max_distance:
+                        assign(i, hi, path[-1][1])
+                    i = hi
+                else:
+                    i += 1
+
+        return sorted(best.items(), key=lambda match: (match[1], -self.popularity(match[0]), match[0]))
+
+    def close(self) -> bool:
+        """Unmap the file; False while a view of it is still in use, so the caller can retry later.
+
+        The index must not be searched once close() has been called.
+        """
+        try:
+            for part in reversed(self._views):
+                part.release()  # releasing an already released view is a no-op
+            self._mm.close()
+        except BufferError:
+            return False
+        self._views.clear()
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            "file": self.name,
+            "names": self.n_keys,
+            "items": len(self._item_ids),
+            "size_bytes": self.size_bytes,
+            "catalog_version": self.catalog_version,
+            "built_at": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.built_at))
+        }
@@ -1,72 +1,284 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import sys
 import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import db
+from cache import LRUCache
+from changefeed import ChangeFeed, placeholders
+from price_options import price_filter_sql, price_order_sql
 from background.product_service import GameItem
+from background.search_index import (SearchIndex, BuildLock, FACETS, PRICE_BUCKETS, build_index,
+                                     current_index_name, intersect_sorted, union_sorted)
 
-class TrieNode:
-    """Node for Trie data structure"""
-    def __init__(self):
-        self.children = {}
-        self.is_end = False
-        self.item_ids = []
+# Typos tolerated in autocomplete: (minimum query length, edit distance), longest first
+FUZZY_DISTANCES = ((9, 2), (5, 1), (0, 0))
+FUZZY_MAX_DISTANCE = int(os.getenv('SEARCH_FUZZY_MAX_DISTANCE', 2))
+# Index rows a single fuzzy lookup may compute before returning what it has found
+FUZZY_NODE_BUDGET = int(os.getenv('SEARCH_FUZZY_NODE_BUDGET', 5000))
+
+# Shared memory-mapped index: where it lives, how often workers look for a newer
+# one, and how old it may be before a starting server rebuilds it anyway
+SEARCH_INDEX_DIR = os.getenv('SEARCH_INDEX_DIR', 'search_index')
+SEARCH_INDEX_CHECK_INTERVAL = float(os.getenv('SEARCH_INDEX_CHECK_INTERVAL', 2))
+SEARCH_INDEX_MAX_AGE = float(os.getenv('SEARCH_INDEX_MAX_AGE', 3600))
+# How often the scheduler checks the index against the catalog version
+SEARCH_INDEX_REFRESH_INTERVAL = float(os.getenv('SEARCH_INDEX_REFRESH_INTERVAL', 300))
+# How long a replaced index stays mapped for searches that were already using it
+SEARCH_INDEX_RETIRE_DELAY = float(os.getenv('SEARCH_INDEX_RETIRE_DELAY', 30))
+
+
+# Search result cache, and the query counts used to warm it at startup
+SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', 2000))
+SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', 60))
+SEARCH_WARMUP_QUERIES = int(os.getenv('SEARCH_WARMUP_QUERIES', 50))
+SEARCH_WARMUP_DAYS = int(os.getenv('SEARCH_WARMUP_DAYS', 7))
+SEARCH_WARMUP_INTERVAL = float(os.getenv('SEARCH_WARMUP_INTERVAL', 600))
+SEARCH_STATS_FLUSH_SECONDS = float(os.getenv('SEARCH_STATS_FLUSH_SECONDS', 60))
+# Distinct unsaved queries that force a flush when the scheduled one isn't keeping up (or isn't running)
+SEARCH_STATS_MAX_PENDING = int(os.getenv('SEARCH_STATS_MAX_PENDING', 5000))
 
-class SearchTrie:
-    """Trie data structure for efficient autocomplete"""
-    def __init__(self):
-        self.root = TrieNode()
-        self._build_trie()
-
-    def _build_trie(self):
-        """Build trie from all game items in database"""
-        items = GameItem.fetch_all()
-        for item in items:
-            self.insert(item.name.lower(), item.id)
-
-    def insert(self, word: str, item_id: int):
-        """Insert a word into the trie"""
-        node = self.root
-        for char in word:
-            if char not in node.children:
-                node.children[char] = TrieNode()
-            node = node.children[char]
-            if item_id not in node.item_ids:
-                node.item_ids.append(item_id)
-        node.is_end = True
-
-    def search_prefix(self, prefix: str) -> List[int]:
-        """Find all item IDs for words starting with prefix"""
-        node = self.root
-        for char in prefix.lower():
-            if char not in node.children:
-                return []
-            node = node.children[char]
-        
-        # Collect all product IDs from this node and its children
-        item_ids = set()
-        self._collect_item_ids(node, item_ids)
-        return list(item_ids)
 
-    def _collect_item_ids(self, node: TrieNode, item_ids: set):
-        """Recursively collect all item IDs from node and its children"""
-        item_ids.update(node.item_ids)
-        for child in node.children.values():
-            self._collect_item_ids(child, item_ids)
+def normalize_search(text: str) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share a cache entry"""
+    return " ".join((text or "").lower().split())
+
+
+def max_edit_distance(query: str) -> int:
+    """Edits allowed for a query; short queries must match exactly"""
+    for min_length, distance in FUZZY_DISTANCES:
+        if len(query) >= min_length:
+            return min(distance, FUZZY_MAX_DISTANCE)
+    return 0
+
 
 class SearchSystem:
     """Search system with both SQL and Trie-based search"""
     def __init__(self):
-        self.trie = SearchTrie()
+        self.index_dir = SEARCH_INDEX_DIR
+        self._index = None
+        self._index_checked_at = 0.0
+        # Replaced indexes still mapped: (time replaced, index), closed once searches are done with them
+        self._retired: List[Tuple[float, SearchIndex]] = []
+        self._retired_lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._rebuild_pending = False
+        self._rebuilding = False
+        # Cached results keyed on (kind, normalized query, normalized platform, limit)
+        self.results = LRUCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+        self._generation = 0
+        self._query_counts = Counter()
+        self._counts_lock = threading.Lock()
+
+    @property
+    def index(self) -> SearchIndex:
+        """Shared search index, switching to a newer one when another process publishes it"""
+        if self._index is None:
+            return self.warm_up()
+        self._check_published_index()
+        return self._index
+
+    def _check_published_index(self):
+        """Install an index another process published (clearing cached results); looks at most every few seconds"""
+        index = self._index
+        now = time.monotonic()
+        if index is None or now - self._index_checked_at < SEARCH_INDEX_CHECK_INTERVAL:
+            return
+        self._index_checked_at = now
+        self._close_retired()
+        name = current_index_name(self.index_dir)
+        if name and name != index.name:
+            try:
+                self._install(SearchIndex(self.index_dir, name))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not open search index {name}: {e}")
+
+    def warm_up(self) -> SearchIndex:
+        """Map the shared index, building it only if it is missing or out of date"""
+        with BuildLock(self.index_dir):
+            index = None
+            name = current_index_name(self.index_dir)
+            if name:
+                try:
+                    index = SearchIndex(self.index_dir, name)
+                except (OSError, ValueError):
+                    index = None
+            if (index is None or index.catalog_version != ChangeFeed.current_version()
+                    or time.time() - index.built_at > SEARCH_INDEX_MAX_AGE):
+                if index is not None:
+                    self._retire(index)
+                index = SearchIndex(self.index_dir, build_index(self.index_dir, ChangeFeed.current_version()))
+        self._install(index)
+        return index
+
+    def _install(self, index: SearchIndex):
+        previous, self._index = self._index, index
+        self._index_checked_at = time.monotonic()
+        self._clear_results()
+        if previous is not None and previous is not index:
+            self._retire(previous)
+        self._close_retired()
+
+    def _retire(self, index: SearchIndex):
+        with self._retired_lock:
+            self._retired.append((time.monotonic(), index))
+
+    def _close_retired(self):
+        """Unmap replaced indexes once searches that were using them have had time to finish"""
+        now = time.monotonic()
+        with self._retired_lock:
+            due = [entry for entry in self._retired if now - entry[0] >= SEARCH_INDEX_RETIRE_DELAY]
+        for entry in due:
+            replaced_at, index = entry
+            if index.close():
+                with self._retired_lock:
+                    self._retired.remove(entry)
+            else:
+                print(f"⚠️ Search index {index.name} is still in use, will retry unmapping it")
+
+    def invalidate(self):
+        """Rebuild the index in the background after a catalog write; cached results go now"""
+        self._clear_results()
+        with self._rebuild_lock:
+            self._rebuild_pending = True
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_until_current, name='search-index', daemon=True).start()
+
+    def _rebuild_until_current(self):
+        # Writes arriving during a rebuild are folded into one more rebuild
+        while True:
+            with self._rebuild_lock:
+                if not self._rebuild_pending:
+                    self._rebuilding = False
+                    return
+                self._rebuild_pending = False
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ Search index rebuild failed: {e}")
+
+    def _clear_results(self):
+        self._generation += 1
+        self.results.clear()
+
+    def is_stale(self) -> bool:
+        index = self._index
+        return (index is None or index.catalog_version != ChangeFeed.current_version()
+                or time.time() - index.built_at > SEARCH_INDEX_MAX_AGE)
+
+    def refresh_if_stale(self) -> bool:
+        """Scheduled check: pick up a newer shared index, else rebuild one that is out of date"""
+        self.index  # switch to whatever another process published
+        if not self.is_stale():
+            return False
+        self.refresh()
+        return True
+
+    def refresh(self):
+        """Rebuild the index now and publish it to every worker"""
+        with BuildLock(self.index_dir):
+            name = build_index(self.index_dir, ChangeFeed.current_version())
+        self._install(SearchIndex(self.index_dir, name))
 
-    def sql_search(self, keyword: str, limit: int = 20) -> List[Dict[str, Any]]:
+    def cached_search(self, keyword: str, limit: int = 10, min_price: float = None,
+                      max_price: float = None, sort: str = None) -> List[Dict[str, Any]]:
+        """hybrid_search through the result cache"""
+        return self._cached(("search", normalize_search(keyword), "", limit), (min_price, max_price, sort))
+
+    def cached_platform_search(self, platform: str, keyword: str = "", min_price: float = None,
+                               max_price: float = None, sort: str = None) -> List[Dict[str, Any]]:
+        """search_by_platform through the result cache"""
+        return self._cached(("platform", normalize_search(keyword), normalize_search(platform), 0), (min_price, max_price, sort))
+
+    def _cached(self, query_key: Tuple[str, str, str, int], price: Tuple = (None, None, None),
+                record: bool = True) -> List[Dict[str, Any]]:
+        # Only unfiltered queries are counted for warm-up; price filters vary too much
+        if record and price == (None, None, None):
+            self._record_query(query_key)
+        key = query_key + price
+        # A rebuild in another worker must reach this worker's cached results too
+        self._check_published_index()
+        results = self.results.get(key)
+        if results is None:
+            generation = self._generation
+            kind, query, platform, limit = query_key
+            if kind == "search":
+                results = self.hybrid_search(query, limit, *price)
+            else:
+                results = self.search_by_platform(platform, query, *price)
+            # Don't cache results computed while the catalog changed underneath
+            if generation == self._generation:
+                self.results.set(key, results)
+        return results
+
+    def _record_query(self, key: Tuple[str, str, str, int]):
+        if len(key[1]) > 200 or len(key[2]) > 100:
+            return
+        # Saved by the scheduled search_stats_flush job, not on the request path
+        with self._counts_lock:
+            self._query_counts[key] += 1
+            overflowing = len(self._query_counts) >= SEARCH_STATS_MAX_PENDING
+        if overflowing:
+            # Without the scheduler (SCHEDULER=false, or it failed to start) this is the only flush
+            self.flush_query_counts()
+
+    def flush_query_counts(self):
+        """Add the queries counted since the last flush to search_queries"""
+        with self._counts_lock:
+            counts, self._query_counts = self._query_counts, Counter()
+        if not counts:
+            return
+        try:
+            with db.transaction() as tx:
+                for (kind, query, platform, limit), hits in counts.items():
+                    tx.execute(
+                        "UPDATE search_queries SET hits = hits + %s, last_seen = CURRENT_TIMESTAMP "
+                        "WHERE kind = %s AND query = %s AND platform = %s AND result_limit = %s",
+                        (hits, kind, query, platform, limit)
+                    )
+                    if not tx.rowcount:
+                        tx.execute(
+                            "INSERT INTO search_queries (kind, query, platform, result_limit, hits) VALUES (%s, %s, %s, %s, %s)",
+                            (kind, query, platform, limit, hits)
+                        )
+        except Exception as e:
+            print(f"⚠️ Could not save search query counts: {e}")
+
+    def warm_cache(self) -> int:
+        """Fill the result cache with the most frequent recent queries"""
+        rows = db.fetch_all(
+            "SELECT kind, query, platform, result_limit FROM search_queries WHERE last_seen >= %s ORDER BY hits DESC LIMIT %s",
+            (datetime.now() - timedelta(days=SEARCH_WARMUP_DAYS), SEARCH_WARMUP_QUERIES)
+        ) or []
+        for kind, query, platform, limit in rows:
+            self._cached((kind, query, platform, limit), record=False)
+        print(f"🔥 Search cache warmed with {len(rows)} frequent queries")
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index": self._index.stats() if self._index else None,
+            "result_cache": self.results.stats(),
+            "unsaved_query_counts": sum(self._query_counts.values()),
+            "retired_indexes": len(self._retired)
+        }
+
+    def sql_search(self, keyword: str, limit: int = 20, min_price: float = None,
+                   max_price: float = None, sort: str = None) -> List[Dict[str, Any]]:
         """Search using SQL LIKE for comprehensive results"""
-        rows = db.fetch_all('''
-            SELECT id, name, price, description, currency, game_platform, created_at 
-            FROM game_items 
-            WHERE name LIKE %s OR description LIKE %s OR game_platform LIKE %s
+        price_clause, price_params = price_filter_sql('g', min_price, max_price)
+        order = price_order_sql('g', sort) if sort else ""
+        rows = db.fetch_all(f'''
+            SELECT g.id, g.name, g.price, g.description, g.currency, g.game_platform, g.created_at 
+            FROM game_items g 
+            WHERE g.deleted_at IS NULL AND (g.name LIKE %s OR g.description LIKE %s OR g.game_platform LIKE %s){price_clause}{order}
             LIMIT %s
-        ''', (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%", limit))
+        ''', (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%") + price_params + (limit,))
         
         if rows:
             return [
@@ -78,21 +290,15 @@ class SearchSystem:
         return []
 
     def autocomplete(self, prefix: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Get autocomplete suggestions using trie (fast)"""
+        """Get autocomplete suggestions from the search index (fast), tolerating typos in longer prefixes"""
         if len(prefix) < 2:
             return []
         
-        item_ids = self.trie.search_prefix(prefix)[:limit]
-        results = []
-        
-        for item_id in item_ids:
-            item = GameItem.fetch_by_id(item_id)
-            if item:
-                results.append(item.to_dict())
-        
-        return results
+        matches = self.index.fuzzy_search(prefix, max_edit_distance(prefix), FUZZY_NODE_BUDGET)[:limit]
+        return [item.to_dict() for item in GameItem.fetch_by_ids([item_id for item_id, _ in matches])]
 
-    def hybrid_search(self, keyword: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def hybrid_search(self, keyword: str, limit: int = 10, min_price: float = None,
+                      max_price: float = None, sort: str = None) -> List[Dict[str, Any]]:
         """Combine trie and SQL search for best results"""
         # Use trie for quick prefix matching
         if len(keyword) >= 2:
@@ -101,7 +307,7 @@ class SearchSystem:
             trie_results = []
         
         # Use SQL for comprehensive search
-        sql_results = self.sql_search(keyword, limit - len(trie_results))
+        sql_results = self.sql_search(keyword, limit - len(trie_results), min_price, max_price, sort)
         
         # Combine and remove duplicates
         combined = {}
@@ -109,22 +315,100 @@ class SearchSystem:
             if item['id'] not in combined:
                 combined[item['id']] = item
         
-        return list(combined.values())[:limit]
+        results = list(combined.values())
+        if min_price is not None or max_price is not None or sort:
+            results = self._filter_by_price(results, min_price, max_price, sort)
+        return results[:limit]
+
+    @staticmethod
+    def _filter_by_price(results: List[Dict[str, Any]], min_price: float, max_price: float, sort: str) -> List[Dict[str, Any]]:
+        """Let the database drop and reorder already-found items by their denomination prices"""
+        if not results:
+            return results
+        ids = tuple(item['id'] for item in results)
+        price_clause, price_params = price_filter_sql('g', min_price, max_price)
+        rows = db.fetch_all(
+            f"SELECT g.id FROM game_items g WHERE g.id IN ({placeholders(ids)}){price_clause}"
+            + (price_order_sql('g', sort) if sort else ""),
+            ids + price_params
+        ) or []
+        by_id = {item['id']: item for item in results}
+        if sort:
+            return [by_id[row[0]] for row in rows]
+        kept = {row[0] for row in rows}
+        return [item for item in results if item['id'] in kept]
+
+    def _text_matches(self, keyword: str) -> List[int]:
+        """Sorted ids of items whose name starts with, or name/description contains, the keyword"""
+        ids = set(self.index.search_prefix(keyword))
+        rows = db.fetch_all(
+            "SELECT id FROM game_items WHERE deleted_at IS NULL AND (name LIKE %s OR description LIKE %s)",
+            (f"%{keyword}%", f"%{keyword}%"),
+            cache_ttl=10
+        ) or []
+        ids.update(row[0] for row in rows)
+        return sorted(ids)
+
+    def faceted_search(self, keyword: str = "", filters: Dict[str, List[str]] = None,
+                       limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Items matching the keyword and facet filters, plus counts for every facet value.
+
+        filters maps a facet (platform, currency, price) to the accepted values.
+        Each facet's counts apply the other facets' filters but not its own, so
+        the sidebar shows what picking another value would return.
+        """
+        index = self.index
+        filters = {facet: values for facet, values in (filters or {}).items() if values}
+        base = self._text_matches(normalize_search(keyword)) if keyword else index.item_ids
+
+        selected = {facet: union_sorted(index.facets[facet].get(value, ()) for value in values)
+                    for facet, values in filters.items()}
+
+        def apply(ids, skip: str = None):
+            for facet, facet_ids in selected.items():
+                if facet != skip:
+                    ids = intersect_sorted(ids, facet_ids)
+            return ids
+
+        facets = {}
+        for facet in FACETS:
+            pool = apply(base, skip=facet)
+            facets[facet] = [
+                {"value": value, "count": count, "selected": value in filters.get(facet, ())}
+                for value, count in ((value, len(intersect_sorted(pool, ids))) for value, ids in index.facets[facet].items())
+                if count or value in filters.get(facet, ())
+            ]
+            if facet == 'price':
+                order = [label for label, _, _ in PRICE_BUCKETS]
+                facets[facet].sort(key=lambda entry: order.index(entry["value"]))
+            else:
+                facets[facet].sort(key=lambda entry: (-entry["count"], entry["value"]))
+
+        matched = apply(base)
+        # Best sellers first, like autocomplete
+        ranked = sorted(matched, key=lambda item_id: (-index.popularity(item_id), item_id))
+        page = ranked[offset:offset + limit]
+        results = [item.to_dict() for item in GameItem.fetch_by_ids(page)]
+
+        return {"results": results, "total": len(matched), "facets": facets}
 
-    def search_by_platform(self, platform: str, keyword: str = "") -> List[Dict[str, Any]]:
+    def search_by_platform(self, platform: str, keyword: str = "", min_price: float = None,
+                           max_price: float = None, sort: str = None) -> List[Dict[str, Any]]:
         """Search within specific platform"""
+        price_clause, price_params = price_filter_sql('g', min_price, max_price)
+        order = price_order_sql('g', sort) if sort else ""
         if keyword:
-            rows = db.fetch_all('''
-                SELECT id, name, price, description, currency, game_platform, created_at 
-                FROM game_items 
-                WHERE game_platform LIKE %s AND (name LIKE %s OR description LIKE %s)
-            ''', (f"%{platform}%", f"%{keyword}%", f"%{keyword}%"))
+            rows = db.fetch_all(f'''
+                SELECT g.id, g.name, g.price, g.description, g.currency, g.game_platform, g.created_at 
+                FROM game_items g 
+                WHERE g.game_platform LIKE %s AND (g.name LIKE %s OR g.description LIKE %s) AND g.deleted_at IS NULL{price_clause}{order}
+            ''', (f"%{platform}%", f"%{keyword}%", f"%{keyword}%") + price_params, cache_ttl=10)
         else:
-            rows = db.fetch_all('''
-                SELECT id, name, price, description, currency, game_platform, created_at 
-                FROM game_items 
-                WHERE game_platform LIKE %s
-            ''', (f"%{platform}%",))
+            rows = db.fetch_all(f'''
+                SELECT g.id, g.name, g.price, g.description, g.currency, g.game_platform, g.created_at 
+                FROM game_items g 
+                WHERE g.game_platform LIKE %s AND g.deleted_at IS NULL{price_clause}{order}
+            ''', (f"%{platform}%",) + price_params, cache_ttl=10)
         
         if rows:
             return [
@@ -0,0 +1 @@
+"""Benchmark tooling: database seeding, load testing and report comparison"""
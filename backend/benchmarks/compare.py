@@ -0,0 +1,65 @@
+"""Compare two load test reports endpoint by endpoint.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+import argparse
+import json
+from typing import Dict, Any
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "   n/a"
+    return f"{(after - before) / before * 100:+6.1f}%"
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-endpoint before/after values for each metric"""
+    result = {}
+    labels = sorted(set(baseline["endpoints"]) | set(candidate["endpoints"]))
+    for label in labels + ["total"]:
+        before = baseline["total"] if label == "total" else baseline["endpoints"].get(label)
+        after = candidate["total"] if label == "total" else candidate["endpoints"].get(label)
+        result[label] = {
+            metric: {
+                "before": before.get(metric) if before else None,
+                "after": after.get(metric) if after else None
+            } for metric in METRICS
+        }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff two load test reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--json", action="store_true", help="Print the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    result = compare(baseline, candidate)
+    if args.json:
+        print(json.dumps(result, indent=2, sort_keys=True))
+        return
+
+    print(f"{'endpoint':45} " + " ".join(f"{m:>24}" for m in METRICS))
+    for label, metrics in result.items():
+        cells = []
+        for metric in METRICS:
+            before, after = metrics[metric]["before"], metrics[metric]["after"]
+            if before is None or after is None:
+                cells.append(f"{'-':>24}")
+            else:
+                cells.append(f"{before:>8.1f} → {after:>7.1f} {change(before, after)}")
+        print(f"{label:45} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""Drive the API with realistic traffic mixes and report per-endpoint latency.
+
+Usage (from the backend directory, with the API server running):
+    python -m benchmarks.load_test --manifest bench_manifest.json \
+        --mix browse=60,search=25,purchase=10,admin=5 --concurrency 16 --duration 60 \
+        --output bench_results.json
+
+The report is JSON with throughput and p50/p95/p99 latency per endpoint, so two
+runs can be compared with benchmarks.compare.
+"""
+import argparse
+import http.client
+import json
+import math
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple, Any
+from urllib.parse import urlsplit, quote
+
+SCENARIOS = ("browse", "search", "purchase", "signup", "admin", "health")
+DEFAULT_MIX = {"browse": 60, "search": 25, "purchase": 10, "admin": 5}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class Recorder:
+    """Collects latencies per endpoint label across all worker threads"""
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.status_codes: Dict[str, Dict[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, label: str, latency_ms: float, status: int, ok: bool):
+        with self._lock:
+            self.latencies.setdefault(label, []).append(latency_ms)
+            codes = self.status_codes.setdefault(label, {})
+            codes[status] = codes.get(status, 0) + 1
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        all_latencies = []
+        for label in sorted(self.latencies):
+            values = sorted(self.latencies[label])
+            all_latencies.extend(values)
+            endpoints[label] = {
+                "requests": len(values),
+                "errors": self.errors.get(label, 0),
+                "throughput_rps": round(len(values) / elapsed, 2),
+                "mean_ms": round(sum(values) / len(values), 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(values[-1], 2),
+                "status_codes": {str(k): v for k, v in sorted(self.status_codes[label].items())}
+            }
+        all_latencies.sort()
+        return {
+            "endpoints": endpoints,
+            "total": {
+                "requests": len(all_latencies),
+                "errors": sum(self.errors.values()),
+                "throughput_rps": round(len(all_latencies) / elapsed, 2),
+                "p50_ms": round(percentile(all_latencies, 50), 2),
+                "p95_ms": round(percentile(all_latencies, 95), 2),
+                "p99_ms": round(percentile(all_latencies, 99), 2)
+            }
+        }
+
+
+class Client:
+    """Keep-alive HTTP client for one worker thread"""
+    def __init__(self, base_url: str, recorder: Recorder, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.recorder = recorder
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method: str, path: str, label: str, body: Any = None) -> Tuple[int, Any]:
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        start = time.perf_counter()
+        status, data = 0, None
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.conn.request(method, self.prefix + path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            raw = response.read()
+            status = response.status
+            if response.getheader("Connection", "").lower() == "close" or response.version == 10:
+                self.conn.close()
+                self.conn = None
+            try:
+                data = json.loads(raw) if raw else None
+            except ValueError:
+                data = None
+        except (OSError, http.client.HTTPException):
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+        latency_ms = (time.perf_counter() - start) * 1000
+        ok = 200 <= status < 300 and not (isinstance(data, dict) and data.get("success") is False)
+        self.recorder.record(f"{method} {label}", latency_ms, status, ok)
+        return status, data
+
+
+class Scenarios:
+    """User sessions that make up the traffic mixes"""
+    def __init__(self, manifest: Dict[str, Any]):
+        self.item_ids = manifest["item_ids"]
+        self.user_ids = manifest["user_ids"]
+        self.usernames = manifest.get("usernames") or []
+        self.password = manifest.get("password", "benchpass")
+        self.item_names = manifest.get("item_names") or ["Mobile Legends"]
+        self.platforms = ["MOBA", "RPG", "FPS", "Battle Royale", "Sandbox"]
+
+    def random_item(self, rng: random.Random) -> int:
+        return rng.randint(*self.item_ids)
+
+    def random_user(self, rng: random.Random) -> int:
+        return rng.randint(*self.user_ids)
+
+    def browse(self, client: Client, rng: random.Random):
+        client.request("GET", "/api/items", "/api/items")
+        client.request("GET", "/api/promos", "/api/promos")
+        client.request("GET", "/api/news", "/api/news")
+        for _ in range(rng.randint(1, 3)):
+            client.request("GET", f"/api/items/{self.random_item(rng)}", "/api/items/<id>")
+        platform_name = rng.choice(self.platforms)
+        client.request("GET", f"/api/items/platform/{quote(platform_name)}", "/api/items/platform/<platform>")
+        client.request("GET", f"/api/search/platform?platform={quote(platform_name)}", "/api/search/platform")
+        client.request("GET", f"/api/items/search?q={quote(rng.choice(self.platforms))}", "/api/items/search")
+
+    def search(self, client: Client, rng: random.Random):
+        """Search-as-you-type: one autocomplete call per keystroke, then a full search"""
+        term = rng.choice(self.item_names).lower()
+        if rng.random() < 0.2 and len(term) > 4:
+            position = rng.randrange(2, len(term))
+            term = term[:position] + rng.choice("aeiou") + term[position + 1:]
+        typed_length = rng.randint(3, min(len(term), 12)) if len(term) >= 3 else len(term)
+        for end in range(2, typed_length + 1):
+            client.request("GET", f"/api/search/autocomplete?prefix={quote(term[:end])}&limit=5",
+                           "/api/search/autocomplete")
+        client.request("GET", f"/api/search?q={quote(term[:typed_length])}&limit=10", "/api/search")
+
+    def purchase(self, client: Client, rng: random.Random):
+        if self.usernames:
+            client.request("POST", "/api/auth/login", "/api/auth/login",
+                           {"username_or_email": rng.choice(self.usernames), "password": self.password})
+        user_id = self.random_user(rng)
+        item_id = self.random_item(rng)
+        client.request("GET", f"/api/items/{item_id}", "/api/items/<id>")
+        client.request("POST", "/api/transactions/purchase", "/api/transactions/purchase",
+                       {"user_id": user_id, "item_id": item_id, "quantity": 1,
+                        "final_price": round(rng.uniform(50, 500), 2)})
+        client.request("GET", f"/api/transactions/user/{user_id}", "/api/transactions/user/<id>")
+        client.request("GET", f"/api/auth/profile/{user_id}", "/api/auth/profile/<id>")
+
+    def signup(self, client: Client, rng: random.Random):
+        tag = f"{int(time.time() * 1000)}_{rng.getrandbits(32):08x}"
+        client.request("POST", "/api/auth/signup", "/api/auth/signup",
+                       {"username": f"load_{tag}", "email": f"load_{tag}@bench.local", "password": "loadtest"})
+
+    def admin(self, client: Client, rng: random.Random):
+        client.request("GET", "/api/transactions/all", "/api/transactions/all")
+
+        if rng.random() < 0.3:
+            _, data = client.request("POST", "/api/news", "/api/news",
+                                     {"title": "Load test news", "description": "Benchmark entry",
+                                      "date": datetime.now().strftime("%Y-%m-%d"), "icon": "📢"})
+            news_id = (data or {}).get("news_id")
+            if news_id:
+                client.request("PUT", f"/api/news/{news_id}", "/api/news/<id>",
+                               {"title": "Load test news (edited)", "description": "Benchmark entry",
+                                "date": datetime.now().strftime("%Y-%m-%d"), "icon": "📢"})
+                client.request("DELETE", f"/api/news/{news_id}", "/api/news/<id>")
+
+        if rng.random() < 0.2:
+            _, data = client.request("POST", "/api/promos", "/api/promos",
+                                     {"image": "data:image/png;base64,iVBORw0KGgo=", "title": "Load test promo"})
+            promo_id = (data or {}).get("promo_id")
+            if promo_id:
+                client.request("DELETE", f"/api/promos/{promo_id}", "/api/promos/<id>")
+
+        if rng.random() < 0.1:
+            _, data = client.request("POST", "/api/admin/items", "/api/admin/items", {
+                "name": f"Load Test Item {rng.getrandbits(24)}", "description": "Benchmark item",
+                "price": 10, "currency": "PHP", "game_platform": "Benchmark",
+                "price_options": [{"amount": 10, "price": 10.0}]
+            })
+            item_id = (data or {}).get("item_id")
+            if item_id:
+                client.request("DELETE", f"/api/admin/items/{item_id}", "/api/admin/items/<id>")
+
+    def health(self, client: Client, rng: random.Random):
+        client.request("GET", "/api/health", "/api/health")
+        client.request("GET", "/api/ready", "/api/ready")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def run(base_url: str, manifest: Dict[str, Any], mix: Dict[str, float], concurrency: int,
+        duration: float, warmup: float, seed: int, timeout: float) -> Dict[str, Any]:
+    scenarios = Scenarios(manifest)
+    for name in mix:
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}'")
+    names = list(mix)
+    weights = [mix[n] for n in names]
+
+    recorder = Recorder()
+    warmup_recorder = Recorder()
+    measuring = threading.Event()
+    stop = threading.Event()
+
+    def worker(index: int):
+        rng = random.Random(seed * 1000 + index)
+        warm_client = Client(base_url, warmup_recorder, timeout)
+        client = Client(base_url, recorder, timeout)
+        while not stop.is_set():
+            scenario = getattr(scenarios, rng.choices(names, weights)[0])
+            scenario(client if measuring.is_set() else warm_client, rng)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+
+    if warmup:
+        print(f"🔥 Warming up for {warmup:.0f}s...")
+        time.sleep(warmup)
+    measuring.set()
+    print(f"📈 Measuring for {duration:.0f}s with {concurrency} workers...")
+    start = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join(timeout + 5)
+    elapsed = time.perf_counter() - start
+
+    report = recorder.report(elapsed)
+    report["config"] = {
+        "base_url": base_url,
+        "mix": mix,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "warmup_s": warmup,
+        "seed": seed,
+        "dataset": manifest.get("counts"),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "host": platform.node()
+    }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the GameGate API")
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--manifest", default="bench_manifest.json", help="Written by benchmarks.seed")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help="Weighted scenarios: " + ", ".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    report = run(args.base_url, manifest, parse_mix(args.mix), args.concurrency,
+                 args.duration, args.warmup, args.seed, args.timeout)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"📝 Wrote report to {args.output}")
+    else:
+        print(text)
+
+    total = report["total"]
+    print(f"✅ {total['requests']} requests, {total['errors']} errors, {total['throughput_rps']} req/s, "
+          f"p50 {total['p50_ms']} ms, p95 {total['p95_ms']} ms, p99 {total['p99_ms']} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
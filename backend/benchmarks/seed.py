@@ -0,0 +1,162 @@
+"""Seed a local database with reproducible benchmark data.
+
+Usage (from the backend directory):
+    python -m benchmarks.seed --items 200 --users 5000 --transactions 1000000
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import db
+from price_options import migrate_json_price_options
+
+BENCH_PASSWORD = "benchpass"
+BENCH_SALT = "0123456789abcdef0123456789abcdef"
+
+GAMES = [
+    ("Mobile Legends", "MOBA", "Diamonds"),
+    ("League of Legends", "MOBA", "RP"),
+    ("Dota 2", "MOBA", "Battle Points"),
+    ("Genshin Impact", "RPG", "Genesis Crystals"),
+    ("Honkai Star Rail", "RPG", "Oneiric Shards"),
+    ("Ragnarok Origin", "RPG", "Nyan Berry"),
+    ("Valorant", "FPS", "VP"),
+    ("Call of Duty Mobile", "FPS", "CP"),
+    ("Free Fire", "Battle Royale", "Diamonds"),
+    ("PUBG Mobile", "Battle Royale", "UC"),
+    ("Roblox", "Sandbox", "Robux"),
+    ("Minecraft", "Sandbox", "Minecoins"),
+]
+
+AMOUNTS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def fake_image(rng: random.Random, size_kb: int) -> str:
+    """Random payload shaped like the base64 data URLs the admin panel uploads"""
+    raw = rng.getrandbits(size_kb * 1024 * 8).to_bytes(size_kb * 1024, 'little') if size_kb else b""
+    return "data:image/png;base64," + base64.b64encode(raw).decode()
+
+
+def build_items(rng: random.Random, count: int, image_kb: int) -> List[Tuple]:
+    items = []
+    for i in range(count):
+        game, platform, currency_name = GAMES[i % len(GAMES)]
+        name = f"{game} {currency_name}" if i < len(GAMES) else f"{game} {currency_name} Pack {i // len(GAMES)}"
+        options = sorted(rng.sample(AMOUNTS, rng.randint(3, len(AMOUNTS))))
+        price_options = [{"amount": a, "price": round(a * rng.uniform(0.9, 1.3), 2)} for a in options]
+        items.append((
+            name,
+            f"Top up {currency_name} for {game}",
+            price_options[0]["price"],
+            "PHP",
+            platform,
+            json.dumps(price_options),
+            fake_image(rng, image_kb),
+            fake_image(rng, max(1, image_kb // 8)) if image_kb else None,
+        ))
+    return items
+
+
+def insert_batched(query: str, rows, batch_size: int, label: str, total: int):
+    """Insert rows in executemany batches, printing progress as we go"""
+    batch = []
+    done = 0
+    start = time.perf_counter()
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            if not db.execute_many(query, batch):
+                raise RuntimeError(f"Failed to insert {label}")
+            done += len(batch)
+            batch = []
+            rate = done / max(time.perf_counter() - start, 1e-9)
+            print(f"   {label}: {done}/{total} ({rate:,.0f} rows/s)", flush=True)
+    if batch:
+        if not db.execute_many(query, batch):
+            raise RuntimeError(f"Failed to insert {label}")
+        done += len(batch)
+    print(f"✅ Seeded {done} {label} in {time.perf_counter() - start:.1f}s")
+
+
+def id_range(table: str) -> List[int]:
+    row = db.fetch_one(f"SELECT MIN(id), MAX(id) FROM {table}")
+    return [row[0], row[1]] if row and row[0] is not None else [None, None]
+
+
+def seed(items: int, users: int, transactions: int, image_kb: int, batch_size: int, seed_value: int) -> dict:
+    rng = random.Random(seed_value)
+    db.init_schema()
+
+    print(f"🌱 Seeding {items} items, {users} users, {transactions} transactions (seed={seed_value})")
+    insert_batched(
+        "INSERT INTO game_items (name, description, price, currency, game_platform, price_options, image_data, currency_icon) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+        build_items(rng, items, image_kb), max(1, batch_size // 100), "items", items
+    )
+    # Items are bulk-inserted with JSON options; move them into item_price_options
+    migrate_json_price_options()
+
+    password_hash = hashlib.sha256((BENCH_PASSWORD + BENCH_SALT).encode()).hexdigest()
+    run_tag = f"{seed_value}_{int(time.time())}"
+    insert_batched(
+        "INSERT INTO users (username, email, password_hash, role) VALUES (%s, %s, %s, %s)",
+        ((f"bench_{run_tag}_{i}", f"bench_{run_tag}_{i}@bench.local", f"{BENCH_SALT}${password_hash}", "user")
+         for i in range(users)),
+        batch_size, "users", users
+    )
+
+    item_ids = id_range("game_items")
+    user_ids = id_range("users")
+    if transactions and (item_ids[0] is None or user_ids[0] is None):
+        raise RuntimeError("Cannot seed transactions without items and users")
+
+    started = datetime.now() - timedelta(days=365)
+    insert_batched(
+        "INSERT INTO transactions (user_id, item_id, status, final_price, quantity, created_at) VALUES (%s, %s, %s, %s, %s, %s)",
+        ((rng.randint(*user_ids), rng.randint(*item_ids), "completed",
+          round(rng.uniform(50, 5000), 2), rng.choice((1, 1, 1, 2, 3)),
+          started + timedelta(seconds=rng.randint(0, 365 * 24 * 3600)))
+         for _ in range(transactions)),
+        batch_size, "transactions", transactions
+    )
+
+    names = db.fetch_all("SELECT DISTINCT name FROM game_items LIMIT 500") or []
+    return {
+        "seed": seed_value,
+        "run_tag": run_tag,
+        "password": BENCH_PASSWORD,
+        "usernames": [f"bench_{run_tag}_{i}" for i in range(min(users, 1000))],
+        "item_ids": item_ids,
+        "user_ids": user_ids,
+        "item_names": [row[0] for row in names],
+        "counts": {"items": items, "users": users, "transactions": transactions}
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the GameGate database with benchmark data")
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--image-kb", type=int, default=32, help="Size of each generated item image")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--manifest", default="bench_manifest.json",
+                        help="Where to write ids and names the load test should use")
+    args = parser.parse_args(argv)
+
+    manifest = seed(args.items, args.users, args.transactions, args.image_kb, args.batch_size, args.seed)
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    print(f"📝 Wrote manifest to {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Sell out a limited-stock item from many threads and check nothing was oversold.
+
+Usage (from the backend directory, against a benchmark database):
+    python -m benchmarks.stock_contention --stock 2000 --threads 32 --shards 1,16 \
+        --output stock_results.json
+
+Each run limits a fresh item to --stock sales split over the given number of
+counter shards, then buys it through TransactionService.purchase_item until it
+is sold out. A shards=1 run is the single hot row baseline. The run fails
+(exit status 1) if more purchases succeed than there was stock, if stock is left
+over, or if the transactions table disagrees with either.
+
+Throughput differences between shard counts show up on MySQL, where each shard
+is its own row lock; SQLite serializes all writers, so there it only checks
+correctness.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import db
+from items import ItemService
+from stock import StockService
+from transactions import TransactionService
+from benchmarks.load_test import percentile
+
+
+def create_buyers(count: int, run_tag: str) -> List[int]:
+    password_hash = hashlib.sha256(run_tag.encode()).hexdigest()
+    rows = [(f"stock_{run_tag}_{i}", f"stock_{run_tag}_{i}@bench.local", f"{run_tag}${password_hash}", "user")
+            for i in range(count)]
+    if not db.execute_many("INSERT INTO users (username, email, password_hash, role) VALUES (%s, %s, %s, %s)", rows):
+        raise RuntimeError("Failed to create benchmark users")
+    found = db.fetch_all("SELECT id FROM users WHERE username LIKE %s", (f"stock_{run_tag}_%",), use_primary=True)
+    return [row[0] for row in found]
+
+
+def create_item(name: str) -> int:
+    result = ItemService.add_game_item(name, "Limited stock benchmark item", 100.0, "PHP", "Benchmark")
+    if not result.get("success"):
+        raise RuntimeError(f"Failed to create benchmark item: {result.get('error')}")
+    return result["item_id"]
+
+
+def sell_out(item_id: int, buyers: List[int], threads: int) -> Dict[str, Any]:
+    """Buy one unit at a time from every thread until the item reports out of stock"""
+    latencies: List[float] = []
+    outcomes = {"sold": 0, "out_of_stock": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        mine = []
+        counts = {"sold": 0, "out_of_stock": 0, "failed": 0}
+        while True:
+            start = time.perf_counter()
+            result = TransactionService.purchase_item(rng.choice(buyers), item_id, 1)
+            elapsed = (time.perf_counter() - start) * 1000
+            if result["success"]:
+                counts["sold"] += 1
+                mine.append(elapsed)
+            elif result.get("error") == "Out of stock":
+                counts["out_of_stock"] += 1
+                break
+            else:
+                counts["failed"] += 1  # lock timeouts, deadlocks: retried like a client would
+        with lock:
+            latencies.extend(mine)
+            for key, value in counts.items():
+                outcomes[key] += value
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return dict(outcomes, **{
+        "seconds": round(elapsed, 3),
+        "purchases_per_second": round(outcomes["sold"] / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2)
+    })
+
+
+def run(stock: int, shards: int, threads: int, buyers: List[int], run_tag: str) -> Dict[str, Any]:
+    item_id = create_item(f"Stock Benchmark {run_tag} x{shards}")
+    result = StockService.set_stock(item_id, stock, shards)
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+
+    print(f"🛒 Selling {stock} units over {shards} shard(s) with {threads} threads...", flush=True)
+    report = sell_out(item_id, buyers, threads)
+
+    remaining = StockService.get_stock(item_id)["remaining"]
+    recorded = db.fetch_one("SELECT COUNT(*) FROM transactions WHERE item_id = %s", (item_id,), use_primary=True)[0]
+    report.update({"item_id": item_id, "shards": shards, "stock": stock, "remaining": remaining,
+                   "transactions_recorded": recorded})
+    report["oversold"] = report["sold"] > stock or recorded > stock
+    report["consistent"] = report["sold"] == recorded == stock and remaining == 0
+    ItemService.delete_item(item_id)
+
+    status = "✅" if report["consistent"] else "❌"
+    print(f"{status} shards={shards}: sold {report['sold']}/{stock}, {remaining} left, "
+          f"{report['purchases_per_second']} purchases/s, p99 {report['p99_ms']} ms, "
+          f"{report['failed']} failed attempts", flush=True)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sharded stock counters under purchase contention")
+    parser.add_argument("--stock", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--shards", default="1,16", help="Comma-separated shard counts to compare")
+    parser.add_argument("--buyers", type=int, default=200, help="Users to spread the purchases over")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    db.init_schema()
+    run_tag = str(int(time.time()))
+    buyers = create_buyers(args.buyers, run_tag)
+    runs = [run(args.stock, int(shards), args.threads, buyers, run_tag) for shards in args.shards.split(",")]
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "backend": db.backend.name,
+        "threads": args.threads,
+        "runs": runs
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Wrote report to {args.output}")
+    if not all(r["consistent"] for r in runs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
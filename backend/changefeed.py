@@ -0,0 +1,163 @@
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+from database import db, Transaction
+
+# Tables whose changes are published to delta-sync clients
+TRACKED_TABLES = ('game_items', 'news', 'promos')
+# How long change_log entries are kept; clients whose `since` is older get a full listing
+CHANGE_LOG_RETENTION_DAYS = float(os.getenv('CHANGE_LOG_RETENTION_DAYS', 7))
+CHANGE_LOG_PRUNE_INTERVAL = float(os.getenv('CHANGE_LOG_PRUNE_INTERVAL', 3600))
+
+
+class ChangeFeed:
+    """Catalog version counter plus a log of inserts, updates and deletes.
+
+    Every write to a tracked table bumps the single catalog_version row inside
+    the writer's transaction. That row lock serializes catalog writers, so
+    versions become visible in commit order and a client that has seen
+    version N never misses a change numbered N or lower.
+    """
+    @staticmethod
+    def _next_version(tx: Transaction) -> int:
+        tx.execute("UPDATE catalog_version SET version = version + 1 WHERE id = 1")
+        tx.execute("SELECT version FROM catalog_version WHERE id = 1")
+        return tx.fetchone()[0]
+
+    @staticmethod
+    def record(tx: Transaction, table: str, record_ids: Iterable[int], operation: str) -> int:
+        """Log changed records as part of the caller's transaction; returns the new version"""
+        if table not in TRACKED_TABLES:
+            raise ValueError(f"'{table}' is not a tracked table")
+        version = ChangeFeed._next_version(tx)
+        tx.executemany(
+            "INSERT INTO change_log (version, table_name, record_id, operation) VALUES (%s, %s, %s, %s)",
+            [(version, table, record_id, operation) for record_id in record_ids]
+        )
+        return version
+
+    @staticmethod
+    def current_version() -> int:
+        row = db.fetch_one("SELECT version FROM catalog_version WHERE id = 1")
+        return row[0] if row else 0
+
+    @staticmethod
+    def pruned_version() -> int:
+        """The oldest `since` the log can still answer; entries at or below it are gone"""
+        row = db.fetch_one("SELECT pruned_version FROM catalog_version WHERE id = 1")
+        return row[0] if row else 0
+
+    @staticmethod
+    def prune(retention_days: float = None) -> int:
+        """Drop log entries older than the retention window; returns how many were removed.
+
+        The newest dropped version is recorded as the floor first, in a
+        transaction of its own, so a `since` below it gets a full listing
+        instead of a delta with changes missing, and the delete doesn't hold
+        the catalog_version lock that writers need.
+        """
+        days = CHANGE_LOG_RETENTION_DAYS if retention_days is None else retention_days
+        cutoff = datetime.now() - timedelta(days=days)
+        with db.transaction() as tx:
+            tx.execute("SELECT MAX(version) FROM change_log WHERE created_at < %s", (cutoff,))
+            floor = tx.fetchone()[0]
+            if floor is None:
+                return 0
+            tx.execute(
+                "UPDATE catalog_version SET pruned_version = %s WHERE id = 1 AND pruned_version < %s",
+                (floor, floor)
+            )
+        with db.transaction() as tx:
+            tx.execute("DELETE FROM change_log WHERE version <= %s", (floor,))
+            removed = tx.rowcount
+        print(f"🧹 Pruned {removed} change log entries up to version {floor}")
+        return removed
+
+    @staticmethod
+    def listing(fetch: Callable[[], Dict]) -> Dict:
+        """A full listing stamped with the version a client passes as `since` next time.
+
+        The version is read before the rows, and both come from the primary
+        rather than a replica or the query cache, so the rows are at least as
+        new as the version and no change at or below it is left out.
+        """
+        with db.primary():
+            version = ChangeFeed.current_version()
+            result = fetch()
+        result["version"] = version
+        return result
+
+    @staticmethod
+    def changes_since(table: str, since: int) -> Dict:
+        """Ids changed and removed after `since`, the latest operation per record winning.
+
+        A `since` newer than the catalog (e.g. from a restored database) or
+        older than the pruned part of the log comes back as a reset.
+        """
+        row = db.fetch_one("SELECT version, pruned_version FROM catalog_version WHERE id = 1")
+        version, floor = row if row else (0, 0)
+        reset = {"version": version, "reset": True, "changed": [], "removed": []}
+        if since > version or since < floor:
+            return reset
+
+        rows = db.fetch_all(
+            "SELECT record_id, operation FROM change_log WHERE table_name = %s AND version > %s AND version <= %s ORDER BY version, id",
+            (table, since, version)
+        ) or []
+        if since < ChangeFeed.pruned_version():
+            # A prune finished while the log was being read; some of its rows may be missing
+            return reset
+        latest: Dict[int, str] = {}
+        for record_id, operation in rows:
+            latest[record_id] = operation
+
+        return {
+            "version": version,
+            "reset": False,
+            "changed": [rid for rid, op in latest.items() if op != 'delete'],
+            "removed": [rid for rid, op in latest.items() if op == 'delete']
+        }
+
+    @staticmethod
+    def delta(table: str, since: int, fetch: Callable[[Optional[List[int]]], Dict], key: str) -> Dict:
+        """Records changed and ids removed since a version, in the shape the endpoints return.
+
+        fetch(ids) is the service's listing call restricted to ids (None for
+        everything). Changed records it no longer returns, such as news that
+        was hidden, are reported as removed. Like listing(), it reads from
+        the primary so the log, the version and the records all agree.
+        """
+        with db.primary():
+            feed = ChangeFeed.changes_since(table, since)
+            if feed["reset"]:
+                result = ChangeFeed.listing(lambda: fetch(None))
+                result.update({"since": since, "reset": True})
+                return result
+            result = fetch(feed["changed"])
+
+        if not result.get("success"):
+            return result
+        changed = result.get(key, [])
+        returned = {record["id"] for record in changed}
+        removed = feed["removed"] + [rid for rid in feed["changed"] if rid not in returned]
+        return {
+            "success": True,
+            "version": feed["version"],
+            "since": since,
+            "changed": changed,
+            "removed": removed,
+            "count": len(changed)
+        }
+
+    @staticmethod
+    def parse_since(value: Optional[str]) -> Optional[int]:
+        if value in (None, ''):
+            return None
+        since = int(value)
+        if since < 0:
+            raise ValueError("since must be a non-negative version")
+        return since
+
+
+def placeholders(values: List) -> str:
+    return ", ".join(["%s"] * len(values))
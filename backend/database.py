@@ -1,172 +1,344 @@
-import mysql.connector
-from mysql.connector import Error
 import os
-from typing import Optional, List, Tuple
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, List, Tuple, Dict, Any, Callable
+from db_backends import StorageBackend, create_backend, create_replica_backends
+from replication import ReplicaRouter
+from query_cache import QueryCache, MISS, tables_read, table_written
+from query_log import QueryLog
+
+def _row_count(result, fetch: str) -> int:
+    if fetch == 'one':
+        return 0 if result is None else 1
+    return len(result)
+
+
+class Transaction:
+    """Cursor handed out by Database.transaction(); remembers which tables it wrote"""
+    def __init__(self, cursor, log_query=None):
+        self.cursor = cursor
+        self.tables_written = set()
+        self._log_query = log_query
+
+    def _track(self, query: str):
+        if query.lstrip()[:6].upper() != 'SELECT':
+            self.tables_written.add(table_written(query))
+
+    def execute(self, query: str, params: Tuple = ()):
+        self._track(query)
+        start = time.perf_counter()
+        self.cursor.execute(query, params)
+        if self._log_query:
+            self._log_query(query, params, start, self.cursor.rowcount)
+
+    def executemany(self, query: str, params_list: List[Tuple]):
+        self._track(query)
+        start = time.perf_counter()
+        self.cursor.executemany(query, params_list)
+        if self._log_query:
+            self._log_query(query, (), start, self.cursor.rowcount)
+
+    # Savepoints write nothing themselves, so they bypass the written-table tracking
+    def savepoint(self, name: str):
+        self.cursor.execute(f"SAVEPOINT {name}")
+
+    def release_savepoint(self, name: str):
+        self.cursor.execute(f"RELEASE SAVEPOINT {name}")
+
+    def rollback_to_savepoint(self, name: str):
+        self.cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+
+    def fetchone(self) -> Optional[Tuple]:
+        return self.cursor.fetchone()
+
+    def fetchall(self) -> List[Tuple]:
+        return self.cursor.fetchall()
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self.cursor.lastrowid
+
+    @property
+    def rowcount(self) -> int:
+        return self.cursor.rowcount
 
 class Database:
-    def __init__(self):
-        self.host = os.getenv('DB_HOST', 'localhost')
-        self.user = os.getenv('DB_USER', 'root')
-        self.password = os.getenv('DB_PASSWORD', '')
-        self.db_name = os.getenv('DB_NAME', 'e-currency')
-        self._init_database()
-
-    def _init_database(self):
-        """Initialize database connection and tables"""
+    def __init__(self, backend: StorageBackend = None, replicas: List[StorageBackend] = None):
+        self.backend = backend or create_backend()
+        self.Error = self.backend.Error
+        self.router = ReplicaRouter(replicas if replicas is not None else create_replica_backends(self.backend.name))
+        self.query_cache = QueryCache()
+        self.query_log = QueryLog()
+        self._local = threading.local()
+
+    def init_schema(self):
+        """Create the database and tables if they don't exist yet"""
         try:
             conn = self._connect(use_database=False)
             if conn:
                 cursor = conn.cursor()
-                cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{self.db_name}`")
-                cursor.execute(f"USE `{self.db_name}`")
-                
+                self.backend.bootstrap(cursor)
+
                 # Create tables
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS users (
-                        id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
-                        username VARCHAR(80) NOT NULL UNIQUE,
-                        email VARCHAR(255) NOT NULL UNIQUE,
-                        password_hash VARCHAR(255) NOT NULL,
-                        role VARCHAR(50) NOT NULL DEFAULT 'user',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                
-                # In database.py - Update the game_items table creation
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS game_items (
-                        id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
-                        name VARCHAR(200) NOT NULL,
-                        description TEXT,
-                        price DECIMAL(12,2) NOT NULL,
-                        currency VARCHAR(10) DEFAULT 'PHP',
-                        game_platform VARCHAR(100),
-                        image_data LONGTEXT,  -- ✅ ADD THIS FOR GAME IMAGE
-                        currency_icon LONGTEXT,  -- ✅ ADD THIS FOR CURRENCY ICON
-                        price_options LONGTEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                # ✅ ADD THE NEWS TABLE RIGHT HERE:
-                cursor.execute('''
-                CREATE TABLE IF NOT EXISTS news (
-                    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
-                    title VARCHAR(200) NOT NULL,
-                    description TEXT,
-                    date DATE NOT NULL,
-                    icon VARCHAR(10) NOT NULL,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-
-
-
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS transactions (
-                        id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
-                        user_id BIGINT UNSIGNED NOT NULL,
-                        item_id BIGINT UNSIGNED NOT NULL,
-                        status VARCHAR(20) NOT NULL DEFAULT 'pending',
-                        final_price DECIMAL(12,2) NOT NULL,
-                        quantity INT NOT NULL DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES users(id),
-                        FOREIGN KEY (item_id) REFERENCES game_items(id)
-                    )
-                ''')
-
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS promos (
-                        id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
-                        image_data LONGTEXT NOT NULL,
-                        title VARCHAR(200),
-                        description TEXT,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-
-                # Create default admin accounts
-                self._create_default_admin_accounts(cursor)
-                
+                for statement in self.backend.schema_statements():
+                    cursor.execute(statement)
+
+                # Upgrade tables from older versions; a statement that was already applied just fails
+                for statement in self.backend.migration_statements():
+                    try:
+                        cursor.execute(statement)
+                    except self.Error:
+                        pass
+
                 conn.commit()
                 cursor.close()
                 conn.close()
-                print("✅ Database initialized successfully!")
+                print(f"✅ Database initialized successfully! ({self.backend.describe()})")
+            else:
+                raise RuntimeError("Could not connect to database server")
                 
-        except Error as e:
+        except self.Error as e:
             print(f"❌ Database initialization failed: {e}")
+            raise
 
-    def _connect(self, use_database=True):
+    def create_default_admin_accounts(self):
+        """Make sure the default admin accounts exist"""
+        conn = self._connect()
+        if not conn:
+            raise RuntimeError("Could not connect to database")
         try:
-            if use_database:
-                return mysql.connector.connect(
-                    host=self.host,
-                    user=self.user,
-                    password=self.password,
-                    database=self.db_name
-                )
-            else:
-                return mysql.connector.connect(
-                    host=self.host,
-                    user=self.user,
-                    password=self.password
-                )
-        except Error as e:
+            cursor = conn.cursor()
+            self._create_default_admin_accounts(cursor)
+            conn.commit()
+            cursor.close()
+        except self.Error as e:
+            print(f"❌ Admin account setup failed: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def _connect(self, use_database=True, backend: StorageBackend = None):
+        backend = backend or self.backend
+        try:
+            return backend.connect(use_database)
+        except backend.Error as e:
             print(f"❌ Database connection failed: {e}")
             return None
 
+    # Read/write routing - reads go to a replica unless this request wrote
+    # something (read-your-writes) or the caller asked for the primary
+    def begin_request(self):
+        """Forget the primary pin left over from this thread's previous request, and start its query log"""
+        self._local.pinned = False
+        self.query_log.begin_request()
+
+    def end_request(self, route: str) -> Optional[Dict[str, Any]]:
+        """Query count and time of the request, with any query it repeated suspiciously often"""
+        return self.query_log.end_request(route)
+
+    def _log_query(self, query: str, params: Tuple, start: float, rows: int, backend: StorageBackend = None):
+        duration_ms = (time.perf_counter() - start) * 1000
+        backend = backend or self.backend
+        explain = None
+        if backend.explain_prefix and query.lstrip()[:6].upper() == 'SELECT':
+            explain = lambda: self._explain(query, params, backend)
+        self.query_log.record(query, duration_ms, rows, explain)
+
+    def _explain(self, query: str, params: Tuple, backend: StorageBackend) -> List[Tuple]:
+        """Plan of a read, on a connection of its own so the caller's cursor is left alone"""
+        conn = backend.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(backend.explain_prefix + query, params)
+            plan = cursor.fetchall()
+            cursor.close()
+            return plan
+        finally:
+            conn.close()
+
+    @contextmanager
+    def primary(self):
+        """Send every read inside this block to the primary, past the query cache"""
+        self._local.force_primary = getattr(self._local, 'force_primary', 0) + 1
+        try:
+            yield self
+        finally:
+            self._local.force_primary -= 1
+
+    def _reads_from_primary(self, use_primary: bool) -> bool:
+        return (use_primary
+                or not self.router.replicas
+                or getattr(self._local, 'pinned', False)
+                or getattr(self._local, 'force_primary', 0) > 0)
+
+    def _pin_to_primary(self):
+        self._local.pinned = True
+
     def execute(self, query: str, params: Tuple = ()) -> bool:
+        self._pin_to_primary()
         conn = self._connect()
         if conn:
             try:
                 cursor = conn.cursor()
+                start = time.perf_counter()
                 cursor.execute(query, params)
+                self._log_query(query, params, start, cursor.rowcount)
                 conn.commit()
+                self._local.last_insert_id = cursor.lastrowid
                 cursor.close()
-                conn.close()
                 return True
-            except Error as e:
+            except self.Error as e:
                 print(f"❌ Query execution failed: {e}")
                 return False
+            finally:
+                conn.close()
+                self.query_cache.invalidate_table(table_written(query))
         return False
 
-    def fetch_one(self, query: str, params: Tuple = ()) -> Optional[Tuple]:
+    def execute_many(self, query: str, params_list: List[Tuple]) -> bool:
+        """Run one statement for many parameter sets in a single transaction"""
+        self._pin_to_primary()
         conn = self._connect()
         if conn:
             try:
                 cursor = conn.cursor()
-                cursor.execute(query, params)
-                result = cursor.fetchone()
+                start = time.perf_counter()
+                cursor.executemany(query, params_list)
+                self._log_query(query, (), start, cursor.rowcount)
+                conn.commit()
                 cursor.close()
+                return True
+            except self.Error as e:
+                print(f"❌ Batch execution failed: {e}")
+                conn.rollback()
+                return False
+            finally:
                 conn.close()
+                self.query_cache.invalidate_table(table_written(query))
+        return False
+
+    @contextmanager
+    def transaction(self):
+        """Run several statements on one primary connection, committed together.
+
+        Rolls back and re-raises if the block fails. Cached reads of the
+        tables written are invalidated once the transaction ends.
+        """
+        self._pin_to_primary()
+        conn = self._connect()
+        if not conn:
+            raise RuntimeError("Could not connect to database")
+        tx = Transaction(conn.cursor(), self._log_query)
+        try:
+            yield tx
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            tx.cursor.close()
+            conn.close()
+            for table in tx.tables_written:
+                self.query_cache.invalidate_table(table)
+
+    def run_transaction(self, unit: Callable[[Transaction], Any], deadlock_retries: int = 1) -> Any:
+        """unit(tx) in a transaction of its own, run again if the engine rolls it back as a deadlock victim"""
+        for attempt in range(deadlock_retries + 1):
+            try:
+                with self.transaction() as tx:
+                    return unit(tx)
+            except self.backend.Error as e:
+                if attempt == deadlock_retries or not self.backend.is_deadlock(e):
+                    raise
+                print(f"⚠️ Deadlock, retrying transaction: {e}")
+
+    def _read_replica(self, query: str, params: Tuple, fetch: str):
+        """Run a read on a replica; returns (ok, result) so the caller can fall back to the primary"""
+        replica = self.router.choose()
+        if replica is None:
+            return False, None
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn = replica.backend.connect()
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            result = cursor.fetchone() if fetch == 'one' else cursor.fetchall()
+            cursor.close()
+            self._log_query(query, params, start, _row_count(result, fetch), replica.backend)
+        except replica.backend.Error as e:
+            print(f"❌ Replica read failed: {e}")
+            self.router.record_failure(replica)
+            return False, None
+        finally:
+            if conn is not None:
+                conn.close()
+        self.router.record_success(replica, (time.perf_counter() - start) * 1000)
+        return True, result
+
+    def _fetch(self, fetch: str, query: str, params: Tuple, use_primary: bool):
+        if not self._reads_from_primary(use_primary):
+            ok, result = self._read_replica(query, params, fetch)
+            if ok:
                 return result
-            except Error as e:
-                print(f"❌ Fetch one failed: {e}")
-                return None
-        return None
 
-    def fetch_all(self, query: str, params: Tuple = ()) -> Optional[List[Tuple]]:
         conn = self._connect()
         if conn:
             try:
                 cursor = conn.cursor()
+                start = time.perf_counter()
                 cursor.execute(query, params)
-                results = cursor.fetchall()
+                result = cursor.fetchone() if fetch == 'one' else cursor.fetchall()
                 cursor.close()
-                conn.close()
-                return results
-            except Error as e:
-                print(f"❌ Fetch all failed: {e}")
+                self._log_query(query, params, start, _row_count(result, fetch))
+                return result
+            except self.Error as e:
+                print(f"❌ Fetch {fetch} failed: {e}")
                 return None
+            finally:
+                conn.close()
         return None
 
+    def _cached_fetch(self, fetch: str, query: str, params: Tuple, use_primary: bool, cache_ttl: Optional[float]):
+        """Serve a read from the query cache when the caller gave it a TTL"""
+        forced = getattr(self._local, 'force_primary', 0) > 0
+        tables = tables_read(query) if cache_ttl and self.query_cache.enabled and not forced else None
+        if not tables:
+            return self._fetch(fetch, query, params, use_primary)
+
+        key = self.query_cache.key(fetch, query, params)
+        result = self.query_cache.get(key)
+        if result is not MISS:
+            return list(result) if fetch == 'all' else result
+
+        snapshot = self.query_cache.snapshot(tables)
+        result = self._fetch(fetch, query, params, use_primary)
+        if result is not None:
+            self.query_cache.set(key, tables, result, cache_ttl, snapshot)
+            if fetch == 'all':
+                result = list(result)
+        return result
+
+    def fetch_one(self, query: str, params: Tuple = (), use_primary: bool = False,
+                  cache_ttl: Optional[float] = None) -> Optional[Tuple]:
+        return self._cached_fetch('one', query, params, use_primary, cache_ttl)
+
+    def fetch_all(self, query: str, params: Tuple = (), use_primary: bool = False,
+                  cache_ttl: Optional[float] = None) -> Optional[List[Tuple]]:
+        return self._cached_fetch('all', query, params, use_primary, cache_ttl)
+
+    def status(self) -> Dict[str, Any]:
+        """Primary/replica health and query cache stats for the admin database endpoint"""
+        return {
+            "primary": self.backend.describe(),
+            "replicas": self.router.status(),
+            "query_cache": self.query_cache.stats()
+        }
+
     def get_last_insert_id(self) -> Optional[int]:
-        result = self.fetch_one("SELECT LAST_INSERT_ID()")
-        return result[0] if result else None
+        """ID generated by the last INSERT this thread ran through execute()"""
+        return getattr(self._local, 'last_insert_id', None)
     
     def _create_default_admin_accounts(self, cursor):
         """Create default admin accounts without importing User model"""
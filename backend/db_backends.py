@@ -0,0 +1,569 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Dict, List
+
+try:
+    import mysql.connector
+    from mysql.connector import Error as MySQLError
+except ImportError:  # only needed when DB_BACKEND=mysql
+    mysql = None
+    MySQLError = None
+
+
+class StorageBackend:
+    """A database engine the Database class can talk to.
+
+    Backends hand out DB-API connections whose cursors accept the MySQL-style
+    %s placeholders used throughout the services, and provide the schema DDL
+    in their own dialect.
+    """
+    name = None
+    Error = Exception
+    explain_prefix = "EXPLAIN "
+
+    def connect(self, use_database: bool = True):
+        raise NotImplementedError
+
+    def bootstrap(self, cursor):
+        """Prepare an empty server before the tables are created"""
+
+    def schema_statements(self) -> List[str]:
+        raise NotImplementedError
+
+    def migration_statements(self) -> List[str]:
+        """Upgrades for tables created by older versions; ones already applied fail and are skipped"""
+        return []
+
+    def describe(self) -> str:
+        return self.name
+
+    def is_deadlock(self, error: Exception) -> bool:
+        """Whether the error is the engine aborting a transaction to break a lock cycle"""
+        return False
+
+    def upsert(self, table: str, columns: List[str], keys: List[str], updates: Dict[str, str] = None,
+               source: str = None) -> str:
+        """INSERT of `columns` that, where a row with the same `keys` exists, applies `updates` instead.
+
+        `updates` maps columns to SQL expressions, in which the stored row's
+        columns are named as-is and the incoming row's through inserted();
+        without updates an existing row is left alone. `source` is what
+        supplies the rows (a SELECT, or VALUES with expressions), by default
+        one row of %s placeholders.
+        """
+        source = source or f"VALUES ({', '.join(['%s'] * len(columns))})"
+        return f"INSERT INTO {table} ({', '.join(columns)}) {source} {self.on_conflict(keys, updates or {})}"
+
+    def inserted(self, column: str) -> str:
+        """The value the conflicting INSERT carried for a column, inside upsert() updates"""
+        raise NotImplementedError
+
+    def on_conflict(self, keys: List[str], updates: Dict[str, str]) -> str:
+        raise NotImplementedError
+
+
+class MySQLBackend(StorageBackend):
+    name = "mysql"
+
+    def __init__(self, host: str = None, user: str = None, password: str = None, db_name: str = None, port: int = None):
+        if mysql is None:
+            raise RuntimeError("mysql-connector-python is required for DB_BACKEND=mysql")
+        self.Error = MySQLError
+        self.host = host or os.getenv('DB_HOST', 'localhost')
+        self.port = int(port or os.getenv('DB_PORT', 3306))
+        self.user = user or os.getenv('DB_USER', 'root')
+        self.password = password if password is not None else os.getenv('DB_PASSWORD', '')
+        self.db_name = db_name or os.getenv('DB_NAME', 'e-currency')
+
+    def connect(self, use_database: bool = True):
+        if use_database:
+            return mysql.connector.connect(
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                password=self.password,
+                database=self.db_name
+            )
+        return mysql.connector.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password
+        )
+
+    def bootstrap(self, cursor):
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{self.db_name}`")
+        cursor.execute(f"USE `{self.db_name}`")
+
+    def describe(self) -> str:
+        return f"mysql://{self.user}@{self.host}:{self.port}/{self.db_name}"
+
+    def is_deadlock(self, error: Exception) -> bool:
+        return getattr(error, 'errno', None) == 1213  # ER_LOCK_DEADLOCK; the transaction was rolled back
+
+    def inserted(self, column: str) -> str:
+        return f"VALUES({column})"
+
+    def on_conflict(self, keys: List[str], updates: Dict[str, str]) -> str:
+        # Rather than INSERT IGNORE, which would also swallow foreign key and data errors
+        updates = updates or {keys[0]: keys[0]}
+        return "ON DUPLICATE KEY UPDATE " + ", ".join(f"{column} = {expression}" for column, expression in updates.items())
+
+    def schema_statements(self) -> List[str]:
+        return [
+            '''
+            CREATE TABLE IF NOT EXISTS users (
+                id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                username VARCHAR(80) NOT NULL UNIQUE,
+                email VARCHAR(255) NOT NULL UNIQUE,
+                password_hash VARCHAR(255) NOT NULL,
+                role VARCHAR(50) NOT NULL DEFAULT 'user',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS game_items (
+                id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                description TEXT,
+                price DECIMAL(12,2) NOT NULL,
+                currency VARCHAR(10) DEFAULT 'PHP',
+                game_platform VARCHAR(100),
+                image_data LONGTEXT,
+                currency_icon LONGTEXT,
+                price_options LONGTEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                deleted_at TIMESTAMP NULL DEFAULT NULL
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS news (
+                id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                title VARCHAR(200) NOT NULL,
+                description TEXT,
+                date DATE NOT NULL,
+                icon VARCHAR(10) NOT NULL,
+                is_active BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS transactions (
+                id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                user_id BIGINT UNSIGNED NOT NULL,
+                item_id BIGINT UNSIGNED NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                final_price DECIMAL(12,2) NOT NULL,
+                quantity INT NOT NULL DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id),
+                FOREIGN KEY (item_id) REFERENCES game_items(id)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS promos (
+                id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                image_data LONGTEXT NOT NULL,
+                title VARCHAR(200),
+                description TEXT,
+                is_active BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS image_variants (
+                owner_type VARCHAR(20) NOT NULL,
+                owner_id BIGINT UNSIGNED NOT NULL,
+                variant VARCHAR(20) NOT NULL,
+                mime VARCHAR(50) NOT NULL,
+                width INT,
+                height INT,
+                data LONGTEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (owner_type, owner_id, variant)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS catalog_version (
+                id INT PRIMARY KEY,
+                version BIGINT UNSIGNED NOT NULL,
+                pruned_version BIGINT UNSIGNED NOT NULL DEFAULT 0
+            )
+            ''',
+            "INSERT IGNORE INTO catalog_version (id, version) VALUES (1, 0)",
+            '''
+            CREATE TABLE IF NOT EXISTS change_log (
+                id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                version BIGINT UNSIGNED NOT NULL,
+                table_name VARCHAR(50) NOT NULL,
+                record_id BIGINT UNSIGNED NOT NULL,
+                operation VARCHAR(10) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_change_log_table_version (table_name, version)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS transactions_archive (
+                id BIGINT UNSIGNED PRIMARY KEY,
+                user_id BIGINT UNSIGNED NOT NULL,
+                item_id BIGINT UNSIGNED NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                final_price DECIMAL(12,2) NOT NULL,
+                quantity INT NOT NULL DEFAULT 1,
+                created_at TIMESTAMP NULL,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_transactions_archive_item_id (item_id)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS search_queries (
+                kind VARCHAR(20) NOT NULL,
+                query VARCHAR(200) NOT NULL,
+                platform VARCHAR(100) NOT NULL DEFAULT '',
+                result_limit INT NOT NULL DEFAULT 0,
+                hits BIGINT UNSIGNED NOT NULL DEFAULT 0,
+                last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (kind, query, platform, result_limit)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS item_price_options (
+                id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                item_id BIGINT UNSIGNED NOT NULL,
+                position INT NOT NULL DEFAULT 0,
+                amount INT NOT NULL,
+                price DECIMAL(12,2) NOT NULL,
+                INDEX idx_item_price_options_item_price (item_id, price),
+                INDEX idx_item_price_options_price (price),
+                FOREIGN KEY (item_id) REFERENCES game_items(id) ON DELETE CASCADE
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS user_purchase_summary (
+                user_id BIGINT UNSIGNED PRIMARY KEY,
+                order_count INT NOT NULL DEFAULT 0,
+                last_purchase_at TIMESTAMP NULL,
+                last_transaction_id BIGINT UNSIGNED,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS user_spend_by_currency (
+                user_id BIGINT UNSIGNED NOT NULL,
+                currency VARCHAR(10) NOT NULL,
+                total DECIMAL(14,2) NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, currency),
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS item_stock_shards (
+                item_id BIGINT UNSIGNED NOT NULL,
+                shard INT NOT NULL,
+                remaining INT NOT NULL,
+                PRIMARY KEY (item_id, shard),
+                FOREIGN KEY (item_id) REFERENCES game_items(id) ON DELETE CASCADE
+            )
+            '''
+        ]
+
+    def migration_statements(self) -> List[str]:
+        return [
+            "ALTER TABLE game_items ADD COLUMN deleted_at TIMESTAMP NULL DEFAULT NULL",
+            "ALTER TABLE catalog_version ADD COLUMN pruned_version BIGINT UNSIGNED NOT NULL DEFAULT 0"
+        ]
+
+
+_PLACEHOLDER = re.compile(r"%s|%%")
+
+
+def _to_qmark(query: str) -> str:
+    """Translate MySQL-style %s placeholders into SQLite's ? style"""
+    return _PLACEHOLDER.sub(lambda m: "?" if m.group(0) == "%s" else "%", query)
+
+
+class _SQLiteCursor(sqlite3.Cursor):
+    def execute(self, query, params=()):
+        return super().execute(_to_qmark(query), tuple(params))
+
+    def executemany(self, query, params_list):
+        return super().executemany(_to_qmark(query), (tuple(p) for p in params_list))
+
+
+class _SQLiteConnection(sqlite3.Connection):
+    def cursor(self, factory=_SQLiteCursor):
+        return super().cursor(factory)
+
+
+class _SharedConnection:
+    """Hands out the single connection of an in-memory database to one thread at a time"""
+    def __init__(self, conn: sqlite3.Connection, lock: threading.RLock):
+        self._conn = conn
+        self._lock = lock
+        self._closed = False
+        lock.acquire()
+
+    def cursor(self):
+        return self._conn.cursor()
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            if self._conn.in_transaction:
+                self._conn.rollback()
+            self._lock.release()
+
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter("timestamp", lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter("date", lambda raw: date.fromisoformat(raw.decode()[:10]))
+
+
+class SQLiteBackend(StorageBackend):
+    name = "sqlite"
+    Error = sqlite3.Error
+    explain_prefix = "EXPLAIN QUERY PLAN "
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv('DB_PATH', 'gamegate.db')
+        self.in_memory = self.path == ':memory:'
+        self.busy_timeout = float(os.getenv('DB_BUSY_TIMEOUT', 30))
+        self._memory_conn = None
+        self._memory_lock = threading.RLock()
+        if self.in_memory:
+            self._memory_conn = self._open(':memory:')
+            # EXPLAIN would share (and on close roll back) the caller's connection
+            self.explain_prefix = None
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            path,
+            timeout=self.busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            factory=_SQLiteConnection
+        )
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def connect(self, use_database: bool = True):
+        if self.in_memory:
+            return _SharedConnection(self._memory_conn, self._memory_lock)
+        return self._open(self.path)
+
+    def bootstrap(self, cursor):
+        if not self.in_memory:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+
+    def describe(self) -> str:
+        return f"sqlite:///{self.path}"
+
+    def inserted(self, column: str) -> str:
+        return f"excluded.{column}"
+
+    def on_conflict(self, keys: List[str], updates: Dict[str, str]) -> str:
+        # A SELECT source needs a WHERE clause, or SQLite reads ON CONFLICT as a join constraint
+        target = f"ON CONFLICT ({', '.join(keys)})"
+        if not updates:
+            return f"{target} DO NOTHING"
+        return f"{target} DO UPDATE SET " + ", ".join(f"{column} = {expression}" for column, expression in updates.items())
+
+    def schema_statements(self) -> List[str]:
+        return [
+            '''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username VARCHAR(80) NOT NULL UNIQUE,
+                email VARCHAR(255) NOT NULL UNIQUE,
+                password_hash VARCHAR(255) NOT NULL,
+                role VARCHAR(50) NOT NULL DEFAULT 'user',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS game_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name VARCHAR(200) NOT NULL,
+                description TEXT,
+                price DECIMAL(12,2) NOT NULL,
+                currency VARCHAR(10) DEFAULT 'PHP',
+                game_platform VARCHAR(100),
+                image_data TEXT,
+                currency_icon TEXT,
+                price_options TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                deleted_at TIMESTAMP DEFAULT NULL
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS news (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title VARCHAR(200) NOT NULL,
+                description TEXT,
+                date DATE NOT NULL,
+                icon VARCHAR(10) NOT NULL,
+                is_active BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL REFERENCES users(id),
+                item_id INTEGER NOT NULL REFERENCES game_items(id),
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                final_price DECIMAL(12,2) NOT NULL,
+                quantity INT NOT NULL DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            # MySQL creates these automatically for the foreign keys
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions (user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_item_id ON transactions (item_id)",
+            '''
+            CREATE TABLE IF NOT EXISTS promos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                image_data TEXT NOT NULL,
+                title VARCHAR(200),
+                description TEXT,
+                is_active BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS image_variants (
+                owner_type VARCHAR(20) NOT NULL,
+                owner_id INTEGER NOT NULL,
+                variant VARCHAR(20) NOT NULL,
+                mime VARCHAR(50) NOT NULL,
+                width INT,
+                height INT,
+                data TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (owner_type, owner_id, variant)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS catalog_version (
+                id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL,
+                pruned_version INTEGER NOT NULL DEFAULT 0
+            )
+            ''',
+            "INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)",
+            '''
+            CREATE TABLE IF NOT EXISTS change_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                version INTEGER NOT NULL,
+                table_name VARCHAR(50) NOT NULL,
+                record_id INTEGER NOT NULL,
+                operation VARCHAR(10) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_change_log_table_version ON change_log (table_name, version)",
+            '''
+            CREATE TABLE IF NOT EXISTS transactions_archive (
+                id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                final_price DECIMAL(12,2) NOT NULL,
+                quantity INT NOT NULL DEFAULT 1,
+                created_at TIMESTAMP,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_transactions_archive_item_id ON transactions_archive (item_id)",
+            '''
+            CREATE TABLE IF NOT EXISTS search_queries (
+                kind VARCHAR(20) NOT NULL,
+                query VARCHAR(200) NOT NULL,
+                platform VARCHAR(100) NOT NULL DEFAULT '',
+                result_limit INT NOT NULL DEFAULT 0,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (kind, query, platform, result_limit)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS item_price_options (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_id INTEGER NOT NULL REFERENCES game_items(id) ON DELETE CASCADE,
+                position INT NOT NULL DEFAULT 0,
+                amount INT NOT NULL,
+                price DECIMAL(12,2) NOT NULL
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_item_price_options_item_price ON item_price_options (item_id, price)",
+            "CREATE INDEX IF NOT EXISTS idx_item_price_options_price ON item_price_options (price)",
+            '''
+            CREATE TABLE IF NOT EXISTS user_purchase_summary (
+                user_id INTEGER PRIMARY KEY REFERENCES users(id),
+                order_count INT NOT NULL DEFAULT 0,
+                last_purchase_at TIMESTAMP,
+                last_transaction_id INTEGER
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS user_spend_by_currency (
+                user_id INTEGER NOT NULL REFERENCES users(id),
+                currency VARCHAR(10) NOT NULL,
+                total DECIMAL(14,2) NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, currency)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS item_stock_shards (
+                item_id INTEGER NOT NULL REFERENCES game_items(id) ON DELETE CASCADE,
+                shard INT NOT NULL,
+                remaining INT NOT NULL,
+                PRIMARY KEY (item_id, shard)
+            )
+            '''
+        ]
+
+    def migration_statements(self) -> List[str]:
+        return [
+            "ALTER TABLE game_items ADD COLUMN deleted_at TIMESTAMP DEFAULT NULL",
+            "ALTER TABLE catalog_version ADD COLUMN pruned_version INTEGER NOT NULL DEFAULT 0"
+        ]
+
+
+BACKENDS = {
+    MySQLBackend.name: MySQLBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+
+def create_backend(name: str = None) -> StorageBackend:
+    """Build the backend selected by DB_BACKEND (mysql or sqlite)"""
+    name = (name or os.getenv('DB_BACKEND', 'mysql')).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown DB_BACKEND '{name}', expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def create_replica_backends(name: str = None, replicas: str = None) -> List[StorageBackend]:
+    """Read replicas from DB_REPLICAS: comma-separated host[:port] for MySQL, file paths for SQLite"""
+    name = (name or os.getenv('DB_BACKEND', 'mysql')).lower()
+    replicas = replicas if replicas is not None else os.getenv('DB_REPLICAS', '')
+    backends = []
+    for entry in filter(None, (part.strip() for part in replicas.split(','))):
+        if name == SQLiteBackend.name:
+            backends.append(SQLiteBackend(path=entry))
+        else:
+            host, _, port = entry.partition(':')
+            backends.append(MySQLBackend(host=host, port=int(port) if port else None))
+    return backends
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+from database import db, Transaction
+
+
+class GroupCommitter:
+    """Commits many small write transactions together (group commit).
+
+    Callers hand over a unit of work - a function of a Transaction - and
+    block until it is durable. A flusher thread collects the units that
+    arrive within window_ms of the first one (up to max_batch), runs each
+    inside its own SAVEPOINT so one failing unit doesn't take the others
+    down, and commits the lot once: one log flush instead of one per write.
+    Each caller gets its own unit's return value, or its own exception.
+    """
+    def __init__(self, enabled: bool = None, window_ms: float = None, max_batch: int = None):
+        if enabled is None:
+            enabled = os.getenv('GROUP_COMMIT', 'false').lower() in ('1', 'true', 'yes', 'on')
+        self.enabled = enabled
+        self.window_ms = window_ms if window_ms is not None else float(os.getenv('GROUP_COMMIT_WINDOW_MS', 2))
+        self.max_batch = max_batch or int(os.getenv('GROUP_COMMIT_MAX_BATCH', 50))
+        self._pending: List[Tuple[Callable[[Transaction], Any], Future, float]] = []
+        self._ready = threading.Condition()
+        self._thread = None
+
+        self.batches = 0
+        self.units = 0
+        self.failed_units = 0
+        self.failed_batches = 0
+        self.max_batch_seen = 0
+        self.commit_ms_total = 0.0
+        self.commit_ms_max = 0.0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def submit(self, unit: Callable[[Transaction], Any]) -> Any:
+        """Run unit(tx) in the next group commit and return its result once committed"""
+        future = Future()
+        with self._ready:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+            self._pending.append((unit, future, time.perf_counter()))
+            self._ready.notify()
+        return future.result()
+
+    def _run(self):
+        while True:
+            with self._ready:
+                while not self._pending:
+                    self._ready.wait()
+                # Give concurrent writers a moment to join the batch
+                deadline = time.monotonic() + self.window_ms / 1000
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[Callable[[Transaction], Any], Future, float]]):
+        start = time.perf_counter()
+        try:
+            # A deadlock rolls back the whole batch, not one unit: run it all again once
+            outcomes = db.run_transaction(lambda tx: self._run_units(tx, batch))
+        except Exception as e:
+            # The commit itself failed: nothing in the batch was written
+            self.failed_batches += 1
+            outcomes = [(False, e)] * len(batch)
+
+        done = time.perf_counter()
+        commit_ms = (done - start) * 1000
+        self.batches += 1
+        self.units += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self.commit_ms_total += commit_ms
+        self.commit_ms_max = max(self.commit_ms_max, commit_ms)
+        for (_, future, queued_at), (ok, value) in zip(batch, outcomes):
+            wait_ms = (done - queued_at) * 1000
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            if ok:
+                future.set_result(value)
+            else:
+                self.failed_units += 1
+                future.set_exception(value)
+
+    @staticmethod
+    def _run_units(tx: Transaction, batch) -> List[Tuple[bool, Any]]:
+        outcomes = []
+        for i, (unit, _, _) in enumerate(batch):
+            savepoint = f"unit_{i}"
+            tx.savepoint(savepoint)
+            try:
+                outcomes.append((True, unit(tx)))
+                tx.release_savepoint(savepoint)
+            except Exception as e:
+                if db.backend.is_deadlock(e):
+                    raise  # the engine already rolled back the transaction, savepoints included
+                tx.rollback_to_savepoint(savepoint)
+                outcomes.append((False, e))
+        return outcomes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window_ms,
+            "max_batch": self.max_batch,
+            "queued": len(self._pending),
+            "batches": self.batches,
+            "units": self.units,
+            "failed_units": self.failed_units,
+            "failed_batches": self.failed_batches,
+            "avg_batch_size": round(self.units / self.batches, 2) if self.batches else None,
+            "max_batch_size": self.max_batch_seen,
+            "avg_commit_ms": round(self.commit_ms_total / self.batches, 2) if self.batches else None,
+            "max_commit_ms": round(self.commit_ms_max, 2),
+            "avg_wait_ms": round(self.wait_ms_total / self.units, 2) if self.units else None,
+            "max_wait_ms": round(self.wait_ms_max, 2)
+        }
+
+
+purchase_writer = GroupCommitter()
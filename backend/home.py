@@ -0,0 +1,95 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+
+class HomeBundle:
+    """Storefront homepage payload, built once and served as pre-encoded bytes.
+
+    The bundle is rebuilt when it is older than its TTL or after invalidate()
+    is called by a promo, news or item write. Only one thread rebuilds at a
+    time; everyone else keeps getting the previous bytes meanwhile.
+    """
+    def __init__(self, ttl: float = None, popular_limit: int = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv('HOME_BUNDLE_TTL', 30))
+        self.popular_limit = popular_limit or int(os.getenv('HOME_POPULAR_ITEMS', 8))
+        self._payload = None  # (body, gzipped body, etag, built_at)
+        self._generation = 0
+        self._built_generation = -1
+        self._build_lock = threading.Lock()
+        self.builds = 0
+        self.hits = 0
+
+    def invalidate(self):
+        self._generation += 1
+
+    def _is_fresh(self) -> bool:
+        return (self._payload is not None
+                and self._built_generation == self._generation
+                and time.monotonic() - self._payload[3] < self.ttl)
+
+    def build(self) -> dict:
+        # Imported here: these services import this module to invalidate the bundle
+        from promos import PromoService
+        from news import NewsService
+        from items import ItemService
+        from background.product_service import ProductService
+
+        promos = PromoService.get_all_promos('banner')
+        news = NewsService.get_all_news()
+        items = ItemService.get_all_items('card')
+        popular = ProductService.get_popular_items(self.popular_limit)
+
+        catalog_items = items.get("items", []) if items.get("success") else []
+        platforms = Counter(item["game_platform"] or "General" for item in catalog_items)
+        return {
+            "success": True,
+            "promos": promos.get("promos", []),
+            "news": news.get("news", []),
+            "popular_items": popular,
+            "items": catalog_items,
+            "catalog": {
+                "total_items": len(catalog_items),
+                "platforms": dict(sorted(platforms.items()))
+            },
+            "generated_at": datetime.now().isoformat(timespec="seconds")
+        }
+
+    def get(self):
+        """(body, gzipped body, etag) for the current bundle"""
+        if self._is_fresh():
+            self.hits += 1
+            return self._payload[:3]
+
+        # One rebuild at a time; others serve the previous bundle if there is one
+        if not self._build_lock.acquire(blocking=self._payload is None):
+            self.hits += 1
+            return self._payload[:3]
+        try:
+            if not self._is_fresh():
+                generation = self._generation
+                body = json.dumps(self.build(), default=str, separators=(",", ":")).encode()
+                etag = hashlib.sha1(body).hexdigest()
+                self._payload = (body, gzip.compress(body, compresslevel=6), f'"{etag}"', time.monotonic())
+                self._built_generation = generation
+                self.builds += 1
+            return self._payload[:3]
+        finally:
+            self._build_lock.release()
+
+    def stats(self) -> dict:
+        return {
+            "ttl": self.ttl,
+            "builds": self.builds,
+            "hits": self.hits,
+            "size_bytes": len(self._payload[0]) if self._payload else 0,
+            "gzip_bytes": len(self._payload[1]) if self._payload else 0
+        }
+
+
+home_bundle = HomeBundle()
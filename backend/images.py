@@ -0,0 +1,172 @@
+import base64
+import binascii
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Dict, Optional, Tuple
+from database import db
+from home import home_bundle
+from changefeed import ChangeFeed
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # image derivatives are skipped without Pillow
+    Image = None
+
+# Bounding box (width, height) of each derivative; images are never upscaled
+VARIANTS = {
+    "thumbnail": (160, 160),
+    "card": (480, 320),
+    "banner": (1600, 600),
+}
+
+# Which derivatives each kind of upload needs
+OWNER_VARIANTS = {
+    "item": ("thumbnail", "card"),
+    "promo": ("card", "banner"),
+}
+
+# Catalog table each kind of upload belongs to, for the change feed
+OWNER_TABLES = {
+    "item": "game_items",
+    "promo": "promos",
+}
+
+OUTPUT_FORMAT = os.getenv('IMAGE_VARIANT_FORMAT', 'WEBP').upper()
+OUTPUT_QUALITY = int(os.getenv('IMAGE_VARIANT_QUALITY', 80))
+MIME_TYPES = {"WEBP": "image/webp", "JPEG": "image/jpeg", "PNG": "image/png", "AVIF": "image/avif"}
+
+
+def decode_data_url(data: str) -> Optional[bytes]:
+    """Raw bytes of a base64 data URL (or bare base64) as uploaded by the admin panel"""
+    if not data:
+        return None
+    _, sep, payload = data.partition(',')
+    try:
+        return base64.b64decode(payload if sep else data, validate=False)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def render_variants(data: str, variants: Tuple[str, ...], output_format: str, quality: int) -> Dict[str, Tuple[str, int, int, bytes]]:
+    """Decode an upload once and encode each derivative; runs in a worker process"""
+    raw = decode_data_url(data)
+    if not raw:
+        return {}
+    return _render(io.BytesIO(raw), variants, output_format, quality)
+
+
+def render_file_variants(path: str, variants: Tuple[str, ...], output_format: str, quality: int) -> Dict[str, Tuple[str, int, int, bytes]]:
+    """Same as render_variants for an image stored on disk, read by the worker itself"""
+    return _render(path, variants, output_format, quality)
+
+
+def _render(image_file, variants: Tuple[str, ...], output_format: str, quality: int) -> Dict[str, Tuple[str, int, int, bytes]]:
+    with Image.open(image_file) as source:
+        source = ImageOps.exif_transpose(source)
+        keep_alpha = source.mode in ('RGBA', 'LA', 'P') and output_format != 'JPEG'
+        source = source.convert('RGBA' if keep_alpha else 'RGB')
+
+        rendered = {}
+        for name in variants:
+            image = source.copy()
+            image.thumbnail(VARIANTS[name], Image.LANCZOS)
+            options = {"quality": quality}
+            if output_format == 'WEBP':
+                options["method"] = 4
+            else:
+                options["optimize"] = True
+            buffer = io.BytesIO()
+            image.save(buffer, format=output_format, **options)
+            rendered[name] = (MIME_TYPES.get(output_format, 'application/octet-stream'), image.width, image.height, buffer.getvalue())
+        return rendered
+
+
+class ImagePipeline:
+    """Generates resized derivatives of uploaded images off the request thread"""
+    def __init__(self):
+        self.enabled = Image is not None and os.getenv('IMAGE_PIPELINE', 'true').lower() in ('1', 'true', 'yes', 'on')
+        self.workers = int(os.getenv('IMAGE_PIPELINE_WORKERS', 2))
+        self._executor = None
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn rather than fork: the server process has database and startup threads running
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def submit(self, owner_type: str, owner_id: int, data: str):
+        """Queue derivative generation for a freshly uploaded image"""
+        if not self.enabled or not data or not owner_id:
+            return None
+        future = self._pool().submit(render_variants, data, OWNER_VARIANTS[owner_type], OUTPUT_FORMAT, OUTPUT_QUALITY)
+        future.add_done_callback(lambda f: self._store(owner_type, owner_id, f))
+        return future
+
+    def submit_file(self, owner_type: str, owner_id: int, path: str):
+        """Queue derivative generation for an image uploaded to disk; only the path crosses to the worker"""
+        if not self.enabled or not path or not owner_id:
+            return None
+        future = self._pool().submit(render_file_variants, path, OWNER_VARIANTS[owner_type], OUTPUT_FORMAT, OUTPUT_QUALITY)
+        future.add_done_callback(lambda f: self._store(owner_type, owner_id, f))
+        return future
+
+    def _store(self, owner_type: str, owner_id: int, future):
+        try:
+            rendered = future.result()
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ Image derivatives failed for {owner_type} #{owner_id}: {e}")
+            return
+        if not rendered:
+            return
+
+        rows = [
+            (owner_type, owner_id, name, mime, width, height,
+             f"data:{mime};base64,{base64.b64encode(payload).decode()}")
+            for name, (mime, width, height, payload) in rendered.items()
+        ]
+        try:
+            with db.transaction() as tx:
+                tx.execute("DELETE FROM image_variants WHERE owner_type = %s AND owner_id = %s", (owner_type, owner_id))
+                tx.executemany(
+                    "INSERT INTO image_variants (owner_type, owner_id, variant, mime, width, height, data) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                    rows
+                )
+                # Delta-sync clients refetch the record to pick up the resized image
+                ChangeFeed.record(tx, OWNER_TABLES[owner_type], [owner_id], 'update')
+            self.processed += 1
+            home_bundle.invalidate()  # pick up the resized images
+            sizes = ", ".join(f"{name} {len(payload) // 1024}KB" for name, (_, _, _, payload) in rendered.items())
+            print(f"🖼️ Stored image derivatives for {owner_type} #{owner_id}: {sizes}")
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ Could not store image derivatives for {owner_type} #{owner_id}: {e}")
+
+    @staticmethod
+    def delete_variants(owner_type: str, owner_id: int) -> bool:
+        return db.execute("DELETE FROM image_variants WHERE owner_type = %s AND owner_id = %s", (owner_type, owner_id))
+
+    @staticmethod
+    def get_variant(owner_type: str, owner_id: int, variant: str) -> Optional[Tuple[str, bytes]]:
+        """(mime type, bytes) of one stored derivative"""
+        row = db.fetch_one(
+            "SELECT mime, data FROM image_variants WHERE owner_type = %s AND owner_id = %s AND variant = %s",
+            (owner_type, owner_id, variant),
+            cache_ttl=60
+        )
+        if not row:
+            return None
+        return row[0], decode_data_url(row[1])
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "workers": self.workers, "processed": self.processed, "failed": self.failed}
+
+
+image_pipeline = ImagePipeline()
@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from database import db, Transaction
+from home import home_bundle
+from changefeed import ChangeFeed
+from price_options import INSERT_OPTION, parse_price_options
+
+INSERT_ITEM = (
+    "INSERT INTO game_items (name, description, price, currency, game_platform, image_data, currency_icon) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s)"
+)
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(ValueError):
+    pass
+
+
+def text_field(row: Dict, field: str) -> str:
+    """A field as stripped text ('' when missing); NDJSON numbers are taken as their text"""
+    value = row.get(field)
+    if value is None:
+        return ''
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise RowError(f"{field} must be text")
+    return str(value).strip()
+
+
+def validate_row(row: Dict) -> Tuple[Tuple, list]:
+    """Check one import record and turn it into game_items insert parameters and price options"""
+    name = text_field(row, 'name')
+    if not name:
+        raise RowError("name is required")
+    if len(name) > 200:
+        raise RowError("name is longer than 200 characters")
+
+    try:
+        price_options = parse_price_options(row.get('price_options'))
+    except ValueError as e:
+        raise RowError(str(e))
+    price = row.get('price')
+    if price in (None, ''):
+        if not price_options:
+            raise RowError("price or price_options is required")
+        price = min(option["price"] for option in price_options)
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        raise RowError(f"price '{price}' is not a number")
+    if price < 0:
+        raise RowError("price cannot be negative")
+
+    currency = text_field(row, 'currency') or 'PHP'
+    if len(currency) > 10:
+        raise RowError("currency is longer than 10 characters")
+    game_platform = text_field(row, 'game_platform') or None
+    if game_platform and len(game_platform) > 100:
+        raise RowError("game_platform is longer than 100 characters")
+
+    return (
+        name,
+        text_field(row, 'description') or None,
+        price,
+        currency,
+        game_platform,
+        text_field(row, 'image') or None,
+        text_field(row, 'currency_icon') or None,
+    ), price_options
+
+
+def insert_items(tx: Transaction, rows: List[Tuple]) -> List[int]:
+    """Insert game_items rows with one executemany; returns their ids in row order.
+
+    The ids are read back as the rows above the highest id this transaction
+    saw beforehand. That first read fixes the transaction's snapshot, so
+    other writers' items aren't among them (SQLite has one writer at a time).
+    """
+    tx.execute("SELECT COALESCE(MAX(id), 0) FROM game_items")
+    highest = tx.fetchone()[0]
+    tx.executemany(INSERT_ITEM, rows)
+    tx.execute("SELECT id, name FROM game_items WHERE id > %s ORDER BY id", (highest,))
+    inserted = tx.fetchall()
+    if [name for _, name in inserted] != [row[0] for row in rows]:
+        raise RuntimeError("could not match inserted items to their ids")
+    return [item_id for item_id, _ in inserted]
+
+
+def read_csv(stream) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Yield (row number, record, parse error) from a CSV byte stream with a header row.
+
+    A body that stops being readable CSV (bad UTF-8, a malformed row) ends
+    the import at the line it happened on; quoted fields may span lines, so
+    the rows after it can't be told apart reliably.
+    """
+    # Decoded a line at a time, so everything before a bad byte is still imported
+    lines = (raw.decode('utf-8') for raw in io.BufferedReader(stream))
+    reader = csv.DictReader(lines)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except (UnicodeDecodeError, csv.Error) as e:
+            yield reader.line_num + 1, None, f"import stopped: {e}"
+            return
+        yield reader.line_num, row, None
+
+
+def read_ndjson(stream) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Yield (line number, record, parse error) from a newline-delimited JSON byte stream"""
+    # Lines are split before decoding, so bytes that aren't UTF-8 only cost their own line
+    for line_number, raw in enumerate(io.BufferedReader(stream), start=1):
+        try:
+            line = raw.decode('utf-8')
+        except UnicodeDecodeError as e:
+            yield line_number, None, f"not valid UTF-8: {e}"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "each line must be a JSON object"
+            continue
+        yield line_number, record, None
+
+
+class ItemImportService:
+    @staticmethod
+    def detect_format(content_type: str, requested: str = None) -> Optional[str]:
+        requested = (requested or '').lower()
+        if requested in ('csv', 'ndjson'):
+            return requested
+        content_type = (content_type or '').lower()
+        if 'csv' in content_type:
+            return 'csv'
+        if 'ndjson' in content_type or 'jsonl' in content_type or 'json-seq' in content_type:
+            return 'ndjson'
+        return None
+
+    @staticmethod
+    def import_items(records: Iterable[Tuple[int, Optional[Dict], Optional[str]]], chunk_size: int = 500) -> dict:
+        """Validate records and insert the valid ones in chunked multi-row transactions"""
+        imported = 0
+        failed = 0
+        errors = []
+        chunk = []  # (row number, params)
+
+        def report(row_number: int, message: str):
+            nonlocal failed
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "error": message})
+
+        def flush():
+            nonlocal imported
+            if not chunk:
+                return
+            try:
+                with db.transaction() as tx:
+                    item_ids = insert_items(tx, [params for _, (params, _) in chunk])
+                    options = [
+                        (item_id, position, option["amount"], option["price"])
+                        for item_id, (_, (_, price_options)) in zip(item_ids, chunk)
+                        for position, option in enumerate(price_options)
+                    ]
+                    if options:
+                        tx.executemany(INSERT_OPTION, options)
+                    ChangeFeed.record(tx, 'game_items', item_ids, 'insert')
+                imported += len(chunk)
+            except Exception as e:
+                for row_number, _ in chunk:
+                    report(row_number, f"database error: {e}")
+            chunk.clear()
+
+        row_number = 0
+        try:
+            for row_number, record, parse_error in records:
+                if parse_error:
+                    report(row_number, parse_error)
+                    continue
+                try:
+                    chunk.append((row_number, validate_row(record)))
+                except RowError as e:
+                    report(row_number, str(e))
+                    continue
+                if len(chunk) >= chunk_size:
+                    flush()
+        except Exception as e:
+            # The body stopped arriving (client gone, read error): keep and report what came before
+            report(row_number + 1, f"import stopped: {e}")
+        flush()
+
+        if imported:
+            home_bundle.invalidate()
+        print(f"📥 Bulk import finished: {imported} imported, {failed} failed")
+        return {
+            "success": failed == 0,
+            "imported": imported,
+            "failed": failed,
+            "errors": errors,
+            "errors_truncated": failed > len(errors)
+        }
@@ -1,51 +1,64 @@
 from database import db
 from models import GameItem
-import json
+from home import home_bundle
+from changefeed import ChangeFeed, placeholders
+from price_options import parse_price_options, price_filter_sql, price_order_sql, save_price_options
 
 class ItemService:
     @staticmethod
-    def get_all_items() -> dict:
-        """Get all available game currency items with price options AND IMAGES"""
+    def get_all_items(variant: str = None, item_ids: list = None, min_price: float = None,
+                      max_price: float = None, sort: str = None) -> dict:
+        """Get all available game currency items with price options AND IMAGES
+
+        With a variant (e.g. "card"), the resized derivative is returned as the
+        image where one has been generated, falling back to the original upload.
+        With item_ids, only those items are returned (used by delta sync).
+        min_price/max_price keep items with a denomination in that range and
+        sort="price"/"price_desc" orders by the cheapest denomination; both
+        are evaluated by the database.
+        """
+        if item_ids is not None and not item_ids:
+            return {"success": True, "items": [], "count": 0}
+        where, params = " WHERE g.deleted_at IS NULL", ()
+        if item_ids:
+            where, params = where + f" AND g.id IN ({placeholders(item_ids)})", tuple(item_ids)
+        price_clause, price_params = price_filter_sql('g', min_price, max_price)
+        where, params = where + price_clause, params + price_params
+        # Full listings are shared by every visitor; id lookups differ per client
+        cache_ttl = 10 if item_ids is None else None
+
+        # One row per price option (or one for items without any), grouped back into items below
+        image_column, image_join, join_params = "g.image_data", "", ()
+        if variant:
+            image_column = "COALESCE(v.data, g.image_data)"
+            image_join = " LEFT JOIN image_variants v ON v.owner_type = 'item' AND v.owner_id = g.id AND v.variant = %s"
+            join_params = (variant,)
         rows = db.fetch_all(
-            "SELECT id, name, description, price, currency, game_platform, price_options, image_data, currency_icon, created_at FROM game_items"
+            "SELECT g.id, g.name, g.description, g.price, g.currency, g.game_platform, o.amount, o.price, "
+            f"{image_column}, g.currency_icon, g.created_at FROM game_items g{image_join} "
+            "LEFT JOIN item_price_options o ON o.item_id = g.id" + where + price_order_sql('g', sort) + ", o.position",
+            join_params + params,
+            cache_ttl=cache_ttl
         )
         
         if rows is not None:
             items = []
             for row in rows:
-                # Parse price_options from JSON string (LONGTEXT)
-                price_options = []
-                if row[6]:  # price_options column (LONGTEXT)
-                    try:
-                        price_options = json.loads(row[6])
-                        print(f"✅ Backend - Parsed price_options for {row[1]}: {price_options}")
-                    except json.JSONDecodeError as e:
-                        print(f"❌ Backend - JSON decode error for {row[1]}: {e}")
-                        print(f"   Raw data: {row[6]}")
-                        price_options = []
-                else:
-                    print(f"⚠️ Backend - No price_options found for {row[1]}")
-                
-                item_data = {
-                    "id": row[0],
-                    "name": row[1],
-                    "description": row[2],
-                    "price": float(row[3]),
-                    "currency": row[4],
-                    "game_platform": row[5],
-                    "priceOptions": price_options,
-                    "image": row[7],  # ✅ ADD IMAGE DATA
-                    "currency_icon": row[8],  # ✅ ADD CURRENCY ICON
-                    "created_at": row[9].isoformat() if row[9] else None
-                }
-                
-                print(f"📦 Backend - Sending item: {row[1]}")
-                print(f"   - Has image: {'image' in item_data and bool(item_data['image'])}")
-                print(f"   - Has currency_icon: {'currency_icon' in item_data and bool(item_data['currency_icon'])}")
-                print(f"   - Has priceOptions: {'priceOptions' in item_data}")
-                print(f"   - priceOptions length: {len(item_data.get('priceOptions', []))}")
-                
-                items.append(item_data)
+                if not items or items[-1]["id"] != row[0]:
+                    items.append({
+                        "id": row[0],
+                        "name": row[1],
+                        "description": row[2],
+                        "price": float(row[3]),
+                        "currency": row[4],
+                        "game_platform": row[5],
+                        "priceOptions": [],
+                        "image": row[8],  # ✅ ADD IMAGE DATA
+                        "currency_icon": row[9],  # ✅ ADD CURRENCY ICON
+                        "created_at": row[10].isoformat() if row[10] else None
+                    })
+                if row[6] is not None:
+                    items[-1]["priceOptions"].append({"amount": row[6], "price": float(row[7])})
             
             print(f"🎯 Backend - Total items to send: {len(items)}")
             return {
@@ -60,7 +73,7 @@ class ItemService:
     def get_item_by_id(item_id: int) -> dict:
         """Get specific game item by ID"""
         row = db.fetch_one(
-            "SELECT id, name, description, price, currency, game_platform, created_at FROM game_items WHERE id = %s",
+            "SELECT id, name, description, price, currency, game_platform, created_at FROM game_items WHERE id = %s AND deleted_at IS NULL",
             (item_id,)
         )
             
@@ -74,11 +87,14 @@ class ItemService:
             return {"success": False, "error": "Item not found"}
 
     @staticmethod
-    def search_items(keyword: str) -> dict:
-        """Search items by name, description, or platform"""
+    def search_items(keyword: str, min_price: float = None, max_price: float = None, sort: str = None) -> dict:
+        """Search items by name, description, or platform, optionally within a price range"""
+        price_clause, price_params = price_filter_sql('g', min_price, max_price)
         rows = db.fetch_all(
-            "SELECT id, name, description, price, currency, game_platform, created_at FROM game_items WHERE name LIKE %s OR description LIKE %s OR game_platform LIKE %s",
-            (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%")
+            "SELECT g.id, g.name, g.description, g.price, g.currency, g.game_platform, g.created_at FROM game_items g "
+            "WHERE g.deleted_at IS NULL AND (g.name LIKE %s OR g.description LIKE %s OR g.game_platform LIKE %s)"
+            + price_clause + price_order_sql('g', sort),
+            (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%") + price_params
         )
         
         if rows is not None:
@@ -101,8 +117,9 @@ class ItemService:
     def get_items_by_platform(platform: str) -> dict:
         """Get items filtered by game platform"""
         rows = db.fetch_all(
-            "SELECT id, name, description, price, currency, game_platform, created_at FROM game_items WHERE game_platform LIKE %s",
-            (f"%{platform}%",)
+            "SELECT id, name, description, price, currency, game_platform, created_at FROM game_items WHERE game_platform LIKE %s AND deleted_at IS NULL",
+            (f"%{platform}%",),
+            cache_ttl=10
         )
         
         if rows is not None:
@@ -129,10 +146,11 @@ class ItemService:
         if not name or price < 0:
             return {"success": False, "error": "Invalid item data"}
         
-        import json
-        
-        # Convert price_options to JSON string for storage
-        price_options_json = json.dumps(price_options) if price_options else '[]'
+        # Price options go to their own table, one row per denomination
+        try:
+            price_options = parse_price_options(price_options)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
         
         print(f"💾 DATABASE - SAVING:")
         print(f"   Name: {name}")
@@ -143,14 +161,23 @@ class ItemService:
         print(f"   Image length: {len(image_data) if image_data else 0}")
         print(f"   Currency icon length: {len(currency_icon) if currency_icon else 0}")
         
-        # Execute the SQL query WITH IMAGE FIELDS
-        success = db.execute(
-            "INSERT INTO game_items (name, description, price, currency, game_platform, price_options, image_data, currency_icon) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
-            (name, description, price, currency, game_platform, price_options_json, image_data, currency_icon)
-        )
+        # Execute the SQL query WITH IMAGE FIELDS, logged for delta sync in the same transaction
+        try:
+            with db.transaction() as tx:
+                tx.execute(
+                    "INSERT INTO game_items (name, description, price, currency, game_platform, image_data, currency_icon) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                    (name, description, price, currency, game_platform, image_data, currency_icon)
+                )
+                item_id = tx.lastrowid
+                save_price_options(tx, item_id, price_options)
+                ChangeFeed.record(tx, 'game_items', [item_id], 'insert')
+            success = True
+        except Exception as e:
+            print(f"❌ Database error: {e}")
+            success = False
         
         if success:
-            item_id = db.get_last_insert_id()
+            home_bundle.invalidate()
             print(f"✅ DATABASE - Item saved successfully with ID: {item_id}")
             return {
                 "success": True,
@@ -159,4 +186,28 @@ class ItemService:
             }
         else:
             print("❌ DATABASE - Failed to save item")
-            return {"success": False, "error": "Failed to add item"}
\ No newline at end of file
+            return {"success": False, "error": "Failed to add item"}
+
+    @staticmethod
+    def delete_item(item_id: int) -> dict:
+        """Admin function to delete an item.
+
+        The item is only marked deleted here, which hides it from the catalog,
+        search and purchases straight away. Its transactions are archived and
+        the row removed later by the background item purger.
+        """
+        try:
+            with db.transaction() as tx:
+                tx.execute(
+                    "UPDATE game_items SET deleted_at = CURRENT_TIMESTAMP WHERE id = %s AND deleted_at IS NULL",
+                    (item_id,)
+                )
+                if not tx.rowcount:
+                    return {"success": False, "error": "Item not found"}
+                ChangeFeed.record(tx, 'game_items', [item_id], 'delete')
+        except Exception as e:
+            print(f"❌ Error deleting item #{item_id}: {e}")
+            return {"success": False, "error": "Failed to delete item"}
+
+        home_bundle.invalidate()
+        return {"success": True, "message": "Item deleted successfully"}
@@ -0,0 +1,174 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from cache import LRUCache
+from database import db
+
+
+def _sequence_of(event: Tuple[str, str, str]) -> int:
+    return int(event[0].partition('-')[2])
+
+
+class Subscriber:
+    """One connected client: a bounded buffer of events the publisher fills and the stream drains"""
+    def __init__(self, buffer_size: int):
+        self.buffer = deque()
+        self.buffer_size = buffer_size
+        self.ready = threading.Condition()
+        self.overflowed = False
+
+    def push(self, event: Tuple[str, str, str]):
+        with self.ready:
+            if len(self.buffer) >= self.buffer_size:
+                # Too slow to keep up: cut it off rather than buffer without bound.
+                # The browser reconnects with Last-Event-ID and catches up from history.
+                self.overflowed = True
+            else:
+                self.buffer.append(event)
+            self.ready.notify()
+
+    def next_events(self, timeout: float) -> Optional[List[Tuple[str, str, str]]]:
+        """Buffered events (empty on timeout), or None once the subscriber has overflowed"""
+        with self.ready:
+            if not self.buffer and not self.overflowed:
+                self.ready.wait(timeout)
+            if self.overflowed:
+                return None
+            events = list(self.buffer)
+            self.buffer.clear()
+            return events
+
+
+class Broadcaster:
+    """In-process fan-out of server events to Server-Sent Events streams.
+
+    publish() hands each event to every connected subscriber's bounded
+    buffer and keeps the last LIVE_FEED_HISTORY events, so a client that
+    reconnects with Last-Event-ID gets what it missed. Event ids are
+    "<process epoch>-<sequence>"; an id from another process run, or older
+    than the history, gets a "reset" event telling the client to reload.
+    Streams wait on a condition between events and only wake for a
+    keep-alive comment, so an idle monitor costs no queries.
+    """
+    def __init__(self, history: int = None, buffer_size: int = None, max_clients: int = None,
+                 heartbeat: float = None):
+        self.history = deque(maxlen=history or int(os.getenv('LIVE_FEED_HISTORY', 1000)))
+        self.buffer_size = buffer_size or int(os.getenv('LIVE_FEED_CLIENT_BUFFER', 256))
+        self.max_clients = max_clients or int(os.getenv('LIVE_FEED_MAX_CLIENTS', 20))
+        self.heartbeat = heartbeat or float(os.getenv('LIVE_FEED_HEARTBEAT', 15))
+        self.epoch = format(int(time.time() * 1000), 'x')
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscriber] = []
+        self.published = 0
+        self.overflows = 0
+        self.resets = 0
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        payload = json.dumps(data, default=str)
+        with self._lock:
+            event = (f"{self.epoch}-{next(self._sequence)}", event_type, payload)
+            self.history.append(event)
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for subscriber in subscribers:
+            subscriber.push(event)
+
+    def subscribe(self, last_event_id: str = None) -> Optional[Subscriber]:
+        """Register a client, pre-filled with anything it missed; None when at max_clients"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                return None
+            subscriber = Subscriber(self.buffer_size)
+            for event in self._missed(last_event_id):
+                subscriber.buffer.append(event)
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def _missed(self, last_event_id: Optional[str]) -> List[Tuple[str, str, str]]:
+        if not last_event_id:
+            return []
+        epoch, _, sequence = last_event_id.partition('-')
+        if epoch == self.epoch and sequence.isdigit():
+            seen = int(sequence)
+            missed = [event for event in self.history if _sequence_of(event) > seen]
+            dropped = self.history and _sequence_of(self.history[0]) > seen + 1
+            if not dropped and len(missed) <= self.buffer_size:
+                return missed
+        # Missed more than we kept (or the server restarted): the client must reload
+        self.resets += 1
+        latest = self.history[-1][0] if self.history else f"{self.epoch}-0"
+        return [(latest, "reset", "{}")]
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            if subscriber.overflowed:
+                self.overflows += 1
+
+    def stream(self, subscriber: Subscriber) -> Iterator[str]:
+        """text/event-stream body for one subscriber; ends when it overflows or disconnects"""
+        try:
+            yield "retry: 3000\n: connected\n\n"
+            while True:
+                events = subscriber.next_events(self.heartbeat)
+                if events is None:
+                    return
+                if not events:
+                    yield ": keep-alive\n\n"
+                for event_id, event_type, payload in events:
+                    yield f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+        finally:
+            # Reached when the client goes away (the server closes the generator) or overflowed
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._subscribers),
+            "max_clients": self.max_clients,
+            "published": self.published,
+            "history": len(self.history),
+            "client_buffer": self.buffer_size,
+            "overflow_disconnects": self.overflows,
+            "resets": self.resets
+        }
+
+
+class TransactionFeed:
+    """Publishes each completed purchase to the admin transaction monitor"""
+    usernames = LRUCache(maxsize=int(os.getenv('LIVE_FEED_USER_CACHE_SIZE', 10000)))
+
+    def __init__(self, broadcaster: Broadcaster):
+        self.broadcaster = broadcaster
+
+    def publish(self, transaction: Dict[str, Any]):
+        """Called after the purchase committed; never fails the purchase"""
+        try:
+            user = self._user(transaction["user_id"])
+            self.broadcaster.publish("transaction", dict(
+                transaction,
+                created_at=transaction.get("created_at") or datetime.now().isoformat(timespec="seconds"),
+                user_username=user[0] if user else "Unknown User",
+                user_email=user[1] if user else "No Email"
+            ))
+        except Exception as e:
+            print(f"⚠️ Could not publish transaction #{transaction.get('id')} to the live feed: {e}")
+
+    def _user(self, user_id: int) -> Optional[Tuple[str, str]]:
+        user = self.usernames.get(user_id)
+        if user is None:
+            row = db.fetch_one("SELECT username, email FROM users WHERE id = %s", (user_id,))
+            if row:
+                user = (row[0], row[1])
+                self.usernames.set(user_id, user)
+        return user
+
+
+admin_events = Broadcaster()
+transaction_feed = TransactionFeed(admin_events)
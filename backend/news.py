@@ -1,15 +1,26 @@
 # news.py
 from database import db
+from home import home_bundle
+from changefeed import ChangeFeed, placeholders
 from typing import Dict, List, Optional
 
 class NewsService:
     @staticmethod
-    def get_all_news() -> Dict:
-        """Get all active news items"""
+    def get_all_news(news_ids: List[int] = None) -> Dict:
+        """Get all active news items, or only those among news_ids"""
         try:
-            rows = db.fetch_all(
-                "SELECT id, title, description, date, icon, is_active, created_at FROM news WHERE is_active = TRUE ORDER BY date DESC, created_at DESC"
-            )
+            if news_ids is not None and not news_ids:
+                return {"success": True, "news": [], "count": 0}
+            if news_ids:
+                rows = db.fetch_all(
+                    f"SELECT id, title, description, date, icon, is_active, created_at FROM news WHERE is_active = TRUE AND id IN ({placeholders(news_ids)}) ORDER BY date DESC, created_at DESC",
+                    tuple(news_ids)
+                )
+            else:
+                rows = db.fetch_all(
+                    "SELECT id, title, description, date, icon, is_active, created_at FROM news WHERE is_active = TRUE ORDER BY date DESC, created_at DESC",
+                    cache_ttl=30
+                )
             
             if rows is not None:
                 news_items = []
@@ -44,23 +55,20 @@ class NewsService:
             
             print(f"📰 Adding news: {title}")
             
-            success = db.execute(
-                "INSERT INTO news (title, description, date, icon) VALUES (%s, %s, %s, %s)",
-                (title, description, date, icon)
-            )
-            
-            if success:
-                news_id = db.get_last_insert_id()
-                print(f"✅ News #{news_id} added successfully")
-                return {
-                    "success": True, 
-                    "message": "News added successfully", 
-                    "news_id": news_id
-                }
-            else:
-                print("❌ Failed to add news")
-                return {"success": False, "error": "Failed to add news"}
-                
+            with db.transaction() as tx:
+                tx.execute(
+                    "INSERT INTO news (title, description, date, icon) VALUES (%s, %s, %s, %s)",
+                    (title, description, date, icon)
+                )
+                news_id = tx.lastrowid
+                ChangeFeed.record(tx, 'news', [news_id], 'insert')
+            home_bundle.invalidate()
+            print(f"✅ News #{news_id} added successfully")
+            return {
+                "success": True, 
+                "message": "News added successfully", 
+                "news_id": news_id
+            }
         except Exception as e:
             print(f"❌ Error in add_news: {e}")
             return {"success": False, "error": str(e)}
@@ -72,17 +80,16 @@ class NewsService:
             if not title or not description or not date or not icon:
                 return {"success": False, "error": "All fields are required"}
             
-            success = db.execute(
-                "UPDATE news SET title = %s, description = %s, date = %s, icon = %s WHERE id = %s",
-                (title, description, date, icon, news_id)
-            )
-            
-            if success:
-                print(f"✅ News #{news_id} updated successfully")
-                return {"success": True, "message": "News updated successfully"}
-            else:
-                return {"success": False, "error": "Failed to update news"}
-                
+            with db.transaction() as tx:
+                tx.execute(
+                    "UPDATE news SET title = %s, description = %s, date = %s, icon = %s WHERE id = %s",
+                    (title, description, date, icon, news_id)
+                )
+                if tx.rowcount:
+                    ChangeFeed.record(tx, 'news', [news_id], 'update')
+            home_bundle.invalidate()
+            print(f"✅ News #{news_id} updated successfully")
+            return {"success": True, "message": "News updated successfully"}
         except Exception as e:
             print(f"❌ Error in update_news: {e}")
             return {"success": False, "error": str(e)}
@@ -91,16 +98,16 @@ class NewsService:
     def delete_news(news_id: int) -> Dict:
         """Delete news item (soft delete by setting is_active to FALSE)"""
         try:
-            success = db.execute(
-                "UPDATE news SET is_active = FALSE WHERE id = %s",
-                (news_id,)
-            )
-            
-            if success:
-                print(f"✅ News #{news_id} deleted successfully")
-                return {"success": True, "message": "News deleted successfully"}
-            else:
-                return {"success": False, "error": "Failed to delete news"}
+            with db.transaction() as tx:
+                tx.execute(
+                    "UPDATE news SET is_active = FALSE WHERE id = %s",
+                    (news_id,)
+                )
+                if tx.rowcount:
+                    ChangeFeed.record(tx, 'news', [news_id], 'delete')
+            home_bundle.invalidate()
+            print(f"✅ News #{news_id} deleted successfully")
+            return {"success": True, "message": "News deleted successfully"}
         except Exception as e:
             print(f"❌ Error in delete_news: {e}")
             return {"success": False, "error": str(e)}
\ No newline at end of file
@@ -0,0 +1,126 @@
+import json
+from typing import Dict, List, Optional, Tuple
+from database import db, Transaction
+
+INSERT_OPTION = "INSERT INTO item_price_options (item_id, position, amount, price) VALUES (%s, %s, %s, %s)"
+
+# Catalog sort orders on the cheapest denomination of each item
+PRICE_SORTS = {"price": "ASC", "price_desc": "DESC"}
+
+
+def parse_price_options(value) -> List[Dict]:
+    """Price options as a list, a JSON string, or CSV-friendly "amount:price;amount:price" text"""
+    if value in (None, ""):
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith('['):
+            try:
+                value = json.loads(text)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"price_options is not valid JSON: {e}")
+        else:
+            value = []
+            for part in filter(None, (p.strip() for p in text.split(';'))):
+                amount, sep, price = part.partition(':')
+                if not sep:
+                    raise ValueError(f"price option '{part}' should look like amount:price")
+                value.append({"amount": amount, "price": price})
+    if not isinstance(value, list):
+        raise ValueError("price_options must be a list")
+
+    options = []
+    for option in value:
+        try:
+            amount = int(option["amount"])
+            price = round(float(option["price"]), 2)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"invalid price option {option!r}")
+        if amount <= 0 or price < 0:
+            raise ValueError(f"invalid price option {option!r}")
+        options.append({"amount": amount, "price": price})
+    return options
+
+
+def save_price_options(tx: Transaction, item_id: int, options: List[Dict]):
+    """Store an item's options in display order inside the caller's transaction"""
+    if options:
+        tx.executemany(INSERT_OPTION, [
+            (item_id, position, option["amount"], option["price"])
+            for position, option in enumerate(options)
+        ])
+
+
+def item_price_sql(alias: str) -> str:
+    """SQL for the cheapest denomination of an item: its lowest option, else its base price"""
+    return f"COALESCE((SELECT MIN(po.price) FROM item_price_options po WHERE po.item_id = {alias}.id), {alias}.price)"
+
+
+def price_filter_sql(alias: str, min_price: Optional[float], max_price: Optional[float]) -> Tuple[str, Tuple]:
+    """AND-clause keeping items with any denomination priced within the bounds"""
+    bounds, params = [], []
+    if min_price is not None:
+        bounds.append("{column} >= %s")
+        params.append(min_price)
+    if max_price is not None:
+        bounds.append("{column} <= %s")
+        params.append(max_price)
+    if not bounds:
+        return "", ()
+    on_option = " AND ".join(bounds).format(column="pf.price")
+    on_base = " AND ".join(bounds).format(column=f"{alias}.price")
+    clause = (
+        f" AND (EXISTS (SELECT 1 FROM item_price_options pf WHERE pf.item_id = {alias}.id AND {on_option})"
+        f" OR (NOT EXISTS (SELECT 1 FROM item_price_options pe WHERE pe.item_id = {alias}.id) AND {on_base}))"
+    )
+    return clause, tuple(params) * 2
+
+
+def price_order_sql(alias: str, sort: Optional[str]) -> str:
+    if sort in PRICE_SORTS:
+        return f" ORDER BY {item_price_sql(alias)} {PRICE_SORTS[sort]}, {alias}.id"
+    return f" ORDER BY {alias}.id"
+
+
+def parse_price_args(args) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+    """(min_price, max_price, sort) from request arguments; raises ValueError on bad input"""
+    def bound(name: str) -> Optional[float]:
+        value = args.get(name)
+        if value in (None, ''):
+            return None
+        number = float(value)
+        if number < 0:
+            raise ValueError(f"{name} cannot be negative")
+        return number
+
+    min_price, max_price = bound('min_price'), bound('max_price')
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError("min_price is greater than max_price")
+    sort = args.get('sort') or None
+    if sort is not None and sort not in PRICE_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(PRICE_SORTS)}")
+    return min_price, max_price, sort
+
+
+def migrate_json_price_options() -> int:
+    """Move options still held in the legacy game_items.price_options JSON column into
+    item_price_options; returns how many items were migrated"""
+    rows = db.fetch_all(
+        "SELECT id, price_options FROM game_items WHERE price_options IS NOT NULL AND price_options <> ''",
+        use_primary=True
+    ) or []
+    migrated = 0
+    for item_id, raw in rows:
+        try:
+            options = parse_price_options(raw)
+        except ValueError as e:
+            print(f"⚠️ Item #{item_id} has unreadable price options, dropping them: {e}")
+            options = []
+        with db.transaction() as tx:
+            tx.execute("DELETE FROM item_price_options WHERE item_id = %s", (item_id,))
+            save_price_options(tx, item_id, options)
+            tx.execute("UPDATE game_items SET price_options = NULL WHERE id = %s", (item_id,))
+        migrated += 1
+    if migrated:
+        print(f"💰 Migrated price options of {migrated} items to item_price_options")
+    return migrated
@@ -0,0 +1,194 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+FORMATS = ('pstats', 'collapsed')
+TOKEN_HEADER = 'X-Profile-Token'
+FORMAT_HEADER = 'X-Profile-Format'
+PROFILE_NAME = re.compile(r'^[\w.-]+\.(prof|collapsed)$')
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval into collapsed-stack counts.
+
+    The output ("outer;inner;leaf count" per line) is what flamegraph.pl and
+    speedscope read. Sampling sees real call stacks, which cProfile's
+    caller/callee totals cannot reconstruct.
+    """
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """Opt-in profiling of individual API requests.
+
+    A request is profiled when it is picked by PROFILE_SAMPLE_RATE (0 turns
+    sampling off) or carries an X-Profile-Token header matching PROFILE_TOKEN.
+    Profiles are written to PROFILE_DIR as cProfile .prof files (open with
+    pstats or snakeviz) or as collapsed stacks for flamegraphs, and the
+    slowest recent ones are listed per route. One request is profiled at a
+    time, so turning sampling on cannot pile up profiler overhead.
+    """
+    def __init__(self, sample_rate: float = None, token: str = None, directory: str = None, fmt: str = None):
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+        self.token = token if token is not None else os.getenv('PROFILE_TOKEN', '')
+        self.directory = directory or os.getenv('PROFILE_DIR', 'profiles')
+        self.format = fmt or os.getenv('PROFILE_FORMAT', 'pstats')
+        if self.format not in FORMATS:
+            raise ValueError(f"PROFILE_FORMAT must be one of: {', '.join(FORMATS)}")
+        self.sample_interval = float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.001))
+        self.keep_per_route = int(os.getenv('PROFILE_KEEP_PER_ROUTE', 20))
+        self.max_files = int(os.getenv('PROFILE_MAX_FILES', 500))
+        self._busy = threading.Lock()
+        self._records = defaultdict(lambda: deque(maxlen=self.keep_per_route))
+        self._files = deque()
+        self._records_lock = threading.Lock()
+        self.profiled = 0
+        self.skipped_busy = 0
+
+    def wanted(self, headers) -> Optional[str]:
+        """Why this request should be profiled ('requested' or 'sampled'), or None"""
+        supplied = headers.get(TOKEN_HEADER)
+        if supplied and self.token and hmac.compare_digest(supplied, self.token):
+            return 'requested'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    def start(self, reason: str, fmt: str = None) -> Optional[Dict[str, Any]]:
+        """Begin profiling the current thread; None when another request is being profiled"""
+        if not self._busy.acquire(blocking=False):
+            self.skipped_busy += 1
+            return None
+        fmt = fmt if fmt in FORMATS else self.format
+        session = {"reason": reason, "format": fmt, "started": time.perf_counter()}
+        if fmt == 'collapsed':
+            session["sampler"] = StackSampler(threading.get_ident(), self.sample_interval)
+            session["sampler"].start()
+        else:
+            session["profile"] = cProfile.Profile()
+            session["profile"].enable()
+        return session
+
+    def finish(self, session: Dict[str, Any], method: str, route: str, path: str, status: int) -> Dict[str, Any]:
+        """Stop profiling, write the profile file and remember it under its route"""
+        duration_ms = (time.perf_counter() - session["started"]) * 1000
+        try:
+            if "profile" in session:
+                session["profile"].disable()
+            else:
+                session["sampler"].stop()
+        finally:
+            self._busy.release()
+
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r'[^\w]+', '_', route).strip('_') or 'root'
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        if "profile" in session:
+            name = f"{stamp}_{method}_{slug}_{duration_ms:.0f}ms.prof"
+            session["profile"].dump_stats(os.path.join(self.directory, name))
+            top = self._top_functions(session["profile"])
+        else:
+            name = f"{stamp}_{method}_{slug}_{duration_ms:.0f}ms.collapsed"
+            session["sampler"].dump(os.path.join(self.directory, name))
+            top = [{"stack": stack.rsplit(';', 1)[-1], "samples": count}
+                   for stack, count in session["sampler"].stacks.most_common(5)]
+
+        record = {
+            "route": f"{method} {route}",
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration_ms, 1),
+            "reason": session["reason"],
+            "format": session["format"],
+            "file": name,
+            "profiled_at": datetime.now().isoformat(timespec="seconds"),
+            "top": top
+        }
+        with self._records_lock:
+            self._records[record["route"]].append(record)
+            self._files.append(name)
+            while len(self._files) > self.max_files:
+                self._remove(self._files.popleft())
+            self.profiled += 1
+        return record
+
+    @staticmethod
+    def _top_functions(profile: cProfile.Profile, limit: int = 5) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [{
+            "function": f"{func} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "cumulative_ms": round(cumulative * 1000, 2)
+        } for (filename, line, func), (_, calls, _, cumulative, _) in rows[:limit]]
+
+    def _remove(self, name: str):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Absolute path of a profile this process wrote, or None for unknown names"""
+        if not PROFILE_NAME.match(name) or name not in self._files:
+            return None
+        return os.path.abspath(os.path.join(self.directory, name))
+
+    def slowest(self, route: str = None, limit: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """Slowest recent profiles per route, slowest routes first"""
+        with self._records_lock:
+            routes = {r: list(records) for r, records in self._records.items() if route is None or route in r}
+        result = {r: sorted(records, key=lambda rec: rec["duration_ms"], reverse=True)[:limit]
+                  for r, records in routes.items()}
+        return dict(sorted(result.items(), key=lambda item: item[1][0]["duration_ms"], reverse=True))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "token_enabled": bool(self.token),
+            "directory": os.path.abspath(self.directory),
+            "format": self.format,
+            "profiled": self.profiled,
+            "skipped_busy": self.skipped_busy
+        }
+
+
+profiler = RequestProfiler()
@@ -1,14 +1,36 @@
 from database import db
+from home import home_bundle
+from changefeed import ChangeFeed, placeholders
 import json
 
 class PromoService:
     @staticmethod
-    def get_all_promos() -> dict:
-        """Get all active promo images"""
+    def get_all_promos(variant: str = None, promo_ids: list = None) -> dict:
+        """Get all active promo images, resized to the variant (e.g. "banner") when one exists.
+        With promo_ids, only those promos are returned (used by delta sync)."""
         try:
-            rows = db.fetch_all(
-                "SELECT id, image_data, title, description, is_active, created_at FROM promos WHERE is_active = TRUE ORDER BY created_at DESC"
-            )
+            if promo_ids is not None and not promo_ids:
+                return {"success": True, "promos": [], "count": 0}
+            where, params = "", ()
+            if promo_ids:
+                where, params = f" AND p.id IN ({placeholders(promo_ids)})", tuple(promo_ids)
+            cache_ttl = 30 if promo_ids is None else None
+
+            if variant:
+                rows = db.fetch_all(
+                    "SELECT p.id, COALESCE(v.data, p.image_data), p.title, p.description, p.is_active, p.created_at FROM promos p "
+                    "LEFT JOIN image_variants v ON v.owner_type = 'promo' AND v.owner_id = p.id AND v.variant = %s "
+                    "WHERE p.is_active = TRUE" + where + " ORDER BY p.created_at DESC",
+                    (variant,) + params,
+                    cache_ttl=cache_ttl
+                )
+            else:
+                rows = db.fetch_all(
+                    "SELECT p.id, p.image_data, p.title, p.description, p.is_active, p.created_at FROM promos p "
+                    "WHERE p.is_active = TRUE" + where + " ORDER BY p.created_at DESC",
+                    params,
+                    cache_ttl=cache_ttl
+                )
             
             if rows is not None:
                 promos = []
@@ -42,19 +64,16 @@ class PromoService:
             
             print(f"📸 Adding promo image...")  # Simple message only
             
-            success = db.execute(
-                "INSERT INTO promos (image_data, title, description) VALUES (%s, %s, %s)",
-                (image_base64, title, description)
-            )
-            
-            if success:
-                promo_id = db.get_last_insert_id()
-                print(f"✅ Promo #{promo_id} added")
-                return {"success": True, "message": "Promo added successfully", "promo_id": promo_id}
-            else:
-                print("❌ Failed to add promo")
-                return {"success": False, "error": "Failed to add promo"}
-                
+            with db.transaction() as tx:
+                tx.execute(
+                    "INSERT INTO promos (image_data, title, description) VALUES (%s, %s, %s)",
+                    (image_base64, title, description)
+                )
+                promo_id = tx.lastrowid
+                ChangeFeed.record(tx, 'promos', [promo_id], 'insert')
+            home_bundle.invalidate()
+            print(f"✅ Promo #{promo_id} added")
+            return {"success": True, "message": "Promo added successfully", "promo_id": promo_id}
         except Exception as e:
             print(f"❌ Error: {e}")
             return {"success": False, "error": str(e)}
@@ -63,12 +82,12 @@ class PromoService:
     def delete_promo(promo_id: int) -> dict:
         """Delete promo by ID"""
         try:
-            success = db.execute("DELETE FROM promos WHERE id = %s", (promo_id,))
-            
-            if success:
-                return {"success": True, "message": "Promo deleted successfully"}
-            else:
-                return {"success": False, "error": "Failed to delete promo"}
+            with db.transaction() as tx:
+                tx.execute("DELETE FROM promos WHERE id = %s", (promo_id,))
+                if tx.rowcount:
+                    ChangeFeed.record(tx, 'promos', [promo_id], 'delete')
+            home_bundle.invalidate()
+            return {"success": True, "message": "Promo deleted successfully"}
         except Exception as e:
             print(f"❌ Error in delete_promo: {e}")
             return {"success": False, "error": str(e)}
\ No newline at end of file
@@ -0,0 +1,107 @@
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+from cache import LRUCache
+
+MISS = object()
+
+_WHITESPACE = re.compile(r"\s+")
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?((?:\s+(?:AS\s+)?\w+)?(?:\s*,\s*`?\w+`?(?:\s+(?:AS\s+)?\w+)?)*)", re.IGNORECASE)
+_LIST_TABLES = re.compile(r",\s*`?(\w+)`?", re.IGNORECASE)
+_WRITE_TABLE = re.compile(
+    r"^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?|"
+    r"ALTER\s+TABLE|DROP\s+TABLE(?:\s+IF\s+EXISTS)?)\s+`?(\w+)`?",
+    re.IGNORECASE
+)
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so differently formatted copies of a query share a key"""
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+def tables_read(query: str) -> Set[str]:
+    """Tables named in FROM/JOIN clauses"""
+    tables = set()
+    for match in _READ_TABLES.finditer(query):
+        tables.add(match.group(1).lower())
+        tables.update(t.lower() for t in _LIST_TABLES.findall(match.group(2) or ""))
+    return tables
+
+
+def table_written(query: str) -> Optional[str]:
+    """Table an INSERT/UPDATE/DELETE targets, or None if it can't be told"""
+    match = _WRITE_TABLE.match(query)
+    return match.group(1).lower() if match else None
+
+
+class QueryCache:
+    """Result cache for read queries, invalidated by writes to the tables they read"""
+    def __init__(self, maxsize: int = None, enabled: bool = None):
+        if enabled is None:
+            enabled = os.getenv('DB_QUERY_CACHE', 'true').lower() in ('1', 'true', 'yes', 'on')
+        self.enabled = enabled
+        self.entries = LRUCache(maxsize or int(os.getenv('DB_QUERY_CACHE_SIZE', 1000)))
+        self._tables_by_key: Dict[Hashable, Set[str]] = {}
+        self._keys_by_table: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, query: str, params: Tuple) -> Hashable:
+        return (kind, normalize_query(query), tuple(params))
+
+    def get(self, key: Hashable) -> Any:
+        return self.entries.get(key, MISS)
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Write generations of the tables, taken before the query runs"""
+        with self._lock:
+            return tuple(self._generations[t] for t in sorted(tables))
+
+    def set(self, key: Hashable, tables: Set[str], value: Any, ttl: float, snapshot: Tuple[int, ...]):
+        """Store a result unless one of its tables was written while the query ran"""
+        # Stored under the lock, so an invalidation can't land between the check and the store
+        with self._lock:
+            if snapshot != tuple(self._generations[t] for t in sorted(tables)):
+                return
+            self._tables_by_key[key] = tables
+            for table in tables:
+                self._keys_by_table[table].add(key)
+            self.entries.set(key, value, ttl)
+            if len(self._tables_by_key) > 2 * self.entries.maxsize:
+                self._forget_evicted()
+
+    def _forget_evicted(self):
+        for key in [k for k in self._tables_by_key if k not in self.entries]:
+            for table in self._tables_by_key.pop(key):
+                self._keys_by_table[table].discard(key)
+
+    def invalidate_table(self, table: Optional[str]):
+        """Drop every cached result that read from the table (everything if unknown)"""
+        if table is None:
+            self.invalidate_all()
+            return
+        with self._lock:
+            self._generations[table] += 1
+            keys = self._keys_by_table.pop(table, set())
+            for key in keys:
+                for other in self._tables_by_key.pop(key, ()):
+                    if other != table:
+                        self._keys_by_table[other].discard(key)
+                self.entries.delete(key)
+
+    def invalidate_all(self):
+        with self._lock:
+            for table in list(self._generations):
+                self._generations[table] += 1
+            self._tables_by_key.clear()
+            self._keys_by_table.clear()
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.entries.stats()
+        stats["enabled"] = self.enabled
+        return stats
@@ -0,0 +1,164 @@
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from query_cache import normalize_query
+
+_IN_LIST = re.compile(r"\bIN\s*\(\s*%s(?:\s*,\s*%s)*\s*\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def query_shape(query: str) -> str:
+    """Query text with literals and IN lists folded, so repeats of one statement share a shape"""
+    shape = normalize_query(query)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    shape = _STRING.sub("?", shape)
+    return _NUMBER.sub("?", shape)
+
+
+class ShapeStats:
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+    def add(self, duration_ms: float, rows: int):
+        self.calls += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.rows += max(rows, 0)
+
+
+class QueryLog:
+    """What the database did for each request, and which statements cost the most.
+
+    Every query is recorded under its shape for the rolling top-N (two
+    windows of QUERY_STATS_WINDOW seconds, current and previous). Inside a
+    request the queries are also listed so that one shape repeated more than
+    N_PLUS_ONE_THRESHOLD times - a loop fetching rows one at a time - gets
+    flagged. Queries slower than SLOW_QUERY_MS are logged with their plan,
+    each shape explained at most once per window.
+    """
+    def __init__(self, enabled: bool = None, slow_ms: float = None, repeat_threshold: int = None):
+        if enabled is None:
+            enabled = os.getenv('QUERY_LOG', 'true').lower() in ('1', 'true', 'yes', 'on')
+        self.enabled = enabled
+        self.slow_ms = slow_ms if slow_ms is not None else float(os.getenv('SLOW_QUERY_MS', 200))
+        self.repeat_threshold = repeat_threshold or int(os.getenv('N_PLUS_ONE_THRESHOLD', 10))
+        self.window = float(os.getenv('QUERY_STATS_WINDOW', 300))
+        self.max_shapes = int(os.getenv('QUERY_STATS_MAX_SHAPES', 2000))
+        self.max_per_request = int(os.getenv('QUERY_LOG_MAX_PER_REQUEST', 1000))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._current: Dict[str, ShapeStats] = {}
+        self._previous: Dict[str, ShapeStats] = {}
+        self._window_started = time.monotonic()
+        self._explained: Dict[str, float] = {}
+        self.slow = deque(maxlen=50)
+        self.repeats = deque(maxlen=50)
+
+    def begin_request(self):
+        self._local.queries = [] if self.enabled else None
+
+    def record(self, query: str, duration_ms: float, rows: int, explain: Callable[[], List] = None):
+        if not self.enabled:
+            return
+        shape = query_shape(query)
+        queries = getattr(self._local, 'queries', None)
+        if queries is not None and len(queries) < self.max_per_request:
+            queries.append((shape, duration_ms, rows))
+
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_started >= self.window:
+                self._previous, self._current = self._current, {}
+                self._window_started = now
+                self._explained.clear()
+            stats = self._current.get(shape)
+            if stats is None and len(self._current) < self.max_shapes:
+                stats = self._current[shape] = ShapeStats()
+            if stats is not None:
+                stats.add(duration_ms, rows)
+            explain_now = (duration_ms >= self.slow_ms and explain is not None and shape not in self._explained)
+            if explain_now:
+                self._explained[shape] = now
+
+        if duration_ms >= self.slow_ms:
+            self._log_slow(shape, duration_ms, rows, explain if explain_now else None)
+
+    def _log_slow(self, shape: str, duration_ms: float, rows: int, explain: Optional[Callable[[], List]]):
+        plan = None
+        if explain is not None:
+            try:
+                plan = [" | ".join(str(column) for column in row) for row in explain()]
+            except Exception as e:
+                plan = [f"EXPLAIN failed: {e}"]
+        rows = rows if rows >= 0 else None  # drivers report -1 when they can't tell
+        print(f"🐢 Slow query ({duration_ms:.0f} ms, {rows if rows is not None else '?'} rows): {shape}")
+        for line in plan or []:
+            print(f"   {line}")
+        self.slow.append({
+            "query": shape,
+            "duration_ms": round(duration_ms, 1),
+            "rows": rows,
+            "plan": plan,
+            "at": datetime.now().isoformat(timespec="seconds")
+        })
+
+    def end_request(self, route: str) -> Optional[Dict[str, Any]]:
+        """Summarize the request's queries, flagging any shape repeated past the threshold"""
+        queries = getattr(self._local, 'queries', None)
+        self._local.queries = None
+        if not queries:
+            return None
+        counts = Counter(shape for shape, _, _ in queries)
+        repeated = [{"query": shape, "count": count} for shape, count in counts.most_common() if count > self.repeat_threshold]
+        summary = {
+            "route": route,
+            "queries": len(queries),
+            "total_ms": round(sum(duration for _, duration, _ in queries), 1),
+            "repeated": repeated
+        }
+        if repeated:
+            for entry in repeated:
+                print(f"⚠️ {route} ran the same query {entry['count']} times (N+1?): {entry['query']}")
+            self.repeats.append(dict(summary, at=datetime.now().isoformat(timespec="seconds")))
+        return summary
+
+    def top(self, limit: int = 20, order: str = "total_ms") -> List[Dict[str, Any]]:
+        """Most expensive query shapes over the current and previous windows"""
+        with self._lock:
+            merged: Dict[str, ShapeStats] = {}
+            for window in (self._previous, self._current):
+                for shape, stats in window.items():
+                    total = merged.setdefault(shape, ShapeStats())
+                    total.calls += stats.calls
+                    total.total_ms += stats.total_ms
+                    total.max_ms = max(total.max_ms, stats.max_ms)
+                    total.rows += stats.rows
+        rows = [{
+            "query": shape,
+            "calls": stats.calls,
+            "total_ms": round(stats.total_ms, 1),
+            "avg_ms": round(stats.total_ms / stats.calls, 2),
+            "max_ms": round(stats.max_ms, 1),
+            "avg_rows": round(stats.rows / stats.calls, 1)
+        } for shape, stats in merged.items()]
+        rows.sort(key=lambda row: row[order], reverse=True)
+        return rows[:limit]
+
+    def stats(self, limit: int = 20, order: str = "total_ms") -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "slow_query_ms": self.slow_ms,
+            "n_plus_one_threshold": self.repeat_threshold,
+            "window_seconds": self.window,
+            "top": self.top(limit, order),
+            "slow": list(self.slow)[::-1],
+            "repeated_queries": list(self.repeats)[::-1]
+        }
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from typing import List, Optional, Dict, Any
+from db_backends import StorageBackend
+
+
+class Replica:
+    """A read replica and what we know about its health"""
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.latency_ms = None
+        self.reads = 0
+        self.failures = 0
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.describe(),
+            "healthy": self.is_available(time.monotonic()),
+            "consecutive_failures": self.consecutive_failures,
+            "latency_ms": round(self.latency_ms, 2) if self.latency_ms is not None else None,
+            "reads": self.reads,
+            "failures": self.failures
+        }
+
+
+class ReplicaRouter:
+    """Picks a healthy read replica, backing off from ones that fail"""
+    def __init__(self, backends: List[StorageBackend], base_backoff: float = None, max_backoff: float = None):
+        self.replicas = [Replica(backend) for backend in backends]
+        self.base_backoff = base_backoff if base_backoff is not None else float(os.getenv('DB_REPLICA_BACKOFF', 1))
+        self.max_backoff = max_backoff if max_backoff is not None else float(os.getenv('DB_REPLICA_MAX_BACKOFF', 30))
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def choose(self) -> Optional[Replica]:
+        """Next healthy replica in round-robin order, or None if all are backing off"""
+        now = time.monotonic()
+        with self._lock:
+            available = [r for r in self.replicas if r.is_available(now)]
+            if not available:
+                return None
+            self._next = (self._next + 1) % len(available)
+            return available[self._next]
+
+    def record_success(self, replica: Replica, latency_ms: float):
+        with self._lock:
+            replica.reads += 1
+            replica.consecutive_failures = 0
+            replica.down_until = 0.0
+            # Smoothed latency for the admin database status
+            if replica.latency_ms is None:
+                replica.latency_ms = latency_ms
+            else:
+                replica.latency_ms = 0.8 * replica.latency_ms + 0.2 * latency_ms
+
+    def record_failure(self, replica: Replica):
+        with self._lock:
+            replica.failures += 1
+            replica.consecutive_failures += 1
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (replica.consecutive_failures - 1))
+            replica.down_until = time.monotonic() + backoff
+        print(f"⚠️ Read replica {replica.backend.describe()} failed, retrying it in {backoff:.0f}s")
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [replica.to_dict() for replica in self.replicas]
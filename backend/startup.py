@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Any
+
+
+class StartupPhase:
+    """One named step of server startup"""
+    def __init__(self, name: str, func: Callable, depends_on: List[str] = None, required: bool = True):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on or [])
+        self.required = required
+        self.status = "pending"
+        self.error = None
+        self.duration_ms = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "required": self.required,
+            "depends_on": self.depends_on,
+            "duration_ms": round(self.duration_ms, 1) if self.duration_ms is not None else None,
+            "error": self.error
+        }
+
+
+class StartupManager:
+    """Runs startup phases in dependency order, independent phases in parallel"""
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or int(os.getenv('STARTUP_WORKERS', 4))
+        self.phases: Dict[str, StartupPhase] = {}
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def add_phase(self, name: str, func: Callable, depends_on: List[str] = None, required: bool = True):
+        """Register a phase; phases only start once everything they depend on has finished"""
+        if name in self.phases:
+            raise ValueError(f"Startup phase '{name}' already registered")
+        for dependency in depends_on or []:
+            if dependency not in self.phases:
+                raise ValueError(f"Startup phase '{name}' depends on unknown phase '{dependency}'")
+        self.phases[name] = StartupPhase(name, func, depends_on, required)
+
+    def _run_phase(self, phase: StartupPhase):
+        phase.status = "running"
+        start = time.perf_counter()
+        try:
+            phase.func()
+            phase.status = "done"
+        except Exception as e:
+            phase.status = "failed"
+            phase.error = str(e)
+        finally:
+            phase.duration_ms = (time.perf_counter() - start) * 1000
+
+        if phase.status == "done":
+            print(f"⏱️ Startup phase '{phase.name}' finished in {phase.duration_ms:.1f} ms")
+        else:
+            print(f"❌ Startup phase '{phase.name}' failed after {phase.duration_ms:.1f} ms: {phase.error}")
+
+    def run(self):
+        """Run all phases and block until they have finished"""
+        self.started_at = time.perf_counter()
+        pending = dict(self.phases)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup") as executor:
+            while pending or running:
+                for name, phase in list(pending.items()):
+                    dependencies = [self.phases[d] for d in phase.depends_on]
+                    if any(d.status in ("failed", "skipped") for d in dependencies):
+                        phase.status = "skipped"
+                        phase.error = "dependency did not complete"
+                        print(f"⚠️ Startup phase '{name}' skipped: dependency did not complete")
+                        del pending[name]
+                    elif all(d.status == "done" for d in dependencies):
+                        running[executor.submit(self._run_phase, phase)] = phase
+                        del pending[name]
+
+                if not running:
+                    break
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    del running[future]
+
+        self.finished_at = time.perf_counter()
+        self._done.set()
+
+        total_ms = (self.finished_at - self.started_at) * 1000
+        breakdown = ", ".join(
+            f"{p.name}={p.duration_ms:.1f}ms" if p.duration_ms is not None else f"{p.name}={p.status}"
+            for p in self.phases.values()
+        )
+        print(f"🚀 Startup finished in {total_ms:.1f} ms ({breakdown})")
+
+    def start(self):
+        """Run startup in a background thread so the app can answer health checks immediately"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="startup", daemon=True)
+                self._thread.start()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until startup has finished"""
+        return self._done.wait(timeout)
+
+    def is_done(self, name: str) -> bool:
+        """True once the named phase completed successfully"""
+        return self.phases[name].status == "done"
+
+    def is_ready(self) -> bool:
+        """True once every required phase completed successfully"""
+        return all(p.status == "done" for p in self.phases.values() if p.required)
+
+    def status(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at is not None:
+            end = self.finished_at if self.finished_at is not None else time.perf_counter()
+            elapsed = round((end - self.started_at) * 1000, 1)
+
+        return {
+            "ready": self.is_ready(),
+            "finished": self._done.is_set(),
+            "elapsed_ms": elapsed,
+            "phases": [phase.to_dict() for phase in self.phases.values()]
+        }
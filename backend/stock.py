@@ -0,0 +1,112 @@
+import os
+import random
+from typing import List, Tuple
+from database import db, Transaction
+
+# Counter rows a limited item's stock is split across
+STOCK_SHARDS = int(os.getenv('STOCK_SHARDS', 16))
+
+
+class OutOfStock(Exception):
+    pass
+
+
+class StockService:
+    """Stock for limited-quantity items, kept as a sharded counter.
+
+    An item's remaining stock is split over several item_stock_shards rows.
+    A purchase decrements one shard picked at random with a conditional
+    UPDATE (remaining >= quantity), so concurrent buyers of the same item
+    mostly lock different rows instead of queueing on one hot row, and a
+    shard can never go below zero. When the picked shard is short the
+    others are tried in shard order, and a quantity no single shard can
+    cover is gathered from several, also in shard order; a failed
+    conditional UPDATE still locks its row, so buyers falling back must
+    take locks in the same order. Items without shard rows have unlimited
+    stock.
+    """
+    @staticmethod
+    def set_stock(item_id: int, quantity: int, shards: int = None) -> dict:
+        """Make an item limited to `quantity` more sales (replacing any earlier stock)"""
+        shards = shards or STOCK_SHARDS
+        if quantity < 0 or shards < 1:
+            return {"success": False, "error": "quantity must be >= 0 and shards >= 1"}
+        base, extra = divmod(quantity, shards)
+        try:
+            with db.transaction() as tx:
+                tx.execute("SELECT id FROM game_items WHERE id = %s AND deleted_at IS NULL", (item_id,))
+                if tx.fetchone() is None:
+                    return {"success": False, "error": "Item not found"}
+                tx.execute("DELETE FROM item_stock_shards WHERE item_id = %s", (item_id,))
+                tx.executemany(
+                    "INSERT INTO item_stock_shards (item_id, shard, remaining) VALUES (%s, %s, %s)",
+                    [(item_id, shard, base + (1 if shard < extra else 0)) for shard in range(shards)]
+                )
+        except Exception as e:
+            print(f"❌ Could not set stock of item #{item_id}: {e}")
+            return {"success": False, "error": "Failed to set stock"}
+        return {"success": True, "item_id": item_id, "stock": quantity, "shards": shards}
+
+    @staticmethod
+    def remove_limit(item_id: int) -> dict:
+        """Make an item unlimited again"""
+        with db.transaction() as tx:
+            tx.execute("DELETE FROM item_stock_shards WHERE item_id = %s", (item_id,))
+        return {"success": True, "item_id": item_id, "limited": False}
+
+    @staticmethod
+    def get_stock(item_id: int) -> dict:
+        row = db.fetch_one(
+            "SELECT COUNT(*), SUM(remaining) FROM item_stock_shards WHERE item_id = %s", (item_id,), use_primary=True
+        )
+        shards = row[0] if row else 0
+        return {
+            "success": True,
+            "item_id": item_id,
+            "limited": bool(shards),
+            "remaining": int(row[1]) if shards else None,
+            "shards": shards
+        }
+
+    @staticmethod
+    def take(tx: Transaction, item_id: int, quantity: int):
+        """Reserve stock inside the purchase transaction; raises OutOfStock if there isn't enough.
+
+        Nothing to do for unlimited items. On OutOfStock (or any later
+        failure) the caller's rollback puts back whatever was taken.
+        """
+        tx.execute("SELECT shard, remaining FROM item_stock_shards WHERE item_id = %s", (item_id,))
+        shards: List[Tuple[int, int]] = tx.fetchall()
+        if not shards:
+            return
+        if quantity < 1:
+            raise ValueError("quantity must be positive")
+
+        # Usual case: one shard covers the purchase. Start at a random one, then go in shard order.
+        candidates = sorted(shard for shard, remaining in shards if remaining >= quantity)
+        if candidates:
+            first = candidates.pop(random.randrange(len(candidates)))
+            for shard in [first] + candidates:
+                if StockService._decrement(tx, item_id, shard, quantity):
+                    return
+
+        # Gather from several shards; the counts read above may be stale, so re-check each
+        needed = quantity
+        for shard, _ in sorted(shards):
+            tx.execute("SELECT remaining FROM item_stock_shards WHERE item_id = %s AND shard = %s", (item_id, shard))
+            row = tx.fetchone()
+            portion = min(needed, row[0] if row else 0)
+            if portion > 0 and StockService._decrement(tx, item_id, shard, portion):
+                needed -= portion
+                if not needed:
+                    return
+        raise OutOfStock(f"Item #{item_id} is out of stock")
+
+    @staticmethod
+    def _decrement(tx: Transaction, item_id: int, shard: int, quantity: int) -> bool:
+        tx.execute(
+            "UPDATE item_stock_shards SET remaining = remaining - %s "
+            "WHERE item_id = %s AND shard = %s AND remaining >= %s",
+            (quantity, item_id, shard, quantity)
+        )
+        return tx.rowcount == 1
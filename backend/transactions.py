@@ -1,7 +1,37 @@
-from database import db
+import itertools
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from database import db, Transaction
 from items import ItemService
+from cache import LRUCache
+from group_commit import purchase_writer
+from stock import StockService, OutOfStock
+from live_feed import transaction_feed
+
+# Profile pages show the most recent purchases; older pages are fetched by cursor
+USER_HISTORY_PAGE_SIZE = int(os.getenv('USER_HISTORY_PAGE_SIZE', 20))
+USER_HISTORY_MAX_PAGE_SIZE = 100
+
+USER_HISTORY_COLUMNS = '''
+    SELECT t.id, t.user_id, t.item_id, t.status, t.final_price, t.quantity, t.created_at,
+        g.name as item_name, g.currency, g.game_platform
+    FROM transactions t
+    JOIN game_items g ON t.item_id = g.id
+'''
 
 class TransactionService:
+    # First page of each user's history (with their summary) for a short while;
+    # the user's next purchase drops it
+    recent_history = LRUCache(
+        maxsize=int(os.getenv('USER_HISTORY_CACHE_SIZE', 5000)),
+        ttl=float(os.getenv('USER_HISTORY_CACHE_TTL', 30))
+    )
+    # Stamp of each buyer's latest purchase, so a history read that overlapped
+    # one doesn't put what it read (possibly from before the purchase) back in the cache
+    history_writes = LRUCache(maxsize=int(os.getenv('USER_HISTORY_CACHE_SIZE', 5000)) * 4)
+    _write_stamps = itertools.count(1)
+
     @staticmethod
     def purchase_item(user_id: int, item_id: int, quantity: int = 1, final_price: float = None) -> dict:
         """Handle purchase of game currency with custom price support"""
@@ -18,30 +48,113 @@ class TransactionService:
         else:
             actual_price = item_data['price'] * quantity
         
-        # Create transaction
-        success = db.execute(
-            "INSERT INTO transactions (user_id, item_id, status, final_price, quantity) VALUES (%s, %s, %s, %s, %s)",
-            (user_id, item_id, "completed", actual_price, quantity)
-        )
-        
-        if success:
-            transaction_id = db.get_last_insert_id()
-            return {
-                "success": True,
-                "message": "Purchase completed successfully",
-                "transaction": {
-                    "id": transaction_id,
-                    "user_id": user_id,
-                    "item_id": item_id,
-                    "status": "completed",
-                    "final_price": actual_price,
-                    "quantity": quantity,
-                    "item_name": item_data['name'],
-                    "currency": item_data['currency']
-                }
-            }
-        else:
+        # Take stock, create the transaction and roll it into the buyer's summary together
+        def write(tx: Transaction) -> int:
+            StockService.take(tx, item_id, quantity)
+            tx.execute(
+                "INSERT INTO transactions (user_id, item_id, status, final_price, quantity) VALUES (%s, %s, %s, %s, %s)",
+                (user_id, item_id, "completed", actual_price, quantity)
+            )
+            transaction_id = tx.lastrowid
+            TransactionService._record_purchase(tx, user_id, transaction_id, item_data['currency'] or 'PHP', actual_price)
+            return transaction_id
+
+        try:
+            if purchase_writer.enabled:
+                # Shares one commit with the other purchases arriving in the same few milliseconds
+                transaction_id = purchase_writer.submit(write)
+            else:
+                transaction_id = db.run_transaction(write)
+        except OutOfStock:
+            return {"success": False, "error": "Out of stock"}
+        except Exception as e:
+            print(f"❌ Purchase failed: {e}")
             return {"success": False, "error": "Transaction failed"}
+        finally:
+            TransactionService.history_writes.set(user_id, next(TransactionService._write_stamps))
+            TransactionService.recent_history.delete(user_id)
+
+        transaction = {
+            "id": transaction_id,
+            "user_id": user_id,
+            "item_id": item_id,
+            "status": "completed",
+            "final_price": actual_price,
+            "quantity": quantity,
+            "item_name": item_data['name'],
+            "currency": item_data['currency']
+        }
+        # Push to admin monitors watching the live transaction stream
+        transaction_feed.publish(dict(transaction, game_platform=item_data.get('game_platform')))
+
+        return {
+            "success": True,
+            "message": "Purchase completed successfully",
+            "transaction": transaction
+        }
+
+    @staticmethod
+    def _record_purchase(tx: Transaction, user_id: int, transaction_id: int, currency: str, amount: float):
+        """Add one purchase to the user's summary rows inside the purchase transaction.
+
+        Upserts rather than UPDATE-then-INSERT: MySQL's rowcount counts changed
+        rows, so adding a zero-price purchase to an existing row would look
+        like a missing row.
+        """
+        backend = db.backend
+        tx.execute(
+            backend.upsert(
+                "user_purchase_summary", ["user_id", "order_count", "last_purchase_at", "last_transaction_id"], ["user_id"],
+                {"order_count": "order_count + 1",
+                 "last_purchase_at": backend.inserted("last_purchase_at"),
+                 "last_transaction_id": backend.inserted("last_transaction_id")},
+                source="VALUES (%s, 1, CURRENT_TIMESTAMP, %s)"
+            ),
+            (user_id, transaction_id)
+        )
+        tx.execute(
+            backend.upsert(
+                "user_spend_by_currency", ["user_id", "currency", "total"], ["user_id", "currency"],
+                {"total": f"total + {backend.inserted('total')}"}
+            ),
+            (user_id, currency, amount)
+        )
+
+    @staticmethod
+    def backfill_summaries() -> int:
+        """Build summaries for buyers whose purchases predate them; returns how many users were added.
+
+        A required startup phase: the purchase endpoint refuses orders until it
+        has finished, since a purchase recorded first would create the buyer's
+        summary from that one order and the backfill would then skip them.
+        Rows another worker's backfill wrote meanwhile are left alone.
+        """
+        backend = db.backend
+
+        def backfill(tx: Transaction) -> int:
+            tx.execute(
+                backend.upsert(
+                    "user_spend_by_currency", ["user_id", "currency", "total"], ["user_id", "currency"],
+                    source="SELECT t.user_id, COALESCE(g.currency, 'PHP'), SUM(t.final_price) FROM transactions t "
+                           "JOIN game_items g ON t.item_id = g.id "
+                           "WHERE t.user_id NOT IN (SELECT user_id FROM user_purchase_summary) "
+                           "GROUP BY t.user_id, COALESCE(g.currency, 'PHP')"
+                )
+            )
+            tx.execute(
+                backend.upsert(
+                    "user_purchase_summary", ["user_id", "order_count", "last_purchase_at", "last_transaction_id"], ["user_id"],
+                    source="SELECT t.user_id, COUNT(*), MAX(t.created_at), MAX(t.id) FROM transactions t "
+                           "WHERE t.user_id NOT IN (SELECT user_id FROM user_purchase_summary) "
+                           "GROUP BY t.user_id"
+                )
+            )
+            return tx.rowcount
+
+        added = db.run_transaction(backfill)
+        if added:
+            print(f"📊 Built purchase summaries for {added} users")
+        return added
 
     @staticmethod
     def get_all_transactions() -> dict:
@@ -100,45 +213,82 @@ class TransactionService:
             return {"success": False, "error": "Failed to fetch transactions"}
         
     @staticmethod
-    def get_user_transactions(user_id: int) -> dict:
-        """Get all transactions for a user - UPDATED FOR DEBUG"""
-        print(f"🔍 Fetching transactions for user {user_id}")
-        
-        rows = db.fetch_all('''
-            SELECT t.id, t.user_id, t.item_id, t.status, t.final_price, t.quantity, t.created_at, 
-                g.name as item_name, g.currency, g.game_platform
-            FROM transactions t
-            JOIN game_items g ON t.item_id = g.id
-            WHERE t.user_id = %s
-            ORDER BY t.created_at DESC
-        ''', (user_id,))
-        
-        print(f"📊 Database returned {len(rows) if rows else 0} rows")
-        
-        if rows is not None:
-            transactions = []
-            for row in rows:
-                transaction_data = {
-                    "id": row[0],
-                    "user_id": row[1],
-                    "item_id": row[2],
-                    "status": row[3],
-                    "final_price": float(row[4]),
-                    "quantity": row[5],
-                    "created_at": row[6].isoformat() if row[6] else None,
-                    "item_name": row[7],
-                    "currency": row[8],
-                    "game_platform": row[9]
-                }
-                print(f"📦 Transaction {row[0]}: {transaction_data}")
-                transactions.append(transaction_data)
-            
-            print(f"✅ Returning {len(transactions)} transactions")
-            return {
-                "success": True,
-                "transactions": transactions,
-                "count": len(transactions)
-            }
-        else:
+    def get_user_summary(user_id: int) -> dict:
+        """Order count, lifetime spend per currency and last purchase, read from the summary rows"""
+        row = db.fetch_one(
+            "SELECT order_count, last_purchase_at, last_transaction_id FROM user_purchase_summary WHERE user_id = %s",
+            (user_id,), use_primary=True
+        )
+        spend = db.fetch_all(
+            "SELECT currency, total FROM user_spend_by_currency WHERE user_id = %s ORDER BY currency",
+            (user_id,), use_primary=True
+        ) or []
+        last_purchase_at = row[1] if row else None
+        if isinstance(last_purchase_at, datetime):
+            last_purchase_at = last_purchase_at.isoformat()
+        return {
+            "user_id": user_id,
+            "order_count": row[0] if row else 0,
+            "spend_by_currency": {currency: float(total) for currency, total in spend},
+            "last_purchase_at": last_purchase_at,
+            "last_transaction_id": row[2] if row else None
+        }
+
+    @staticmethod
+    def _history_page(user_id: int, limit: int, before: Optional[int]) -> List[Dict]:
+        query = USER_HISTORY_COLUMNS + " WHERE t.user_id = %s"
+        params = (user_id,)
+        if before is not None:
+            query += " AND t.id < %s"
+            params += (before,)
+        rows = db.fetch_all(query + " ORDER BY t.id DESC LIMIT %s", params + (limit + 1,), use_primary=True)
+        if rows is None:
+            return None
+        return [{
+            "id": row[0],
+            "user_id": row[1],
+            "item_id": row[2],
+            "status": row[3],
+            "final_price": float(row[4]),
+            "quantity": row[5],
+            "created_at": row[6].isoformat() if row[6] else None,
+            "item_name": row[7],
+            "currency": row[8],
+            "game_platform": row[9]
+        } for row in rows]
+
+    @staticmethod
+    def get_user_transactions(user_id: int, limit: int = None, before: int = None) -> dict:
+        """A page of a user's purchases, newest first, with their summary.
+
+        The first page is served from a short-lived per-user cache, so a
+        profile load costs a cache lookup or a summary read plus one bounded
+        query, however long the user's history is. Pass the returned
+        next_before as `before` for the next page.
+        """
+        limit = min(limit or USER_HISTORY_PAGE_SIZE, USER_HISTORY_MAX_PAGE_SIZE)
+        first_page = before is None and limit == USER_HISTORY_PAGE_SIZE
+        if first_page:
+            cached = TransactionService.recent_history.get(user_id)
+            if cached is not None:
+                return cached
+            last_write = TransactionService.history_writes.get(user_id)
+
+        transactions = TransactionService._history_page(user_id, limit, before)
+        if transactions is None:
             print("❌ Database query failed")
-            return {"success": False, "error": "Failed to fetch transactions"}
\ No newline at end of file
+            return {"success": False, "error": "Failed to fetch transactions"}
+
+        has_more = len(transactions) > limit
+        transactions = transactions[:limit]
+        result = {
+            "success": True,
+            "transactions": transactions,
+            "count": len(transactions),
+            "has_more": has_more,
+            "next_before": transactions[-1]["id"] if has_more else None,
+            "summary": TransactionService.get_user_summary(user_id)
+        }
+        if first_page and TransactionService.history_writes.get(user_id) == last_write:
+            TransactionService.recent_history.set(user_id, result)
+        return result
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import Any, Dict, List, Optional
+from flask import Request
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+
+UPLOAD_DIR = os.getenv('UPLOAD_DIR', 'uploads')
+UPLOAD_MAX_FILE_BYTES = int(os.getenv('UPLOAD_MAX_FILE_BYTES', 10 * 1024 * 1024))
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv('UPLOAD_MAX_REQUEST_BYTES', 25 * 1024 * 1024))
+# Where stored images are served from; defaults to the API host the upload came in on
+UPLOAD_BASE_URL = os.getenv('UPLOAD_BASE_URL', '')
+
+# Leading bytes of each accepted image type (WebP is checked separately) -> extension
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+MIME_BY_EXTENSION = {'png': 'image/png', 'jpg': 'image/jpeg', 'gif': 'image/gif', 'webp': 'image/webp'}
+STORED_NAME = re.compile(r'^[0-9a-f]{64}\.(png|jpg|gif|webp)$')
+
+
+class UploadTooLarge(RequestEntityTooLarge):
+    description = "Uploaded file is too large"
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Extension of the image type the first bytes belong to, or None"""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+class HashingFile:
+    """Spool file for one uploaded part: hashes and counts bytes as the parser writes them.
+
+    Data goes straight to a temporary file next to the final location, so a
+    large upload is never held in memory, and a part that runs past max_bytes
+    is refused mid-stream rather than after it has all arrived.
+    """
+    def __init__(self, directory: str, max_bytes: int):
+        os.makedirs(directory, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=directory, suffix='.part', delete=False)
+        self.path = self._file.name
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.head = b''
+        self._hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge(f"Uploaded file is larger than {self.max_bytes // 1024} KB")
+        if len(self.head) < 16:
+            self.head += data[:16 - len(self.head)]
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        # read/seek/tell/close for FileStorage
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """Request whose multipart file parts stream into HashingFiles under UPLOAD_DIR.
+
+    Spool files that an endpoint didn't keep (ImageStore.save) are removed
+    when the request closes, including after a failed or aborted upload.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_spools: List[HashingFile] = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        spool = HashingFile(UPLOAD_DIR, UPLOAD_MAX_FILE_BYTES)
+        self.upload_spools.append(spool)
+        return spool
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for spool in self.upload_spools:
+                spool.close()
+                if os.path.exists(spool.path):
+                    os.remove(spool.path)
+
+
+class ImageStore:
+    """Uploaded images on disk, named by the SHA-256 of their content.
+
+    The same image uploaded twice is stored once, and since a name always
+    means the same bytes, clients may cache a stored image forever.
+    """
+    def __init__(self, directory: str = None):
+        self.directory = directory or UPLOAD_DIR
+        self.saved = 0
+        self.duplicates = 0
+        self.bytes_saved = 0
+
+    def save(self, upload: Optional[FileStorage]) -> Dict[str, Any]:
+        """Keep an uploaded image part; returns its stored name, or an error for non-images"""
+        spool = upload.stream if upload is not None else None
+        if not isinstance(spool, HashingFile) or spool.size == 0:
+            return {"success": False, "error": "No image uploaded"}
+        extension = sniff_image_type(spool.head)
+        if extension is None:
+            return {"success": False, "error": f"{upload.filename or 'Upload'} is not a PNG, JPEG, GIF or WebP image"}
+
+        spool.flush()
+        name = f"{spool.sha256}.{extension}"
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path):
+            self.duplicates += 1  # the spool is dropped when the request closes
+        else:
+            spool.close()
+            os.replace(spool.path, path)
+            self.saved += 1
+            self.bytes_saved += spool.size
+        return {"success": True, "name": name, "sha256": spool.sha256, "size": spool.size,
+                "mime": MIME_BY_EXTENSION[extension], "path": os.path.abspath(path)}
+
+    @staticmethod
+    def url_for(name: str, host_url: str) -> str:
+        return f"{(UPLOAD_BASE_URL or host_url).rstrip('/')}/api/uploads/{name}"
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Absolute path of a stored image, or None for names that aren't stored images"""
+        if not STORED_NAME.match(name):
+            return None
+        path = os.path.abspath(os.path.join(self.directory, name))
+        return path if os.path.isfile(path) else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": os.path.abspath(self.directory),
+            "max_file_bytes": UPLOAD_MAX_FILE_BYTES,
+            "max_request_bytes": UPLOAD_MAX_REQUEST_BYTES,
+            "saved": self.saved,
+            "duplicates": self.duplicates,
+            "bytes_saved": self.bytes_saved
+        }
+
+
+image_store = ImageStore()
@@ -139,19 +139,15 @@ async function addPromo(event) {
     }
     
     try {
-        // Compress image before converting to base64
-        const compressedImageBase64 = await compressImage(imageFile);
+        console.log('🔄 Uploading promo to database...');
+        console.log('📏 File size:', imageFile.size, 'bytes');
         
-        console.log('🔄 Adding promo to database...');
-        console.log('📏 Original file size:', imageFile.size, 'bytes');
-        console.log('📏 Compressed base64 length:', compressedImageBase64.length, 'characters');
-        
-        // DATABASE ONLY - Add to backend
-        const backendResult = await addPromoToBackend({
-            image: compressedImageBase64,
-            title: 'Promo Image',
-            description: 'Uploaded from admin panel'
-        });
+        // DATABASE ONLY - multipart upload, the server stores the file and makes the banner
+        const formData = new FormData();
+        formData.append('image', imageFile);
+        formData.append('title', 'Promo Image');
+        formData.append('description', 'Uploaded from admin panel');
+        const backendResult = await ApiService.addPromoWithImage(formData);
 
         console.log('📦 Backend response:', backendResult);
 
@@ -560,49 +556,35 @@ async function addGame(event) {
         
         const mainPrice = priceOptions[0].price;
         
-        // Process images with proper compression and validation
-        console.log('📸 Processing game image...');
-        const gameImageBase64 = await compressAndConvertImage(imageFile, 400, 0.8);
-        
-        console.log('💰 Processing currency icon...');
-        const currencyIconBase64 = await compressAndConvertImage(currencyIconFile, 200, 0.9);
-        
-        // CRITICAL: Validate base64 images
-        if (!gameImageBase64 || !gameImageBase64.startsWith('data:image/')) {
-            console.error('❌ Invalid game image format:', gameImageBase64?.substring(0, 100));
-            throw new Error('Invalid game image format. Please upload a valid image file.');
-        }
-        
-        if (!currencyIconBase64 || !currencyIconBase64.startsWith('data:image/')) {
-            console.error('❌ Invalid currency icon format:', currencyIconBase64?.substring(0, 100));
-            throw new Error('Invalid currency icon format. Please upload a valid image file.');
+        // Validate images; the server resizes them, so they go up as-is
+        for (const file of [imageFile, currencyIconFile]) {
+            if (!file.type.startsWith('image/')) {
+                throw new Error(`${file.name} is not an image. Please upload a valid image file.`);
+            }
+            if (file.size > 10 * 1024 * 1024) {
+                throw new Error(`${file.name} is too large (max 10MB)`);
+            }
         }
         
-        console.log('✅ Images processed successfully');
-        console.log('📦 Game image size:', gameImageBase64.length, 'characters');
-        console.log('📦 Currency icon size:', currencyIconBase64.length, 'characters');
+        // Multipart upload: the image files are streamed, not base64-encoded into JSON
+        const formData = new FormData();
+        formData.append('name', name);
+        formData.append('description', description);
+        formData.append('price', mainPrice);
+        formData.append('currency', currency);
+        formData.append('game_platform', category);
+        formData.append('price_options', JSON.stringify(priceOptions));
+        formData.append('image', imageFile);
+        formData.append('currency_icon', currencyIconFile);
         
-        // Prepare the data to send - USE CONSISTENT PROPERTY NAMES
-        const requestData = {
+        console.log('🚀 Uploading to backend...', {
             name: name,
-            description: description,
-            price: mainPrice,
-            currency: currency,
-            game_platform: category,
-            image: gameImageBase64,  // Use 'image' consistently
-            currency_icon: currencyIconBase64,
-            price_options: priceOptions
-        };
-        
-        console.log('🚀 Sending to backend...', {
-            name: requestData.name,
-            hasImage: !!requestData.image,
-            imageStartsWith: requestData.image?.substring(0, 50),
-            hasCurrencyIcon: !!requestData.currency_icon,
-            priceOptionsCount: requestData.price_options.length
+            imageSize: imageFile.size,
+            currencyIconSize: currencyIconFile.size,
+            priceOptionsCount: priceOptions.length
         });
         
-        const backendResult = await ApiService.addItem(requestData);
+        const backendResult = await ApiService.addItemWithImages(formData);
         
         console.log('📨 Backend response:', backendResult);
         
@@ -804,13 +786,13 @@ async function renderGamesList() {
         
         console.log(`🎮 Game ${index + 1}: ${game.name}`, {
             hasImage: !!imageData,
-            imageType: imageData ? (imageData.startsWith('data:image') ? 'base64' : 'unknown') : 'none',
+            imageType: imageData ? (imageData.startsWith('data:image') ? 'base64' : isImageSource(imageData) ? 'url' : 'unknown') : 'none',
             imageLength: imageData ? imageData.length : 0,
             category: gameCategory
         });
         
         // Create image preview with error handling
-        const gameImagePreview = imageData && imageData.startsWith('data:image') ? `
+        const gameImagePreview = isImageSource(imageData) ? `
             <img src="${imageData}" 
                  alt="${game.name}" 
                  style="max-width: 200px; max-height: 120px; border-radius: 8px; border: 2px solid var(--border); display: block;"
@@ -824,7 +806,7 @@ async function renderGamesList() {
             </div>
         `;
         
-        const currencyIconPreview = currencyIconData && currencyIconData.startsWith('data:image') ? `
+        const currencyIconPreview = isImageSource(currencyIconData) ? `
             <img src="${currencyIconData}" 
                  alt="${game.currency}" 
                  style="width: 50px; height: 50px; border-radius: 8px; border: 2px solid var(--border);"
@@ -1499,13 +1481,21 @@ class TransactionManager {
 
     async getUserTransactions(userId) {
         try {
-            const response = await fetch(`${this.apiBaseUrl}/transactions/user/${userId}`);
-            const data = await response.json();
-            
-            if (data.success) {
-                return data.transactions || [];
-            }
-            return [];
+            // The API pages by transaction id; follow next_before until the history runs out
+            const transactions = [];
+            let before = null;
+            do {
+                const query = before ? `?before=${before}` : '';
+                const response = await fetch(`${this.apiBaseUrl}/transactions/user/${userId}${query}`);
+                const data = await response.json();
+                
+                if (!data.success) {
+                    return transactions;
+                }
+                transactions.push(...(data.transactions || []));
+                before = data.has_more ? data.next_before : null;
+            } while (before);
+            return transactions;
         } catch (error) {
             console.error('Error fetching user transactions:', error);
             return [];
@@ -1516,6 +1506,97 @@ class TransactionManager {
 // Global instance
 const transactionManager = new TransactionManager();
 
+// ============================================
+// LIVE TRANSACTION MONITOR (Server-Sent Events)
+// ============================================
+
+/**
+ * Adds each new purchase to the transactions tab as the server pushes it,
+ * instead of re-fetching the whole ledger. The browser reconnects on its own
+ * and sends Last-Event-ID, so nothing is missed across short drops.
+ */
+class LiveTransactionMonitor {
+    constructor(apiBaseUrl) {
+        this.apiBaseUrl = apiBaseUrl;
+        this.source = null;
+        this.transactions = [];
+        this.ids = new Set();
+        this.pending = null; // events that arrive while the full list is loading
+    }
+
+    start() {
+        if (this.source) return;
+        console.log('📡 [ADMIN] Opening live transaction stream...');
+        this.source = new EventSource(`${this.apiBaseUrl}/admin/transactions/stream`);
+        this.source.addEventListener('transaction', (event) => this.receive(JSON.parse(event.data)));
+        // The server can't replay what we missed (restart or long disconnect): reload the list
+        this.source.addEventListener('reset', () => renderAdminTransactions());
+        this.source.onopen = () => setLiveStatus('live');
+        this.source.onerror = () => {
+            const closed = this.source && this.source.readyState === EventSource.CLOSED;
+            setLiveStatus(closed ? 'offline' : 'reconnecting');
+            if (closed) this.source = null;
+        };
+    }
+
+    stop() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+        setLiveStatus('offline');
+    }
+
+    beginLoad() {
+        this.pending = [];
+    }
+
+    finishLoad(transactions) {
+        this.transactions = transactions;
+        this.ids = new Set(transactions.map(t => t.id));
+        const pending = this.pending || [];
+        this.pending = null;
+        pending.forEach(transaction => this.receive(transaction));
+    }
+
+    cancelLoad() {
+        this.pending = null;
+    }
+
+    receive(transaction) {
+        if (this.pending) {
+            this.pending.push(transaction);
+            return;
+        }
+        if (this.ids.has(transaction.id)) return;
+        this.ids.add(transaction.id);
+        this.transactions.unshift(transaction);
+
+        const list = document.getElementById('adminTransactionsList');
+        if (!list) return;
+        if (this.transactions.length === 1) list.innerHTML = ''; // replaces the empty state
+        list.insertAdjacentHTML('afterbegin', renderAdminTransactionCard(transaction));
+        list.firstElementChild.classList.add('transaction-new');
+
+        const transactionsCount = document.getElementById('transactionsCount');
+        if (transactionsCount) transactionsCount.textContent = this.transactions.length;
+        updateAdminTransactionStats(this.transactions);
+    }
+}
+
+const liveTransactionMonitor = new LiveTransactionMonitor(transactionManager.apiBaseUrl);
+
+/**
+ * Show whether the live stream is connected
+ */
+function setLiveStatus(state) {
+    const liveStatus = document.getElementById('liveStatus');
+    if (!liveStatus) return;
+    const labels = { live: '● Live', reconnecting: '◌ Reconnecting', offline: '○ Offline' };
+    liveStatus.className = `live-status ${state}`;
+    liveStatus.textContent = labels[state];
+}
+
 // ============================================
 // TRANSACTION HELPER FUNCTIONS
 // ============================================
@@ -1602,74 +1683,7 @@ function renderAdminTransactionsList(transactions, container) {
     console.log('🎨 Rendering transactions list with', transactions.length, 'transactions');
     
     try {
-        container.innerHTML = transactions.map(transaction => {
-            // Safely handle missing data with fallbacks
-            const gameName = transaction.item_name || `Game #${transaction.item_id || 'N/A'}`;
-            const platform = transaction.game_platform || 'General';
-            const currency = transaction.currency || 'PHP';
-            const username = transaction.user_username || `User #${transaction.user_id || 'N/A'}`;
-            const email = transaction.user_email || 'No email';
-            const finalPrice = transaction.final_price || 0;
-            const status = transaction.status || 'completed';
-            const userInitial = username.charAt(0).toUpperCase();
-            
-            return `
-            <div class="transaction-card admin-transaction">
-                <div class="transaction-header">
-                    <div class="transaction-main-info">
-                        <div class="transaction-game">${gameName}</div>
-                        <div class="transaction-user">
-                            <div class="user-avatar">${userInitial}</div>
-                            <div class="user-info">
-                                <span class="user-name">${username}</span>
-                                <span class="user-email">${email}</span>
-                                <span class="user-id">User ID: ${transaction.user_id}</span>
-                            </div>
-                        </div>
-                    </div>
-                    <div class="transaction-amount">
-                        <span class="currency-symbol">${currency}</span>${finalPrice.toFixed(2)}
-                    </div>
-                </div>
-                
-                <div class="transaction-details">
-                    <div class="transaction-detail-group">
-                        <div class="detail-item">
-                            <span class="detail-label">Order Number</span>
-                            <span class="detail-value order-number">#${(transaction.id || 0).toString().padStart(6, '0')}</span>
-                        </div>
-                        <div class="detail-item">
-                            <span class="detail-label">Item ID</span>
-                            <span class="detail-value">${transaction.item_id || 'N/A'}</span>
-                        </div>
-                        <div class="detail-item">
-                            <span class="detail-label">Platform</span>
-                            <span class="detail-value platform-badge">🎮 ${platform}</span>
-                        </div>
-                    </div>
-                    
-                    <div class="transaction-detail-group">
-                        <div class="detail-item">
-                            <span class="detail-label">Quantity</span>
-                            <span class="detail-value">${transaction.quantity || 1}</span>
-                        </div>
-                        <div class="detail-item">
-                            <span class="detail-label">Date & Time</span>
-                            <span class="detail-value">${formatAdminTransactionDate(transaction.created_at)}</span>
-                        </div>
-                        <div class="detail-item">
-                            <span class="detail-label">Status</span>
-                            <span class="detail-value">
-                                <span class="transaction-status ${getStatusBadgeClass(status)}">
-                                    ${status}
-                                </span>
-                            </span>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            `;
-        }).join('');
+        container.innerHTML = transactions.map(renderAdminTransactionCard).join('');
         
         console.log(`✅ Successfully rendered ${transactions.length} transactions in UI`);
         
@@ -1688,6 +1702,78 @@ function renderAdminTransactionsList(transactions, container) {
     }
 }
 
+/**
+ * Render one admin transaction card
+ */
+function renderAdminTransactionCard(transaction) {
+    // Safely handle missing data with fallbacks
+    const gameName = transaction.item_name || `Game #${transaction.item_id || 'N/A'}`;
+    const platform = transaction.game_platform || 'General';
+    const currency = transaction.currency || 'PHP';
+    const username = transaction.user_username || `User #${transaction.user_id || 'N/A'}`;
+    const email = transaction.user_email || 'No email';
+    const finalPrice = transaction.final_price || 0;
+    const status = transaction.status || 'completed';
+    const userInitial = username.charAt(0).toUpperCase();
+    
+    return `
+    <div class="transaction-card admin-transaction">
+        <div class="transaction-header">
+            <div class="transaction-main-info">
+                <div class="transaction-game">${gameName}</div>
+                <div class="transaction-user">
+                    <div class="user-avatar">${userInitial}</div>
+                    <div class="user-info">
+                        <span class="user-name">${username}</span>
+                        <span class="user-email">${email}</span>
+                        <span class="user-id">User ID: ${transaction.user_id}</span>
+                    </div>
+                </div>
+            </div>
+            <div class="transaction-amount">
+                <span class="currency-symbol">${currency}</span>${finalPrice.toFixed(2)}
+            </div>
+        </div>
+        
+        <div class="transaction-details">
+            <div class="transaction-detail-group">
+                <div class="detail-item">
+                    <span class="detail-label">Order Number</span>
+                    <span class="detail-value order-number">#${(transaction.id || 0).toString().padStart(6, '0')}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Item ID</span>
+                    <span class="detail-value">${transaction.item_id || 'N/A'}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Platform</span>
+                    <span class="detail-value platform-badge">🎮 ${platform}</span>
+                </div>
+            </div>
+            
+            <div class="transaction-detail-group">
+                <div class="detail-item">
+                    <span class="detail-label">Quantity</span>
+                    <span class="detail-value">${transaction.quantity || 1}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Date & Time</span>
+                    <span class="detail-value">${formatAdminTransactionDate(transaction.created_at)}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Status</span>
+                    <span class="detail-value">
+                        <span class="transaction-status ${getStatusBadgeClass(status)}">
+                            ${status}
+                        </span>
+                    </span>
+                </div>
+            </div>
+        </div>
+    </div>
+    `;
+}
+
 /**
  * Load and render all transactions for admin view
  */
@@ -1716,6 +1802,10 @@ async function renderAdminTransactions() {
         </div>
     `;
 
+    // Subscribe before loading so purchases made meanwhile are queued, not lost
+    liveTransactionMonitor.start();
+    liveTransactionMonitor.beginLoad();
+
     try {
         const transactions = await transactionManager.getAllTransactions();
         
@@ -1734,6 +1824,7 @@ async function renderAdminTransactions() {
                 transactionsCount.textContent = '0';
             }
             updateAdminTransactionStats([]);
+            liveTransactionMonitor.finishLoad([]);
             return;
         }
 
@@ -1748,11 +1839,13 @@ async function renderAdminTransactions() {
 
         // Render transactions
         renderAdminTransactionsList(transactions, adminTransactionsList);
+        liveTransactionMonitor.finishLoad(transactions);
         
         console.log(`✅ Admin view: Successfully rendered ${transactions.length} transactions from all users`);
 
     } catch (error) {
         console.error('❌ Error loading admin transactions:', error);
+        liveTransactionMonitor.cancelLoad();
         adminTransactionsList.innerHTML = `
             <div class="error-transactions">
                 <div class="error-icon">❌</div>
@@ -1779,12 +1872,14 @@ function loadAdminTransactions() {
 // ============================================
 
 window.transactionManager = transactionManager;
+window.liveTransactionMonitor = liveTransactionMonitor;
 window.renderAdminTransactions = renderAdminTransactions;
 window.loadAdminTransactions = loadAdminTransactions;
 window.getStatusBadgeClass = getStatusBadgeClass;
 window.formatAdminTransactionDate = formatAdminTransactionDate;
 window.updateAdminTransactionStats = updateAdminTransactionStats;
 window.renderAdminTransactionsList = renderAdminTransactionsList;
+window.renderAdminTransactionCard = renderAdminTransactionCard;
 
 // ============================================
 // YOUR EXISTING ADMIN.JS CODE CONTINUES BELOW
@@ -1815,6 +1910,11 @@ function showTab(tabName) {
     // Add active class to clicked button
     event.target.classList.add('active');
     
+    // The live stream only runs while the transactions tab is open
+    if (tabName !== 'transactions') {
+        liveTransactionMonitor.stop();
+    }
+    
     // Refresh content - ADD TRANSACTIONS HERE
     if (tabName === 'games') {
         console.log('Rendering games list...');
@@ -40,6 +40,32 @@ class ApiService {
         }
     }
 
+    /**
+     * Multipart upload: image files go up as they are, no base64 in a JSON body.
+     * The browser sets the multipart Content-Type (with its boundary) itself.
+     */
+    static async upload(endpoint, formData) {
+        const url = `${API_BASE_URL}${endpoint}`;
+
+        try {
+            console.log(`🔄 API Upload: ${url}`);
+            const response = await fetch(url, { method: 'POST', body: formData });
+            const data = await response.json();
+
+            if (!response.ok) {
+                throw new Error(data.error || `HTTP error! status: ${response.status}`);
+            }
+
+            return data;
+        } catch (error) {
+            console.error(`❌ API Error (${endpoint}):`, error);
+            return {
+                success: false,
+                error: error.message || 'Network error occurred'
+            };
+        }
+    }
+
     // ============================================
     // AUTHENTICATION ENDPOINTS
     // ============================================
@@ -51,6 +77,10 @@ class ApiService {
         });
     }
 
+    static async checkAvailability(field, value) {
+        return this.request(`/auth/available?${field}=${encodeURIComponent(value)}`);
+    }
+
     static async login(credentials) {
         return this.request('/auth/login', {
             method: 'POST',
@@ -66,8 +96,9 @@ class ApiService {
     // GAME ITEMS ENDPOINTS
     // ============================================
 
-    static async getAllGames() {
-        return this.request('/items');
+    static async getAllGames(variant = 'card') {
+        // Resized card-sized images instead of the full uploads
+        return this.request(`/items?variant=${variant}`);
     }
 
     static async getGameById(gameId) {
@@ -93,8 +124,13 @@ class ApiService {
         });
     }
 
-    static async getUserTransactions(userId) {
-        return this.request(`/transactions/user/${userId}`);
+    static async getUserTransactions(userId, before = null) {
+        const query = before ? `?before=${before}` : '';
+        return this.request(`/transactions/user/${userId}${query}`);
+    }
+
+    static async getUserSummary(userId) {
+        return this.request(`/transactions/user/${userId}/summary`);
     }
 
     // ============================================
@@ -108,6 +144,10 @@ class ApiService {
         });
     }
 
+    static async addItemWithImages(formData) {
+        return this.upload('/admin/items/upload', formData);
+    }
+
     static async deleteItem(itemId) {
         return this.request(`/admin/items/${itemId}`, {
             method: 'DELETE'
@@ -117,8 +157,12 @@ class ApiService {
     // ============================================
     // Promo Methods
     // ============================================
-    static async getAllPromos() {
-        return this.request('/promos');
+    static async getHome() {
+        return this.request('/home');
+    }
+
+    static async getAllPromos(variant = 'banner') {
+        return this.request(`/promos?variant=${variant}`);
     }
 
     static async addPromo(promoData) {
@@ -128,6 +172,10 @@ class ApiService {
         });
     }
 
+    static async addPromoWithImage(formData) {
+        return this.upload('/promos/upload', formData);
+    }
+
     static async deletePromo(promoId) {
         return this.request(`/promos/${promoId}`, {
             method: 'DELETE'
@@ -318,11 +366,20 @@ function nuclearFixSession() {
     }
 }
 
+/**
+ * Whether an image field can go straight into <img src>: a base64 data URL
+ * (JSON uploads, resized variants) or the URL of a multipart-uploaded file
+ */
+function isImageSource(value) {
+    return typeof value === 'string' && (value.startsWith('data:image') || /^https?:\/\//.test(value));
+}
+
 // ============================================
 // EXPORTS
 // ============================================
 
 window.ApiService = ApiService;
+window.isImageSource = isImageSource;
 window.createUserBackend = createUserBackend;
 window.loginUserBackend = loginUserBackend;
 window.createSession = createSession;
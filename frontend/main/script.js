@@ -397,8 +397,31 @@ function initializeData() {
     }
 }
 
+/**
+ * Loads the homepage bundle (games, promos, news) once per page load,
+ * instead of one request per section
+ */
+let homeBundlePromise = null;
+
+function getHomeBundle() {
+    if (!homeBundlePromise) {
+        homeBundlePromise = ApiService.getHome().then(response => {
+            if (!response.success) {
+                homeBundlePromise = null;
+            }
+            return response;
+        });
+    }
+    return homeBundlePromise;
+}
+
 async function getAllGames() {
     try {
+        const bundle = await getHomeBundle();
+        if (bundle.success && bundle.items) {
+            return bundle.items;
+        }
+
         console.log('📡 Fetching games from database...');
         const response = await ApiService.getAllGames();
         
@@ -437,6 +460,11 @@ async function getAllGames() {
 
 async function getAllPromos() {
     try {
+        const bundle = await getHomeBundle();
+        if (bundle.success && bundle.promos) {
+            return bundle.promos;
+        }
+
         const response = await ApiService.getAllPromos();
         if (response.success) {
             return response.promos || [];
@@ -453,6 +481,11 @@ async function getAllPromos() {
  */
 async function getAllNews() {
     try {
+        const bundle = await getHomeBundle();
+        if (bundle.success && bundle.news) {
+            return bundle.news;
+        }
+
         const response = await fetch('http://localhost:5000/api/news');
         const data = await response.json();
         
@@ -665,7 +698,7 @@ async function renderGames(searchTerm = '') {
         
         console.log(`🎮 Rendering game ${index + 1}: ${game.name}`, {
             hasImage: !!imageData,
-            imageValid: imageData ? imageData.startsWith('data:image') : false,
+            imageValid: isImageSource(imageData),
             imageLength: imageData ? imageData.length : 0,
             imageType: imageData ? typeof imageData : 'none',
             category: gameCategory
@@ -673,8 +706,8 @@ async function renderGames(searchTerm = '') {
         
         let imageContent = '';
         
-        if (imageData && imageData.startsWith('data:image')) {
-            // Valid base64 image - use img tag
+        if (isImageSource(imageData)) {
+            // Valid base64 image or uploaded image URL - use img tag
             imageContent = `
                 <img src="${imageData}" 
                      alt="${game.name}" 
@@ -1147,29 +1180,59 @@ class TransactionManager {
     }
 
     /**
-     * Get user's transactions from database - UPDATED
+     * Get one page of a user's transactions, newest first.
+     * Pass the returned nextBefore to get the next (older) page.
+     */
+    async getUserTransactionsPage(userId, before = null) {
+        console.log(`📡 Fetching transactions for user ${userId}${before ? ` before #${before}` : ''}...`);
+        const query = before ? `?before=${before}` : '';
+        const response = await fetch(`${this.apiBaseUrl}/transactions/user/${userId}${query}`);
+        const data = await response.json();
+        
+        if (!data.success) {
+            throw new Error(data.error || 'Failed to fetch transactions');
+        }
+        console.log(`✅ Loaded ${data.transactions.length} transactions from database`);
+        return {
+            transactions: data.transactions || [],
+            hasMore: Boolean(data.has_more),
+            nextBefore: data.next_before
+        };
+    }
+
+    /**
+     * Get all of a user's transactions from database, following pages
      */
     async getUserTransactions(userId) {
         try {
-            console.log(`📡 Fetching transactions for user ${userId}...`);
-            const response = await fetch(`${this.apiBaseUrl}/transactions/user/${userId}`);
-            const data = await response.json();
-            
-            console.log('📦 Transactions API response:', data);
-            
-            if (data.success && data.transactions) {
-                console.log(`✅ Loaded ${data.transactions.length} transactions from database`);
-                return data.transactions;
-            } else {
-                console.log('❌ No transactions found or API error:', data.error);
-                return [];
-            }
+            const transactions = [];
+            let before = null;
+            do {
+                const page = await this.getUserTransactionsPage(userId, before);
+                transactions.push(...page.transactions);
+                before = page.hasMore ? page.nextBefore : null;
+            } while (before);
+            return transactions;
         } catch (error) {
             console.error('❌ Error fetching user transactions:', error);
             return [];
         }
     }
 
+    /**
+     * Get user's order count and lifetime spend per currency
+     */
+    async getUserSummary(userId) {
+        try {
+            const response = await fetch(`${this.apiBaseUrl}/transactions/user/${userId}/summary`);
+            const data = await response.json();
+            return data.success ? data.summary : null;
+        } catch (error) {
+            console.error('❌ Error fetching purchase summary:', error);
+            return null;
+        }
+    }
+
     /**
      * Get all transactions (admin only) - DEBUG VERSION
      */
@@ -1934,6 +1997,10 @@ function setupModalAuthForms() {
         });
     }
 
+    // Check username and email availability while the user types
+    watchAvailability('signupUsernameModal', 'signupUsernameAvailability', 'username', 3);
+    watchAvailability('signupEmailModal', 'signupEmailAvailability', 'email', 3);
+
     // Sign Up Form Handler for Modal
     const signupFormModal = document.getElementById('signupFormModal');
     if (signupFormModal) {
@@ -2012,6 +2079,34 @@ function setupModalAuthForms() {
     }
 }
 
+/**
+ * Show whether a signup field's value is still free, checked shortly after typing stops
+ */
+function watchAvailability(inputId, hintId, field, minLength) {
+    const input = document.getElementById(inputId);
+    const hint = document.getElementById(hintId);
+    if (!input || !hint) return;
+
+    let timer = null;
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        hint.textContent = '';
+        hint.className = 'form-hint availability-hint';
+
+        const value = input.value.trim();
+        if (value.length < minLength || (field === 'email' && !value.includes('@'))) return;
+
+        timer = setTimeout(async () => {
+            const result = await ApiService.checkAvailability(field, value);
+            if (!result.success || input.value.trim() !== value) return;
+
+            const available = result[field].available;
+            hint.textContent = available ? `✅ ${value} is available` : `❌ ${value} is already taken`;
+            hint.classList.add(available ? 'available' : 'taken');
+        }, 300);
+    });
+}
+
 /**
  * Debug session and role information
  */
@@ -75,12 +75,14 @@ function loadProfileData() {
 
 async function loadTransactionStats(userId) {
     try {
-        // Get transactions from database
-        const transactions = await transactionManager.getUserTransactions(userId);
+        // Get the running totals kept by the server
+        const summary = await transactionManager.getUserSummary(userId);
+        if (!summary) {
+            throw new Error('Purchase summary unavailable');
+        }
         
-        // Calculate statistics
-        const totalOrders = transactions.length;
-        const totalSpent = transactions.reduce((sum, transaction) => sum + transaction.final_price, 0);
+        const totalOrders = summary.order_count;
+        const totalSpent = Object.values(summary.spend_by_currency).reduce((sum, total) => sum + total, 0);
         
         // Update UI
         document.getElementById('totalOrders').textContent = totalOrders;
@@ -123,11 +125,12 @@ async function loadTransactionHistory() {
 
     try {
         console.log(`🔍 Loading transactions for user ID: ${session.userId}`);
-        const transactions = await transactionManager.getUserTransactions(session.userId);
+        const page = await transactionManager.getUserTransactionsPage(session.userId);
+        const transactions = page.transactions;
         
         console.log('📊 Transactions data received:', transactions);
         
-        if (!transactions || transactions.length === 0) {
+        if (transactions.length === 0) {
             console.log('ℹ️ No transactions found for user');
             transactionsList.innerHTML = `
                 <div class="empty-transactions">
@@ -145,6 +148,7 @@ async function loadTransactionHistory() {
         console.log(`🎯 Rendering ${transactions.length} transactions`);
         // Render transactions
         renderTransactionsList(transactions, transactionsList);
+        renderLoadMoreButton(page, transactionsList);
         
     } catch (error) {
         console.error('❌ Error loading transaction history:', error);
@@ -162,10 +166,48 @@ async function loadTransactionHistory() {
 }
 
 /**
- * Render transactions list
+ * Load the next (older) page of transactions below the ones already shown
+ */
+async function loadMoreTransactions(button) {
+    const session = getCurrentSession();
+    const transactionsList = document.getElementById('transactionsList');
+    if (!session || !transactionsList) {
+        return;
+    }
+    
+    button.disabled = true;
+    button.textContent = 'Loading...';
+    try {
+        const page = await transactionManager.getUserTransactionsPage(session.userId, button.dataset.before);
+        button.remove();
+        renderTransactionsList(page.transactions, transactionsList, true);
+        renderLoadMoreButton(page, transactionsList);
+    } catch (error) {
+        console.error('❌ Error loading more transactions:', error);
+        button.disabled = false;
+        button.textContent = '🔄 Retry';
+    }
+}
+
+/**
+ * Add a "Load more" button after the list when there are older transactions
  */
-function renderTransactionsList(transactions, container) {
-    container.innerHTML = transactions.map(transaction => `
+function renderLoadMoreButton(page, container) {
+    if (!page.hasMore) {
+        return;
+    }
+    container.insertAdjacentHTML('beforeend', `
+        <button class="btn-load-more" data-before="${page.nextBefore}" onclick="loadMoreTransactions(this)">
+            Load older transactions
+        </button>
+    `);
+}
+
+/**
+ * Render transactions list (or add them to the end of it)
+ */
+function renderTransactionsList(transactions, container, append = false) {
+    const html = transactions.map(transaction => `
         <div class="transaction-card">
             <div class="transaction-header">
                 <div class="transaction-main-info">
@@ -204,6 +246,12 @@ function renderTransactionsList(transactions, container) {
             </div>
         </div>
     `).join('');
+    
+    if (append) {
+        container.insertAdjacentHTML('beforeend', html);
+    } else {
+        container.innerHTML = html;
+    }
 }
 
 /**